@@ -2,4 +2,4 @@
 # /version.py
 # /_dev/
 
-from . import chat, map, souls, users, sync
\ No newline at end of file
+from . import chat, core, map, souls, users, sync, usage
\ No newline at end of file
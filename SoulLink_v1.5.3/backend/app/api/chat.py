@@ -5,16 +5,30 @@
 # "The right man in the wrong place can make all the difference in the world."
 # - G-Man, Half-Life 2
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+import asyncio
+import json
+import logging
+import anyio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.database.session import get_session
 from backend.app.logic.brain import PhoenixBrain
+from backend.app.logic.context import ChatContext, ContextLoader
 from backend.app.models.relationship import SoulRelationship
+from backend.app.models.conversation import Conversation
 from backend.app.models.user import User
-from backend.app.api.dependencies import get_current_user 
+from backend.app.core import responses
+from backend.app.api.dependencies import charge_energy, get_current_user, get_current_user_id
+from backend.app.services.archive import archivist
+from backend.app.services.persistence import write_behind
+from backend.app.services.energy import EnergyCharge, EnergyService
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/chat", tags=["Legion Engine - Chat"])
+logger = logging.getLogger("LegionEngine")
 
 class ChatRequest(BaseModel):
     soul_id: str
@@ -29,36 +43,47 @@ class ChatResponse(BaseModel):
     location: str
     is_architect: bool   # <--- NEW: UI theming
 
+async def _load_turn_context(session: AsyncSession, user_id: str, soul_id: str) -> ChatContext:
+    """One joined load for the whole turn; replaces the separate user/link/context reads."""
+    ctx = await ContextLoader.load(session, user_id, soul_id)
+
+    if not ctx.user:
+        raise HTTPException(
+            status_code=404,
+            detail=f"User {user_id} not found. Please register or check your user ID."
+        )
+    if not ctx.rel:
+        raise HTTPException(status_code=404, detail="Link lost. Please re-initialize.")
+    return ctx
+
 @router.post("/send", response_model=ChatResponse)
 async def send_message(
     request: ChatRequest, 
-    user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    user_id: str = Depends(get_current_user_id), 
+    charge: EnergyCharge = Depends(charge_energy),  # ⚡ 429s before any context load
+    session: AsyncSession = Depends(get_session)
 ):
-    brain = PhoenixBrain(session.get_bind())
+    brain = PhoenixBrain(session.bind)
     
-    # 1. Fetch Relationship
-    rel = session.exec(
-        select(SoulRelationship).where(
-            SoulRelationship.user_id == user.user_id,
-            SoulRelationship.soul_id == request.soul_id
-        )
-    ).first()
-
-    if not rel:
-        raise HTTPException(status_code=404, detail="Link lost. Please re-initialize.")
+    # 1. Load User + Relationship + Soul + Location + History (passed through, never re-queried)
+    try:
+        ctx = await _load_turn_context(session, user_id, request.soul_id)
+    except HTTPException:
+        await EnergyService.refund(session.bind, charge)
+        raise
+    ctx.energy_charge = charge
+    rel = ctx.rel
 
     try:
         # 2. Generate Response (Brain might update Intimacy inside logic/brain.py)
-        response_text = brain.generate_response(
-            user_id=user.user_id,
+        response_text = await brain.generate_response(
+            user_id=user_id,
             soul_id=request.soul_id,
-            user_input=request.message
+            user_input=request.message,
+            context=ctx
         )
-        
-        # 3. REFRESH Data (Crucial: Get the new score/location after the Brain worked)
-        session.refresh(rel) 
 
+        # 3. The brain updates the context in place, so no refresh round-trip is needed
         return ChatResponse(
             soul_id=request.soul_id,
             response=response_text,
@@ -68,49 +93,152 @@ async def send_message(
             is_architect=rel.is_architect
         )
     except Exception as e:
+        await EnergyService.refund(session.bind, charge)
         raise HTTPException(status_code=500, detail=f"Neural Link Failure: {str(e)}")
 
-# ... (History endpoint remains the same)
+def _final_state(soul_id: str, rel: SoulRelationship) -> dict:
+    """The ChatResponse fields (minus the reply) sent once a streamed turn is done."""
+    return {
+        "soul_id": soul_id,
+        "tier": rel.intimacy_tier,
+        "intimacy_score": rel.intimacy_score,
+        "location": rel.current_location or "Unknown",
+        "is_architect": rel.is_architect,
+    }
+
+def _sse(event: str, payload: dict) -> str:
+    """Formats a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@router.post("/stream")
+async def stream_message(
+    request: ChatRequest,
+    user_id: str = Depends(get_current_user_id),
+    charge: EnergyCharge = Depends(charge_energy),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    THE LIVE WIRE: Same turn as /send, but tokens are pushed as Server-Sent Events
+    the moment the LLM produces them. The reply is persisted once the stream ends.
+
+    Events: `token` ({"text": ...}), then `done` (same fields as ChatResponse) or `error`.
+    """
+    engine = session.bind
+    brain = PhoenixBrain(engine)
+
+    try:
+        ctx = await _load_turn_context(session, user_id, request.soul_id)
+    except HTTPException:
+        await EnergyService.refund(engine, charge)
+        raise
+    ctx.energy_charge = charge
+    rel = ctx.rel
+
+    # Snapshot what the final frame needs; the request session may be gone once we stream.
+    final_state = _final_state(request.soul_id, rel)
+
+    async def event_stream():
+        parts = []
+        try:
+            async for token in brain.generate_response_stream(
+                user_id=user_id,
+                soul_id=request.soul_id,
+                user_input=request.message,
+                context=ctx
+            ):
+                parts.append(token)
+                yield _sse("token", {"text": token})
+        except (GeneratorExit, asyncio.CancelledError):
+            # Client hung up mid-reply: nothing is persisted, so nothing is charged.
+            # Shielded: anyio cancellation is level-triggered and would cancel the refund too.
+            with anyio.CancelScope(shield=True):
+                await EnergyService.refund(engine, charge)
+            raise
+        except Exception as e:
+            logger.error(f"Phoenix Stream Error: {e}")
+            await EnergyService.refund(engine, charge)
+            yield _sse("error", {"detail": f"Neural Link Failure: {str(e)}"})
+            return
+
+        yield _sse("done", {**final_state, "response": "".join(parts)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+HISTORY_PAGE_MAX = 200
 
 @router.get("/history")
 async def get_chat_history(
     soul_id: str,
+    response: Response,
     limit: int = 50,
+    before: Optional[int] = None,
     user: User = Depends(get_current_user), # ✅ Validates user and prevents "Spying"
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    from backend.app.models.conversation import Conversation
-    
+    """
+    THE RECORD: Newest page of the thread by default, returned oldest -> newest.
+    Reads span the hot table and the cold archive transparently.
+    Scroll back with `before=<msg_id>`; the next cursor is in the `X-Next-Before` header
+    (absent once the start of the thread is reached).
+    """
+    limit = max(1, min(limit, HISTORY_PAGE_MAX))
+
     # 🕵️ GROK FIX: Ensure they are actually linked before showing history
-    rel_exists = session.exec(
-        select(SoulRelationship).where(
+    rel_exists = (await session.exec(
+        select(SoulRelationship.relationship_id).where(
             SoulRelationship.user_id == user.user_id,
             SoulRelationship.soul_id == soul_id
         )
-    ).first()
+    )).first()
     
     if not rel_exists:
         raise HTTPException(status_code=403, detail="Access denied. No link established.")
 
-    # 📜 GROK FIX: Order by Ascending (Oldest -> Newest) directly in DB
-    messages = session.exec(
-        select(Conversation)
-        .where(
-            Conversation.user_id == user.user_id, 
-            Conversation.soul_id == soul_id
+    # ✍️ Snapshot write-behind turns first; the newest page shows them too (their id is null)
+    pending = write_behind.pending_for(user.user_id, soul_id) if before is None else []
+
+    # 📜 Keyset page: walk ix_conversations_thread backwards from the cursor.
+    # Fetch one extra row to know whether an older page exists.
+    statement = select(Conversation).where(
+        Conversation.user_id == user.user_id,
+        Conversation.soul_id == soul_id
+    )
+    if before is not None:
+        statement = statement.where(Conversation.msg_id < before)
+
+    page = list((await session.exec(
+        statement.order_by(Conversation.msg_id.desc()).limit(limit + 1)
+    )).all())
+
+    # 🧊 Ran out of hot rows? Continue seamlessly into the cold archive.
+    if len(page) <= limit:
+        cold_before = page[-1].msg_id if page else before
+        page += await session.run_sync(
+            archivist.read_before, user.user_id, soul_id, cold_before, limit + 1 - len(page)
         )
-        .order_by(Conversation.created_at.asc()) # Database does the sorting
-        .limit(limit)
-    ).all()
-    
-    return [
+
+    has_more = len(page) > limit
+    page = list(reversed(page[:limit]))
+
+    if has_more and page:
+        response.headers["X-Next-Before"] = str(page[0].msg_id)
+
+    if pending:
+        page = list(reversed(write_behind.merge_pending(list(reversed(page)), pending)))
+
+    return responses.respond([
         {
+            "id": msg.msg_id,
             "role": msg.role,
             "content": msg.content,
             "timestamp": msg.created_at.isoformat()
         }
-        for msg in messages # No reversed() needed anymore!
-    ]
+        for msg in page
+    ], response)
 
 # "Stay frosty."
 # - Gaz, Call of Duty: Modern Warfare
\ No newline at end of file
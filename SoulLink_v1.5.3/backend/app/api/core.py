@@ -1,5 +1,18 @@
 # /backend/app/api/core.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
+from backend.app.api.dependencies import get_current_user
+from backend.app.core.tracing import tracer
+from backend.app.models.user import User
+from backend.app.services.assets import portrait_pipeline
+from backend.app.services.blueprints import blueprint_cache
+from backend.app.services.prompts import prompt_builder
+from backend.app.services.memory import memory_keeper
+from backend.app.services.archive import archivist
+from backend.app.services.persistence import write_behind
+from backend.app.services.presence import presence
+from backend.app.services.realtime import hub
+from backend.app.services.search import soul_search
+from backend.app.services.user_cache import user_cache
 
 router = APIRouter(prefix="/core", tags=["Legion Engine - Core"])
 
@@ -13,4 +26,39 @@ async def get_global_config():
             "map_enabled": True,
             "architect_mode": True
         }
-    }
\ No newline at end of file
+    }
+
+def _require_architect(user: User = Depends(get_current_user)) -> User:
+    if user.account_tier != "architect":
+        raise HTTPException(403, detail="Engine internals are for Architects only.")
+    return user
+
+@router.get("/stats")
+async def get_engine_stats(_: User = Depends(_require_architect)):
+    """Cache counters and prompt sizes: what the in-process caches are saving and costing. Architect-only."""
+    return {
+        "blueprint_cache": blueprint_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "search": soul_search.stats(),
+        "presence": presence.stats(),
+        "portraits": portrait_pipeline.stats(),
+        "realtime": hub.stats(),
+        "prompts": prompt_builder.stats(),
+        "memory": memory_keeper.stats(),
+        "archive": archivist.stats(),
+        "write_behind": write_behind.stats(),
+        "tracing": tracer.stats()
+    }
+
+@router.get("/traces")
+async def list_traces(limit: int = 20, min_ms: float = 0.0, _: User = Depends(_require_architect)):
+    """Recent request traces (newest first), optionally only those slower than `min_ms`. Architect-only."""
+    return tracer.recent(limit=max(1, min(limit, tracer.buffer_size)), min_ms=min_ms)
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, _: User = Depends(_require_architect)):
+    """One trace with all its spans (match it with the X-Trace-Id response header). Architect-only."""
+    trace = tracer.get(trace_id)
+    if not trace:
+        raise HTTPException(404, detail="Trace not found (expired from the buffer or never sampled).")
+    return trace
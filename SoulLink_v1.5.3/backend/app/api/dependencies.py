@@ -8,9 +8,12 @@ Provides flexible user handling for both dev (USR-001) and production users.
 """
 
 from fastapi import Header, HTTPException, Depends
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.app.core import tracing
 from backend.app.database.session import get_session
 from backend.app.models.user import User
+from backend.app.services.energy import EnergyCharge, EnergyService
+from backend.app.services.user_cache import user_cache
 from typing import Optional
 
 async def get_current_user_id(
@@ -35,13 +38,16 @@ async def get_current_user_id(
 
 async def get_current_user(
     user_id: str = Depends(get_current_user_id),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ) -> User:
     """
-    Fetch the full User object from the database.
-    Validates that the user exists.
+    Fetch the full User object (through the short-lived user cache).
+    Validates that the user exists. Cached copies are read-only snapshots:
+    endpoints that write the user must load it in their own session.
     """
-    user = session.get(User, user_id)
+    with tracing.span("auth.user", user_id=user_id) as span:
+        user = await user_cache.aget(session, user_id)
+        span.set(found=user is not None)
     
     if not user:
         raise HTTPException(
@@ -52,6 +58,20 @@ async def get_current_user(
     return user
 
 
+async def charge_energy(
+    user_id: str = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_session)
+) -> EnergyCharge:
+    """
+    Admission control for LLM-backed endpoints.
+    Charges one turn of energy, or fails fast with 429 + Retry-After.
+    """
+    with tracing.span("auth.admit", user_id=user_id) as span:
+        charge = await EnergyService.admit(session, user_id)
+        span.set(unlimited=charge.tier.unlimited, cost=charge.cost, remaining=charge.remaining)
+        return charge
+
+
 # For endpoints that only need user_id (most common)
 CurrentUserId = Depends(get_current_user_id)
 
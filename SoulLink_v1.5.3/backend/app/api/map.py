@@ -2,80 +2,167 @@
 # version.py
 # _dev/
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.database.session import get_session
 from backend.app.logic.location_manager import LocationManager
 from backend.app.models.location import Location
-from backend.app.models.relationship import SoulRelationship
 from backend.app.models.user import User
 from backend.app.api.dependencies import get_current_user 
+from backend.app.core import conditional
+from backend.app.services.blueprints import ALL, blueprint_cache
+from backend.app.services.presence import presence
 
 router = APIRouter(prefix="/map", tags=["Legion Engine - Map"])
 
 @router.get("/locations")
 async def get_world_map(
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Fetch the full geography of Link City directly from the Database.
     Also detects which souls are currently active in each district.
+    Supports `If-None-Match` (304 when neither the map nor your souls moved).
     """
-    # 1. Pull all locations from the DB
-    statement = select(Location)
-    locations = session.exec(statement).all()
+    # 1. Pull all locations (blueprints are served from the shared cache)
+    locations = await blueprint_cache.aget_all_locations(session.bind)
     
-    # 2. Pull all relationships for this user to see where souls are
-    rel_statement = select(SoulRelationship).where(SoulRelationship.user_id == user.user_id)
-    relationships = session.exec(rel_statement).all()
+    # 2. Where this user's souls are, pre-grouped by location (presence index)
+    here = await presence.aget(session, user.user_id)
+
+    # Keyed on placements, not the link version: a chat turn alone shouldn't defeat the 304
+    etag = conditional.make_etag(
+        "map", user.user_id, blueprint_cache.fingerprint(Location, ALL, locations), sorted(here.locations.items())
+    )
+    not_modified = conditional.check(request, response, etag)
+    if not_modified:
+        return not_modified
     
     # 3. Build the response
     output = []
     for loc in locations:
-        # Check if any of your souls are here
-        present_souls = [
-            rel.soul_id for rel in relationships 
-            if rel.current_location == loc.location_id
-        ]
-        
         output.append({
             "id": loc.location_id,
             "name": loc.display_name,
             "category": loc.category,
             "desc": loc.description,
             "privacy": loc.system_modifiers.get("privacy_gate", "Public"),
-            "present_souls": present_souls # 📡 Live data!
+            "present_souls": here.locations.get(loc.location_id, []) # 📡 Live data!
         })
         
     return output
 
+@router.get("/occupancy")
+async def get_occupancy(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    How busy each district is across all of Link City: linked souls and distinct users present.
+    Served from a precomputed view (refreshed in the background), never counted per request.
+    """
+    locations = await blueprint_cache.aget_all_locations(session.bind)
+    occupancy = presence.occupancy()
+
+    etag = conditional.make_etag(
+        "occupancy", blueprint_cache.fingerprint(Location, ALL, locations),
+        sorted((loc, c["souls"], c["users"]) for loc, c in occupancy.items())
+    )
+    not_modified = conditional.check(request, response, etag, cache_control=conditional.PUBLIC)
+    if not_modified:
+        return not_modified
+
+    return [
+        {
+            "id": loc.location_id,
+            "name": loc.display_name,
+            "souls": occupancy.get(loc.location_id, {}).get("souls", 0),
+            "users": occupancy.get(loc.location_id, {}).get("users", 0),
+        }
+        for loc in locations
+    ]
+
 @router.post("/move")
 async def move_to_location(
     soul_id: str,
     location_id: str,
     user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Move a soul to a new location in Link City.
     The LocationManager handles Gatekeeper rules (Privacy/Intimacy).
     """
-    manager = LocationManager(session.get_bind())
-    
-    success, message = manager.move_to(user.user_id, soul_id, location_id)
+    manager = LocationManager(session.bind)
     
-    if not success:
-        raise HTTPException(status_code=403, detail=message)
+    result = (await manager.move_many(user.user_id, [(soul_id, location_id)]))[0]
     
-    loc = session.get(Location, location_id)
-    if not loc:
-        raise HTTPException(status_code=404, detail="Destination location does not exist.")
+    if not result.ok:
+        raise HTTPException(status_code=403, detail=result.message)
     
+    loc = result.location  # Already in hand from the move; no second read
     return {
         "status": "moved",
         "soul_id": soul_id,
         "new_location": loc.display_name,
         "privacy": loc.system_modifiers.get("privacy_gate", "Public"),
         "description": loc.description
-    }
\ No newline at end of file
+    }
+
+BATCH_MOVE_MAX = 100
+
+class MoveItem(BaseModel):
+    soul_id: str
+    location_id: str
+
+class BatchMoveRequest(BaseModel):
+    moves: List[MoveItem] = []           # Each soul to its own destination...
+    soul_ids: List[str] = []             # ...and/or a whole party to `location_id`
+    location_id: Optional[str] = None
+    all_or_nothing: bool = False         # One refusal and nobody moves
+
+@router.post("/move/batch")
+async def move_many_souls(
+    request: BatchMoveRequest,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Move several souls in one transaction (same Gatekeeper rules as /move).
+    Always answers 200 with one result per soul, in request order.
+    """
+    if request.soul_ids and not request.location_id:
+        raise HTTPException(status_code=400, detail="A party move needs a location_id.")
+    moves = [(m.soul_id, m.location_id) for m in request.moves]
+    moves += [(soul_id, request.location_id) for soul_id in request.soul_ids]
+
+    if not moves:
+        raise HTTPException(status_code=400, detail="Nothing to move.")
+    if len(moves) > BATCH_MOVE_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MOVE_MAX} souls per batch.")
+    if len({soul_id for soul_id, _ in moves}) < len(moves):
+        raise HTTPException(status_code=400, detail="Each soul can only move once per batch.")
+
+    manager = LocationManager(session.bind)
+    results = await manager.move_many(user.user_id, moves, all_or_nothing=request.all_or_nothing)
+
+    return {
+        "moved": sum(1 for r in results if r.ok),
+        "results": [
+            {
+                "soul_id": r.soul_id,
+                "location_id": r.location_id,
+                "status": "moved" if r.ok else "refused",
+                "new_location": r.location.display_name if r.location else None,
+                "message": r.message
+            }
+            for r in results
+        ]
+    }
@@ -0,0 +1,203 @@
+# /backend/app/api/realtime.py
+# /version.py
+# /_dev/
+
+# "Are you still there?"
+# - Turret - Portal
+
+"""
+THE LIVE LINE: one WebSocket per device, multiplexing chat and world-state push.
+
+    ws://<host>/api/v1/ws        (auth: X-User-Id header, or ?user_id= where headers can't be set)
+
+Client -> server (JSON text frames):
+    {"type": "chat.send", "id": "<your ref>", "soul_id": "aria", "message": "hi"}
+    {"type": "ping"} | {"type": "pong"}
+Server -> client:
+    {"type": "hello", "conn_id": 7, "heartbeat_seconds": 20, "idle_timeout_seconds": 60}
+    {"type": "chat.token", "id": ..., "text": ...}            (streamed)
+    {"type": "chat.reply", "id": ..., "response": ..., <ChatResponse fields>}
+    {"type": "chat.error", "id": ..., "status": 429, "detail": ..., "retry_after": 12}
+    {"type": "event", "event": "soul.moved" | "relationship.tier" | "energy.updated", "data": {...}}
+    {"type": "ping"} | {"type": "pong"} | {"type": "error", "detail": ...}
+
+Answer pings (any frame counts as a sign of life). Close codes: 4401 no user id,
+4404 unknown user, 4429 too many devices, 4408 idle timeout, 1013 too slow to keep up
+(reconnect, then catch up with /sync/dashboard?since=).
+"""
+
+import asyncio
+import json
+import logging
+from typing import Set
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.api.chat import _final_state, _load_turn_context
+from backend.app.core.config import settings
+from backend.app.database.session import async_engine
+from backend.app.logic.brain import PhoenixBrain
+from backend.app.services.energy import EnergyService
+from backend.app.services.realtime import SLOW_CONSUMER, WS_FRAMES, Connection, hub
+from backend.app.services.user_cache import user_cache
+
+router = APIRouter(prefix="/ws", tags=["Legion Engine - Realtime"])
+logger = logging.getLogger("LegionEngine")
+
+NO_USER = 4401
+UNKNOWN_USER = 4404
+IDLE_TIMEOUT = 4408
+TOO_MANY = 4429
+MESSAGE_MAX_CHARS = 4000
+
+
+def _chat_error(ref, status: int, detail: str, retry_after=None) -> dict:
+    frame = {"type": "chat.error", "id": ref, "status": status, "detail": detail}
+    if retry_after is not None:
+        frame["retry_after"] = int(retry_after)
+    return frame
+
+
+async def _chat_turn(conn: Connection, ref, soul_id: str, message: str):
+    """Same turn as POST /chat/stream, with tokens pushed down the socket."""
+    user_id = conn.user_id
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        try:
+            charge = await EnergyService.admit(session, user_id)
+        except HTTPException as e:
+            conn.push(_chat_error(ref, e.status_code, e.detail, (e.headers or {}).get("Retry-After")))
+            return
+
+        try:
+            ctx = await _load_turn_context(session, user_id, soul_id)
+        except HTTPException as e:
+            await EnergyService.refund(async_engine, charge)
+            conn.push(_chat_error(ref, e.status_code, e.detail))
+            return
+        ctx.energy_charge = charge
+        final_state = _final_state(soul_id, ctx.rel)
+
+        parts = []
+        try:
+            async for token in PhoenixBrain(async_engine).generate_response_stream(
+                user_id=user_id, soul_id=soul_id, user_input=message, context=ctx
+            ):
+                parts.append(token)
+                await conn.send({"type": "chat.token", "id": ref, "text": token})
+        except asyncio.TimeoutError:
+            # The client stopped reading mid-reply: drop it, it will resync
+            await EnergyService.refund(async_engine, charge)
+            conn.abort(SLOW_CONSUMER)
+            return
+        except asyncio.CancelledError:
+            await EnergyService.refund(async_engine, charge)
+            raise
+        except Exception as e:
+            logger.error(f"Phoenix Socket Error: {e}")
+            await EnergyService.refund(async_engine, charge)
+            conn.push(_chat_error(ref, 500, f"Neural Link Failure: {str(e)}"))
+            return
+
+    conn.push({"type": "chat.reply", "id": ref, **final_state, "response": "".join(parts)})
+
+
+async def _heartbeat(conn: Connection):
+    while not conn.closed.is_set():
+        await asyncio.sleep(settings.ws_heartbeat_seconds)
+        conn.push({"type": "ping"})
+
+
+def _handle_frame(conn: Connection, raw: str, turns: Set[asyncio.Task]):
+    try:
+        frame = json.loads(raw)
+        kind = frame.get("type")
+    except (ValueError, AttributeError):
+        conn.push({"type": "error", "detail": "Frames must be JSON objects."})
+        return
+    WS_FRAMES.inc(direction="in", type=kind if kind in ("ping", "pong", "chat.send") else "other")
+
+    if kind == "ping":
+        conn.push({"type": "pong"})
+    elif kind == "pong":
+        pass  # Receiving it already reset the idle timer
+    elif kind == "chat.send":
+        ref, soul_id, message = frame.get("id"), frame.get("soul_id"), frame.get("message")
+        if not isinstance(soul_id, str) or not isinstance(message, str) or not message.strip():
+            conn.push(_chat_error(ref, 422, "chat.send needs a soul_id and a message."))
+        elif len(message) > MESSAGE_MAX_CHARS:
+            conn.push(_chat_error(ref, 413, f"Messages are capped at {MESSAGE_MAX_CHARS} characters."))
+        elif len(turns) >= settings.ws_max_turns_in_flight:
+            conn.push(_chat_error(ref, 429, "Too many replies in flight on this connection.", 1))
+        else:
+            task = asyncio.get_running_loop().create_task(_chat_turn(conn, ref, soul_id, message))
+            turns.add(task)
+            task.add_done_callback(turns.discard)
+    else:
+        conn.push({"type": "error", "detail": f"Unknown frame type: {kind!r}"})
+
+
+async def _read_loop(websocket: WebSocket, conn: Connection, turns: Set[asyncio.Task]):
+    """Reads frames until the client leaves, goes quiet, or the connection is aborted."""
+    closed = asyncio.ensure_future(conn.closed.wait())
+    try:
+        while True:
+            receive = asyncio.ensure_future(websocket.receive_text())
+            done, _ = await asyncio.wait(
+                {receive, closed}, timeout=settings.ws_idle_timeout_seconds, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receive not in done:
+                receive.cancel()
+                if not done:
+                    conn.abort(IDLE_TIMEOUT)
+                return
+            try:
+                raw = receive.result()
+            except (WebSocketDisconnect, RuntimeError):
+                return
+            _handle_frame(conn, raw, turns)
+    finally:
+        closed.cancel()
+
+
+@router.websocket("")
+async def session_channel(websocket: WebSocket):
+    user_id = websocket.headers.get("x-user-id") or websocket.query_params.get("user_id")
+    if not user_id:
+        await websocket.close(code=NO_USER)
+        return
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        user = await user_cache.aget(session, user_id)
+    if not user:
+        await websocket.close(code=UNKNOWN_USER)
+        return
+    if hub.connections_for(user_id) >= settings.ws_max_connections_per_user:
+        await websocket.close(code=TOO_MANY)
+        return
+
+    await websocket.accept()
+    conn = Connection(websocket, user_id, settings.ws_send_queue_size)
+    conn.start()
+    hub.register(conn)
+    conn.push({
+        "type": "hello",
+        "conn_id": conn.conn_id,
+        "heartbeat_seconds": settings.ws_heartbeat_seconds,
+        "idle_timeout_seconds": settings.ws_idle_timeout_seconds
+    })
+    heartbeat = asyncio.get_running_loop().create_task(_heartbeat(conn))
+    turns: Set[asyncio.Task] = set()
+    try:
+        await _read_loop(websocket, conn, turns)
+    finally:
+        hub.unregister(conn)
+        heartbeat.cancel()
+        for task in list(turns):
+            task.cancel()
+        await asyncio.gather(heartbeat, *turns, return_exceptions=True)
+        await conn.shutdown()
+        if conn.close_code is not None:
+            try:
+                await websocket.close(code=conn.close_code)
+            except Exception:
+                pass  # Already gone
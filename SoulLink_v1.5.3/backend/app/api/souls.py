@@ -2,46 +2,119 @@
 # version.py
 # _dev/
 
+import base64
 import logging
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, col
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.database.session import get_session
 from backend.app.models.soul import Soul
 from backend.app.models.user import User
 from backend.app.models.relationship import SoulRelationship
 from backend.app.api.dependencies import get_current_user 
-from typing import Optional # Ensure this is imported
+from backend.app.core import conditional, tracing
+from backend.app.services.assets import portrait_pipeline
+from backend.app.services.blueprints import blueprint_cache
+from backend.app.services.presence import presence
+from backend.app.services.search import search_terms, soul_search
+from typing import List, Optional # Ensure this is imported
 
 router = APIRouter(prefix="/souls", tags=["Legion Engine - Souls"])
 logger = logging.getLogger("LegionEngine")
 
+EXPLORE_PAGE_MAX = 100
+
+def _decode_cursor(cursor: Optional[str]) -> int:
+    """
+    Opaque page cursor -> row offset. This is an OFFSET cursor, not a keyset: pages cost
+    O(offset) and shift if souls are added or removed mid-scroll (ranked search results
+    have no stable key to seek from). Fine for a catalogue this size.
+    """
+    if not cursor:
+        return 0
+    try:
+        return max(0, int(base64.urlsafe_b64decode(cursor.encode()).decode()))
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(400, detail="Invalid cursor.")
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+async def _explore_page(db: AsyncSession, q: Optional[str], limit: int, offset: int) -> List[str]:
+    """Soul ids for one page (limit + 1 rows, to detect a next page), best match first."""
+    terms = search_terms(q)
+    if terms:
+        ranked = await soul_search.search(db, terms, limit + 1, offset)
+        if ranked is not None:
+            return ranked
+
+    # Browse (no searchable words) or no index on this backend: alphabetical, ILIKE-filtered
+    statement = select(Soul.soul_id)
+    if terms:
+        statement = statement.where(
+            (col(Soul.name).ilike(f"%{q}%")) | 
+            (col(Soul.archetype).ilike(f"%{q}%"))
+        )
+    statement = statement.order_by(Soul.name, Soul.soul_id).offset(offset).limit(limit + 1)
+    return list((await db.exec(statement)).all())
+
 @router.get("/explore")
-def explore_souls(
+async def explore_souls(
+    request: Request,
+    response: Response,
     q: Optional[str] = None, 
+    limit: int = 50,
+    cursor: Optional[str] = None,
     user: User = Depends(get_current_user), 
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_session)
 ):
+    """
+    THE SCOUT: Browse the catalogue, or search it with `q` (name, archetype, summary,
+    personality & pillars; prefix matching, best match first).
+    Pages hold `limit` souls; pass the `X-Next-Cursor` header back as `cursor` for the next one
+    (an opaque offset cursor: a catalogue edit mid-scroll can shift a page by a few souls).
+    Supports `If-None-Match` per page.
+    """
+    limit = max(1, min(limit, EXPLORE_PAGE_MAX))
+    offset = _decode_cursor(cursor)
     try:
         # 1. Get existing links
         linked_statement = select(SoulRelationship).where(
             SoulRelationship.user_id == user.user_id
         )
-        relationships = db.exec(linked_statement).all()
+        relationships = (await db.exec(linked_statement)).all()
         linked_dict = {rel.soul_id: rel for rel in relationships}
 
-        # 2. Search Query
-        statement = select(Soul)
-        if q:
-            statement = statement.where(
-                (col(Soul.name).ilike(f"%{q}%")) | 
-                (col(Soul.archetype).ilike(f"%{q}%"))
-            )
-        
-        all_souls = db.exec(statement).all()
+        # 2. Search Query (ids in rank order, then blueprints from the shared cache)
+        with tracing.span("souls.search", query=bool(q), offset=offset) as span:
+            page_ids = await _explore_page(db, q, limit, offset)
+            span.set(hits=len(page_ids))
+        next_cursor = None
+        if len(page_ids) > limit:
+            page_ids = page_ids[:limit]
+            next_cursor = _encode_cursor(offset + limit)
+
+        souls = await blueprint_cache.aget_souls(db.bind, page_ids)
+        all_souls = [souls[sid] for sid in page_ids if sid in souls]
+
+        # 🏷️ Same page, same blueprints, same link state -> 304
+        etag = conditional.make_etag(
+            "explore", user.user_id, q, limit, offset, next_cursor, portrait_pipeline.digest,
+            [(s.soul_id, blueprint_cache.fingerprint(Soul, s.soul_id, s)) for s in all_souls],
+            sorted((r.soul_id, r.intimacy_tier, r.current_location) for r in relationships)
+        )
+        not_modified = conditional.check(request, response, etag)
+        if not_modified:
+            if next_cursor:
+                not_modified.headers["X-Next-Cursor"] = next_cursor
+            return not_modified
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         output = []
         for s in all_souls:
             rel = linked_dict.get(s.soul_id)
+            portrait = s.portrait_url or s.meta_data.get("portrait_full") or f"/assets/images/souls/{s.soul_id}_01.jpeg"
             
             soul_data = {
                 "id": s.soul_id,
@@ -49,8 +122,9 @@ def explore_souls(
                 "tagline": s.summary[:100] + "..." if len(s.summary) > 100 else s.summary,
                 "archetype": s.archetype or "Unknown",
                 "is_linked": rel is not None,
-                # ✅ FIX: Read directly from the DB source of truth
-                "portrait_url": s.portrait_url or s.meta.get("portrait_full") or f"/assets/images/souls/{s.soul_id}_01.jpeg",
+                # ✅ FIX: Read directly from the DB source of truth (served as its hashed variant)
+                "portrait_url": portrait_pipeline.url(portrait),
+                "portraits": portrait_pipeline.variants(portrait),
             }
             
             if rel:
@@ -66,19 +140,32 @@ def explore_souls(
         raise HTTPException(status_code=500, detail="Failed to scout for souls.")
 
 @router.get("/{soul_id}")
-def get_soul_details(soul_id: str, db: Session = Depends(get_session)):
-    """Get detailed public profile info."""
-    soul = db.get(Soul, soul_id)
+async def get_soul_details(
+    soul_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_session)
+):
+    """Get detailed public profile info (conditional: `If-None-Match` -> 304)."""
+    soul = await blueprint_cache.aget_soul(db.bind, soul_id)
     if not soul:
         raise HTTPException(404, detail=f"Soul {soul_id} not found.")
+
+    etag = conditional.make_etag(
+        "soul", soul_id, blueprint_cache.fingerprint(Soul, soul_id, soul), portrait_pipeline.digest
+    )
+    not_modified = conditional.check(request, response, etag, cache_control=conditional.PUBLIC)
+    if not_modified:
+        return not_modified
     
     return {
         "id": soul.soul_id,
         "name": soul.name,
         "summary": soul.summary,
         "archetype": soul.archetype,
-        "portrait_url": soul.portrait_url, # ✅ Sending the face
-        "home_base": soul.home_base,       # ✅ Sending the home district
+        "portrait_url": portrait_pipeline.url(soul.portrait_url), # ✅ Sending the face
+        "portraits": portrait_pipeline.variants(soul.portrait_url),
+        "home_base": soul.spawn_location,  # ✅ Sending the home district
         "appearance": soul.aesthetic_pillar.get("description", ""),
         "voice_style": soul.aesthetic_pillar.get("voice_style", ""),
         "signature_emote": soul.aesthetic_pillar.get("signature_emote", "")
@@ -88,19 +175,19 @@ def get_soul_details(soul_id: str, db: Session = Depends(get_session)):
 async def link_with_soul(
     soul_id: str,
     user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Initialize a relationship with a soul."""
-    soul = session.get(Soul, soul_id)
+    soul = await blueprint_cache.aget_soul(session.bind, soul_id)
     if not soul:
         raise HTTPException(404, detail=f"Soul {soul_id} not found.")
     
-    existing = session.exec(
+    existing = (await session.exec(
         select(SoulRelationship).where(
             SoulRelationship.user_id == user.user_id,
             SoulRelationship.soul_id == soul_id
         )
-    ).first()
+    )).first()
     
     if existing:
         return {
@@ -128,8 +215,9 @@ async def link_with_soul(
         new_rel.nsfw_unlocked = True 
     
     session.add(new_rel)
-    session.commit()
-    session.refresh(new_rel)
+    await session.commit()
+    await session.refresh(new_rel)
+    presence.record_link(user.user_id, soul_id, start_loc, new_rel.change_version)
     
     return {
         "status": "linked",
@@ -145,15 +233,15 @@ async def link_with_soul(
 async def get_relationship_status(
     soul_id: str,
     user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Check your current relationship status with a soul."""
-    rel = session.exec(
+    rel = (await session.exec(
         select(SoulRelationship).where(
             SoulRelationship.user_id == user.user_id,
             SoulRelationship.soul_id == soul_id
         )
-    ).first()
+    )).first()
     
     if not rel:
         raise HTTPException(404, detail=f"No relationship with {soul_id}.")
@@ -2,51 +2,120 @@
 # /version.py v1.5.3-P
 
 import logging
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.database.session import get_session
 from backend.app.api.dependencies import get_current_user
+from backend.app.core import conditional, responses
 from backend.app.models.relationship import SoulRelationship
 from backend.app.models.soul import Soul
 from backend.app.models.user import User
+from backend.app.services.assets import portrait_pipeline
+from backend.app.services.blueprints import blueprint_cache
+from backend.app.services.changes import change_clock
 
 router = APIRouter(prefix="/sync", tags=["Legion Engine - Sync"])
 logger = logging.getLogger("LegionEngine")
 
+def _soul_state(rel: SoulRelationship, soul: Soul) -> dict:
+    return {
+        "soul_id": rel.soul_id,
+        "name": soul.name,
+        "archetype": soul.archetype,
+        "portrait_url": portrait_pipeline.url(soul.portrait_url), # ✅ Added for Dashboard UI
+        "portraits": portrait_pipeline.variants(soul.portrait_url),  # {size: {jpeg, webp}}
+        "tier": rel.intimacy_tier,
+        "location": rel.current_location,
+        "last_interaction": rel.last_interaction.isoformat() if rel.last_interaction else None,
+        "is_architect": rel.is_architect,
+        "nsfw_unlocked": rel.nsfw_unlocked
+    }
+
 @router.get("/dashboard")
 async def get_full_state(
+    request: Request,
+    response: Response,
+    since: Optional[str] = None,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     THE PULSE: Fetches world-state with portrait data.
+    Send the last `ETag` as `If-None-Match`; an unchanged pulse is an empty 304.
+
+    Delta mode: every response carries an `X-Sync-Cursor` header. Pass it back as
+    `since` to receive only the links that changed after it (`"delta": true`, full
+    snapshots per soul; upsert them by soul_id), plus the next `cursor`.
+    An unknown cursor is a 400: drop it and do a full sync.
     """
-    statement = (
-        select(SoulRelationship, Soul)
-        .select_from(SoulRelationship)
-        .join(Soul, SoulRelationship.soul_id == Soul.soul_id) 
-        .where(SoulRelationship.user_id == user.user_id)
+    since_version = None
+    if since is not None:
+        since_version = change_clock.decode(since)
+        if since_version is None:
+            raise HTTPException(status_code=400, detail="Invalid sync cursor. Drop it and do a full sync.")
+
+    # Taken before reading, so nothing committed after the read can hide behind it
+    cursor = change_clock.encode(change_clock.horizon(since_version or 0))
+
+    statement = select(SoulRelationship).where(SoulRelationship.user_id == user.user_id)
+    if since_version is not None:
+        statement = statement.where(SoulRelationship.change_version > since_version)  # Rides ix_relationships_user_changes
+    relationships = (await session.exec(statement)).all()
+
+    # Soul blueprints come from the shared cache instead of a per-poll JOIN
+    souls = await blueprint_cache.aget_souls(session.bind, [rel.soul_id for rel in relationships])
+
+    if since_version is not None:
+        response.headers["X-Sync-Cursor"] = cursor
+        changed = [_soul_state(rel, souls[rel.soul_id]) for rel in relationships if rel.soul_id in souls]
+        return responses.respond({
+            "user_id": user.user_id,
+            "username": user.username,
+            "display_name": user.display_name,
+            "delta": True,
+            "cursor": cursor,
+            "active_souls": changed
+        }, response)
+
+    # 🏷️ Validators: the profile, the link columns shown below, and each soul's blueprint hash
+    etag = conditional.make_etag(
+        "dashboard", user.user_id, user.username, user.display_name, portrait_pipeline.digest,
+        sorted(
+            (rel.soul_id, rel.intimacy_tier, rel.current_location, rel.last_interaction,
+             rel.is_architect, rel.nsfw_unlocked,
+             blueprint_cache.fingerprint(Soul, rel.soul_id, souls.get(rel.soul_id)))
+            for rel in relationships
+        )
     )
-    results = session.exec(statement).all()
-    
-    soul_states = []
-    for rel, soul in results:
-        soul_states.append({
-            "soul_id": rel.soul_id,
-            "name": soul.name,
-            "archetype": soul.archetype,
-            "portrait_url": soul.portrait_url, # ✅ Added for Dashboard UI
-            "tier": rel.intimacy_tier,
-            "location": rel.current_location,
-            "last_interaction": rel.last_interaction.isoformat() if rel.last_interaction else None,
-            "is_architect": rel.is_architect,
-            "nsfw_unlocked": rel.nsfw_unlocked
-        })
-        
-    return {
+    last_seen = max((rel.last_interaction for rel in relationships if rel.last_interaction), default=None)
+    not_modified = conditional.check(request, response, etag, last_modified=last_seen)
+    if not_modified:
+        not_modified.headers["X-Sync-Cursor"] = cursor
+        return not_modified
+    response.headers["X-Sync-Cursor"] = cursor
+
+    # Orphaned links are skipped, matching the old inner JOIN
+    soul_states = [_soul_state(rel, souls[rel.soul_id]) for rel in relationships if rel.soul_id in souls]
+
+    return responses.respond({
         "user_id": user.user_id,
         "username": user.username,
         "display_name": user.display_name,
         "active_souls": soul_states,
         "total_links": len(soul_states)
-    }
\ No newline at end of file
+    }, response)
+
+@router.get("/manifest")
+async def get_asset_manifest(request: Request, response: Response):
+    """
+    THE ATLAS: Every portrait variant (size -> format -> url, width, height, bytes),
+    keyed by the original portrait URL. Variant URLs are content-hashed and cached
+    forever, so clients can prefetch them once per `digest`.
+    """
+    etag = conditional.make_etag("manifest", portrait_pipeline.digest)
+    not_modified = conditional.check(request, response, etag, cache_control=conditional.PUBLIC)
+    if not_modified:
+        return not_modified
+    return responses.respond(portrait_pipeline.manifest(), response)
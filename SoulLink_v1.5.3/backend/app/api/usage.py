@@ -0,0 +1,81 @@
+# /backend/app/api/usage.py
+# /version.py
+# /_dev/
+
+# "You require more vespene gas."
+# - StarCraft
+
+from datetime import date, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.app.database.session import get_session
+from backend.app.models.usage import TokenUsageDaily
+from backend.app.models.user import User
+from backend.app.api.dependencies import get_current_user
+
+router = APIRouter(prefix="/usage", tags=["Legion Engine - Usage"])
+
+GROUP_COLUMNS = {
+    "soul": TokenUsageDaily.soul_id,
+    "user": TokenUsageDaily.user_id,
+    "day": TokenUsageDaily.day,
+}
+
+@router.get("/rollup")
+async def get_usage_rollup(
+    group_by: Literal["soul", "user", "day"] = "soul",
+    days: int = 7,
+    soul_id: Optional[str] = None,
+    limit: int = 50,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    THE LEDGER: Token spend per soul / user / day over the last `days` days,
+    most expensive first. Architect-only.
+    """
+    if user.account_tier != "architect":
+        raise HTTPException(403, detail="The ledger is for Architects only.")
+
+    key = GROUP_COLUMNS[group_by]
+    since = date.today() - timedelta(days=max(days, 1) - 1)
+
+    statement = (
+        select(
+            key,
+            func.sum(TokenUsageDaily.turns),
+            func.sum(TokenUsageDaily.prompt_tokens),
+            func.sum(TokenUsageDaily.completion_tokens),
+            func.sum(TokenUsageDaily.total_tokens),
+            func.sum(TokenUsageDaily.llm_ms),
+        )
+        .where(TokenUsageDaily.day >= since)
+        .group_by(key)
+        .order_by(func.sum(TokenUsageDaily.total_tokens).desc())
+        .limit(min(limit, 500))
+    )
+    if soul_id:
+        statement = statement.where(TokenUsageDaily.soul_id == soul_id)
+
+    rows = (await session.exec(statement)).all()
+
+    return {
+        "group_by": group_by,
+        "since": since.isoformat(),
+        "rows": [
+            {
+                group_by: k.isoformat() if isinstance(k, date) else k,
+                "turns": turns,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": total,
+                # Avg prompt size per turn is the "how bloated is this soul" number
+                "avg_prompt_tokens": round(prompt / turns, 1) if turns else 0,
+                "avg_llm_ms": round(llm_ms / turns, 1) if turns else 0
+            }
+            for k, turns, prompt, completion, total, llm_ms in rows
+        ]
+    }
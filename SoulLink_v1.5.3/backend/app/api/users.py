@@ -2,7 +2,8 @@
 # /version.py v1.5.3-P
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.database.session import get_session
 from backend.app.models.user import User
 from backend.app.api.dependencies import get_current_user
@@ -45,7 +46,7 @@ class LoginRequest(BaseModel):
 @router.post("/login")
 async def login_user(
     data: LoginRequest, 
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """
     Main entry point. Fetches user or handles Architect recovery.
@@ -53,7 +54,7 @@ async def login_user(
     username_clean = data.username.strip()
     
     statement = select(User).where(User.username == username_clean)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
 
     if not user:
         # 👑 THE ARCHITECT RECOVERY PROTOCOL
@@ -67,8 +68,8 @@ async def login_user(
                 bio="The Creator of Link City."
             )
             session.add(user)
-            session.commit()
-            session.refresh(user)
+            await session.commit()
+            await session.refresh(user)
         else:
             # Tell Flutter to show the registration prompt
             raise HTTPException(404, detail="Identity not found. Registration required.")
@@ -83,13 +84,13 @@ async def login_user(
 @router.post("/register")
 async def register_user(
     registration: UserRegistration,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Registers a new Linker account."""
     if len(registration.username) < 3:
         raise HTTPException(400, detail="Username too short.")
     
-    existing = session.exec(select(User).where(User.username == registration.username)).first()
+    existing = (await session.exec(select(User).where(User.username == registration.username))).first()
     if existing:
         raise HTTPException(409, detail="Username taken.")
     
@@ -103,8 +104,8 @@ async def register_user(
     )
     
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     
     return {"status": "registered", "user_id": new_user.user_id}
 
@@ -117,9 +118,11 @@ async def get_my_profile(user: User = Depends(get_current_user)):
 async def update_profile(
     data: UserUpdate,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """THE MIRROR: Updates user persona data."""
+    # The dependency may hand out a cached snapshot; write through a row this session owns
+    user = await session.get(User, user.user_id)
     if data.display_name is not None:
         user.display_name = data.display_name
     if data.bio is not None:
@@ -130,8 +133,8 @@ async def update_profile(
         user.age = data.age
     
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     
     return {
         "status": "Identity Synchronized",
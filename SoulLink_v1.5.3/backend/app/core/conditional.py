@@ -0,0 +1,75 @@
+# /backend/app/core/conditional.py
+# /version.py
+# /_dev/
+
+# "Nothing has changed. Nothing ever changes."
+# - Kreia - Star Wars: Knights of the Old Republic II
+
+"""
+Conditional GET
+Polled read endpoints build an ETag from cheap validators (blueprint fingerprints,
+the few relationship columns the view depends on, the query parameters) BEFORE
+rendering anything. A matching `If-None-Match` gets an empty 304 straight away:
+
+    etag = conditional.make_etag("map", user.user_id, rows, fingerprint)
+    not_modified = conditional.check(request, response, etag)
+    if not_modified:
+        return not_modified
+
+Validators hash content rather than process-local counters, so every worker agrees
+on them. `Last-Modified` is informational only (moves don't touch last_interaction),
+which is why `If-Modified-Since` is not used to answer 304s.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from backend.app.core import responses
+
+PRIVATE = "private, no-cache"  # Per-user views: browsers may keep them, but must revalidate
+PUBLIC = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over any JSON-able validator parts (datetimes allowed), per wire format."""
+    blob = json.dumps((responses.wire_format(),) + parts, sort_keys=True, separators=(",", ":"), default=str)
+    return '"%s"' % hashlib.blake2b(blob.encode(), digest_size=12).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)  # Timestamps are stored as naive UTC
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def check(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = PRIVATE
+) -> Optional[Response]:
+    """Returns the 304 to send when the client is up to date; otherwise stamps the validators on `response`."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,19 +1,138 @@
 # /backend/app/core/config.py
 
 import os
+from typing import Dict, Optional
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+class EnergyTier(BaseModel):
+    """Admission-control knobs for one account_tier."""
+    max_energy: int = 100
+    regen_per_minute: float = 1.0
+    turn_cost: int = 5              # Flat cost charged before each chat turn
+    tokens_per_point: int = 0       # >0: extra 1 energy per N tokens, settled after the turn
+    unlimited: bool = False
+
 class Settings(BaseSettings):
     # App Identity (Linked to your version.py)
     app_name: str = "SoulLink"
     
     # Secrets
-    groq_api_key: str
+    groq_api_key: str = ""  # Only required when llm_provider == "groq"
     database_url: str
+    # Request handlers use an async driver; derived from database_url unless set
+    # (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    async_database_url: Optional[str] = None
     
     # Flags
     debug: bool = False
 
+    # 🏊 Connection pool (None = per-backend preset; size it to the worker count)
+    # Postgres preset: 10 + 20 overflow, pre-ping, recycle after 30 min. SQLite file: 5 + 10.
+    db_pool_size: Optional[int] = None
+    db_max_overflow: Optional[int] = None
+    db_pool_timeout: float = 30.0                # Seconds to wait for a free connection
+    db_pool_recycle: Optional[int] = None        # Seconds; guards against server-side idle kills
+    db_pool_pre_ping: Optional[bool] = None
+
+    # 🪶 SQLite performance mode (small nodes): WAL lets readers run alongside the writer
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"           # Safe with WAL; FULL for paranoid durability
+    sqlite_busy_timeout_ms: int = 5000           # Wait for the write lock instead of "database is locked"
+    sqlite_cache_size_kib: int = 20000
+
+    # 🧠 LLM Provider ("groq" for the real thing, "fake" for offline load tests)
+    llm_provider: str = "groq"
+    llm_model: str = "llama-3.3-70b-versatile"
+
+    # 🧪 Fake provider tuning (ignored unless llm_provider == "fake")
+    fake_llm_latency_ms: float = 300.0          # Median time-to-first-token
+    fake_llm_latency_jitter_ms: float = 100.0   # Spread around the median
+    fake_llm_latency_distribution: str = "normal"  # constant | uniform | normal | lognormal
+    fake_llm_tokens_per_second: float = 80.0
+    fake_llm_error_rate: float = 0.0            # 0.0 - 1.0
+    fake_llm_seed: Optional[int] = None
+
+    # 📚 Blueprint cache (Souls & Locations)
+    blueprint_cache_size: int = 512
+    blueprint_cache_ttl_seconds: float = 300.0
+
+    # 👤 Authenticated-user cache (get_current_user); unknown IDs are cached too, briefly
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: float = 30.0
+    user_cache_negative_ttl_seconds: float = 5.0
+
+    # 🔎 Soul search (FTS5 on SQLite, tsvector on Postgres; off = ILIKE scan)
+    search_index_enabled: bool = True
+
+    # 🧾 Compiled system-prompt memo (keyed by soul, tier, location, architect)
+    prompt_cache_size: int = 1024
+
+    # 📜 History window & rolling memory
+    history_token_budget: int = 1500      # Tokens of raw history (incl. memory summary) per prompt
+    history_fetch_limit: int = 60         # Max recent rows considered for the window
+    summary_max_tokens: int = 250         # Size cap for the rolling summary
+    summary_min_new_messages: int = 6     # Fold in batches, not one message at a time
+    summary_batch_size: int = 40          # Messages folded per summarizer call
+
+    # 🧊 Hot/cold conversation archival (background job)
+    archive_enabled: bool = False
+    archive_after_days: int = 30          # Messages older than this go cold...
+    archive_keep_last: int = 500          # ...as does anything beyond the newest K per thread
+    archive_interval_seconds: float = 300.0
+    archive_threads_per_run: int = 50
+    archive_chunk_size: int = 500         # Messages per compressed chunk
+
+    # ✍️ Write-behind chat persistence (off = write every turn before replying)
+    write_behind_enabled: bool = False
+    write_behind_max_batch: int = 200            # Flush as soon as this many turns are queued
+    write_behind_flush_interval_ms: float = 250.0  # ...or at least this often
+    write_behind_max_queue: int = 10000          # Beyond this, requests write inline (backpressure)
+
+    # ⚡ Energy admission control (per account_tier; unknown tiers fall back to "free")
+    energy_enabled: bool = True
+    energy_tiers: Dict[str, EnergyTier] = {
+        "free": EnergyTier(max_energy=100, regen_per_minute=1.0, turn_cost=5),
+        "premium": EnergyTier(max_energy=500, regen_per_minute=5.0, turn_cost=5),
+        "architect": EnergyTier(unlimited=True),
+    }
+
+    # 🔄 Delta sync (/sync/dashboard?since=): cursors trail the clock by this much so
+    # writes still committing are never skipped (they are re-sent instead)
+    sync_delta_window_seconds: float = 5.0
+
+    # 🗺️ Presence index (which souls are where; per-user maps + global occupancy view)
+    presence_cache_size: int = 10000              # Users whose location -> souls map is kept
+    presence_occupancy_refresh_seconds: float = 30.0  # Background re-count of souls/users per district
+
+    # 📡 WebSocket session channel (/api/v1/ws)
+    ws_heartbeat_seconds: float = 20.0
+    ws_idle_timeout_seconds: float = 60.0        # No frame from the client (pongs count) -> close
+    ws_send_queue_size: int = 256                # Frames buffered per connection before it counts as slow
+    ws_send_timeout_seconds: float = 10.0        # How long a reply stream waits for a stalled client
+    ws_max_turns_in_flight: int = 2              # Concurrent chat turns per connection
+    ws_max_connections_per_user: int = 5         # Devices per user, per worker
+
+    # 🚀 Response encoding (opt-in): orjson bodies, MessagePack via `Accept`,
+    # gzip/brotli (`Accept-Encoding`) for non-streamed bodies above a size threshold
+    fast_json_enabled: bool = False
+    msgpack_enabled: bool = False                # Needs the msgpack package
+    compression_enabled: bool = False
+    compression_min_bytes: int = 1024            # Smaller bodies aren't worth the CPU
+    gzip_level: int = 6
+    brotli_quality: int = 4                      # Needs the brotli package; 4-5 suits dynamic content
+
+    # 🖼️ Portrait pipeline: hashed, pre-sized JPEG + WebP variants under /assets/v (needs Pillow to resize)
+    portrait_pipeline_enabled: bool = True
+    portrait_sizes: Dict[str, int] = {"thumb": 160, "medium": 480, "full": 1024}  # Longest edge in px
+    portrait_jpeg_quality: int = 82
+    portrait_webp_quality: int = 80
+
+    # 🔍 Request tracing (nested spans per request; 0.0 = off, 1.0 = every request)
+    trace_sample_rate: float = 1.0
+    trace_buffer_size: int = 200                 # Recent traces kept in memory for /core/traces
+    trace_export_path: Optional[str] = None      # Also append finished traces here as JSON lines
+
     # Tell Pydantic to look for a .env file
     model_config = SettingsConfigDict(
         env_file=".env",
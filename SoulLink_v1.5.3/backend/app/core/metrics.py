@@ -0,0 +1,203 @@
+# /backend/app/core/metrics.py
+# /version.py
+# /_dev/
+
+# "Numbers don't lie. People do."
+
+"""
+Metrics (Prometheus text exposition, no extra dependency)
+Counters, gauges and histograms with labels, rendered at GET /metrics.
+Everything here is process-local; scrape each worker.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+THROUGHPUT_BUCKETS = (5, 10, 25, 50, 100, 200, 400, 800)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """A gauge read from a callback at scrape time: fn() -> {label_tuple: value} or a number."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, fn: Callable, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in value.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        lines = self.header()
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, fn, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, fn, labelnames))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# 🌐 HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    "soullink_http_requests_total", "HTTP requests by router, method and status.", ("router", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "soullink_http_request_duration_seconds", "End-to-end request latency (incl. streamed bodies).", ("router",))
+
+# 🗄️ Database
+DB_QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "soullink_db_queries_per_request", "DB statements issued per request.", ("router",), buckets=COUNT_BUCKETS)
+DB_TIME_PER_REQUEST = REGISTRY.histogram(
+    "soullink_db_time_per_request_seconds", "Time spent in DB statements per request.", ("router",))
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "soullink_db_query_duration_seconds", "Latency of individual DB statements.")
+DB_POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "soullink_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0))
+DB_POOL_TIMEOUTS = REGISTRY.counter(
+    "soullink_db_pool_checkout_timeouts_total", "Checkouts that gave up after db_pool_timeout.", ("engine",))
+
+# 🧠 LLM
+LLM_LATENCY = REGISTRY.histogram(
+    "soullink_llm_request_duration_seconds", "Full LLM call latency.", ("provider", "mode"), buckets=LLM_BUCKETS)
+LLM_TTFT = REGISTRY.histogram(
+    "soullink_llm_time_to_first_token_seconds", "Time to first streamed token.", ("provider",), buckets=LLM_BUCKETS)
+LLM_TOKENS = REGISTRY.counter(
+    "soullink_llm_tokens_total", "Tokens processed by the LLM.", ("provider", "kind"))
+LLM_THROUGHPUT = REGISTRY.histogram(
+    "soullink_llm_output_tokens_per_second", "Completion tokens per second of generation.", ("provider",),
+    buckets=THROUGHPUT_BUCKETS)
+LLM_ERRORS = REGISTRY.counter(
+    "soullink_llm_errors_total", "Failed LLM calls.", ("provider",))
+
+# Router label whitelist keeps cardinality bounded
+KNOWN_ROUTERS = {"chat", "map", "souls", "sync", "users", "core", "usage"}
+
+
+def router_label(path: str) -> str:
+    """'/api/v1/chat/send' -> 'chat'. Anything unexpected collapses to a fixed bucket."""
+    parts = path.strip("/").split("/")
+    if len(parts) >= 3 and parts[0] == "api" and parts[1] == "v1":
+        return parts[2] if parts[2] in KNOWN_ROUTERS else "other"
+    if parts and parts[0] in ("assets", "metrics", "docs", "openapi.json"):
+        return parts[0]
+    return "root" if parts == [""] else "other"
+
+
+def observe_llm(provider: str, mode: str, latency_s: float, prompt_tokens: int, completion_tokens: int,
+                ttft_s: Optional[float] = None):
+    LLM_LATENCY.observe(latency_s, provider=provider, mode=mode)
+    LLM_TOKENS.inc(prompt_tokens, provider=provider, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, provider=provider, kind="completion")
+    if ttft_s is not None:
+        LLM_TTFT.observe(ttft_s, provider=provider)
+    generation_s = latency_s - (ttft_s or 0.0)
+    if completion_tokens and generation_s > 0:
+        LLM_THROUGHPUT.observe(completion_tokens / generation_s, provider=provider)
@@ -0,0 +1,183 @@
+# /backend/app/core/middleware.py
+# /version.py
+# /_dev/
+
+# "Wake up, Mr. Freeman. Wake up and smell the ashes."
+# - G-Man - Half-Life 2
+
+import gzip
+import time
+
+from backend.app.core import metrics, responses
+from backend.app.core.config import settings
+from backend.app.core.tracing import tracer
+from backend.app.database.session import start_query_tracking
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli (gzip only without it)
+    brotli = None
+
+COMPRESSIBLE = (b"application/json", b"application/msgpack", b"text/", b"application/javascript", b"image/svg+xml")
+
+
+class QueryCountMiddleware:
+    """
+    Pure ASGI middleware: counts DB round trips per request and reports them as
+    `X-DB-Queries` / `X-DB-Time-Ms` response headers.
+    (Streamed bodies report what happened before the first byte.)
+
+    Also feeds /metrics: per-router request counts, latency and DB usage,
+    measured once the full body (including streams) has been sent.
+    Sampled requests get a root trace span and an `X-Trace-Id` header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = start_query_tracking()
+        router = metrics.router_label(scope.get("path", ""))
+        started = time.perf_counter()
+        status = {"code": 500}
+        trace = None
+        if router != "metrics":
+            trace = tracer.start_trace(
+                f"{scope.get('method', '')} {scope.get('path', '')}", router=router
+            )
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_ms:.2f}".encode()))
+                if trace is not None:
+                    headers.append((b"x-trace-id", trace.trace_id.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            if router != "metrics":
+                metrics.HTTP_REQUESTS.inc(router=router, method=scope.get("method", ""), status=str(status["code"]))
+                metrics.HTTP_LATENCY.observe(time.perf_counter() - started, router=router)
+                metrics.DB_QUERIES_PER_REQUEST.observe(stats.count, router=router)
+                metrics.DB_TIME_PER_REQUEST.observe(stats.total_ms / 1000, router=router)
+            if trace is not None:
+                trace.root.set(status=status["code"], db_queries=stats.count, db_ms=round(stats.total_ms, 3))
+                tracer.finish_trace(trace)
+
+
+def _accepted_codings(header: str) -> dict:
+    """Accept-Encoding -> {coding: q}."""
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            codings[coding.strip().lower()] = q
+    return codings
+
+
+def choose_coding(header: str):
+    """Best coding we can produce for this client: br > gzip > None."""
+    if not header:
+        return None
+    codings = _accepted_codings(header)
+    wildcard = codings.get("*", 0.0)
+    if brotli is not None and codings.get("br", wildcard) > 0:
+        return "br"
+    if codings.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=settings.brotli_quality)
+    return gzip.compress(body, compresslevel=settings.gzip_level, mtime=0)
+
+
+class ResponseEncodingMiddleware:
+    """
+    Pure ASGI middleware for the opt-in response fast path:
+      - negotiates the body format from `Accept` (see core/responses.py)
+      - compresses complete bodies >= Settings.compression_min_bytes with br or gzip
+
+    Streamed bodies (SSE, static files) pass through untouched: buffering them would
+    defeat the point. Compressed responses get `Vary: Accept-Encoding` and a weak ETag,
+    since the bytes differ from the identity representation.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = {k.lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        token = responses.set_wire_format(responses.negotiate(headers.get(b"accept", "")))
+        coding = choose_coding(headers.get(b"accept-encoding", "")) if settings.compression_enabled else None
+        try:
+            if coding is None:
+                return await self.app(scope, receive, send)
+            await self.app(scope, receive, self._compressing_send(send, coding))
+        finally:
+            responses.reset_wire_format(token)
+
+    @staticmethod
+    def _compressing_send(send, coding: str):
+        state = {"start": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if state["passthrough"]:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                state["start"] = message  # Held until we've seen the body
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            start, state["passthrough"] = state["start"], True
+            body = message.get("body", b"")
+            response_headers = list(start.get("headers", []))
+            names = {k.lower(): v for k, v in response_headers}
+            eligible = (
+                not message.get("more_body", False)
+                and start["status"] not in (204, 304)
+                and b"content-encoding" not in names
+                and len(body) >= settings.compression_min_bytes
+                and names.get(b"content-type", b"").startswith(COMPRESSIBLE)
+            )
+            if eligible:
+                body = compress(body, coding)
+                rewritten = []
+                for key, value in response_headers:
+                    lower = key.lower()
+                    if lower == b"content-length":
+                        value = str(len(body)).encode()
+                    elif lower == b"etag" and not value.startswith(b"W/"):
+                        value = b"W/" + value
+                    elif lower == b"vary":
+                        continue
+                    rewritten.append((key, value))
+                vary = names.get(b"vary")
+                rewritten.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                rewritten.append((b"content-encoding", coding.encode()))
+                start = {**start, "headers": rewritten}
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        return send_wrapper
@@ -0,0 +1,117 @@
+# /backend/app/core/responses.py
+# /version.py
+# /_dev/
+
+# "Speed is the essence of war."
+# - Sun Tzu (quoted in Civilization)
+
+"""
+Response Encoding
+The app's default response class. With everything off it behaves exactly like
+FastAPI's JSONResponse; the opt-in fast path (Settings) adds:
+  - fast_json_enabled: bodies are encoded with orjson (falls back to json if missing)
+  - msgpack_enabled:   clients sending `Accept: application/msgpack` get MessagePack
+
+The wire format is negotiated once per request by ResponseEncodingMiddleware and read
+here through a ContextVar. Big handlers can also skip FastAPI's jsonable_encoder pass
+entirely with `respond(payload, response)` (plain dicts/lists/str/int/datetime only).
+"""
+
+import json
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
+
+from backend.app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional: pip install msgpack
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+_wire_format: ContextVar[str] = ContextVar("wire_format", default="json")
+
+
+def msgpack_available() -> bool:
+    return settings.msgpack_enabled and msgpack is not None
+
+
+def negotiate(accept: str) -> str:
+    """'msgpack' when the client asked for it (and we can), else 'json'."""
+    if accept and msgpack_available() and any(t in accept for t in MSGPACK_TYPES):
+        return "msgpack"
+    return "json"
+
+
+def wire_format() -> str:
+    return _wire_format.get()
+
+
+def set_wire_format(value: str):
+    return _wire_format.set(value)
+
+
+def reset_wire_format(token):
+    _wire_format.reset(token)
+
+
+def _default(value: Any):
+    """Types neither encoder knows natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        # Explicit signature (not *args): FastAPI's OpenAPI generator inspects `status_code`
+        super().__init__(content, status_code=status_code, headers=headers,
+                         media_type=media_type, background=background)
+        if msgpack_available():
+            self.headers.add_vary_header("Accept")  # Same URL, two representations
+
+    def render(self, content: Any) -> bytes:
+        if wire_format() == "msgpack" and msgpack is not None:
+            self.media_type = MSGPACK
+            return msgpack.packb(content, default=_default, use_bin_type=True)
+        if settings.fast_json_enabled and orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+def respond(content: Any, response: Response):
+    """
+    Returns a ready FastJSONResponse (skipping jsonable_encoder) when the fast path is on,
+    carrying over headers already set on the injected `response`. Otherwise returns
+    `content` untouched and FastAPI does what it always did.
+    """
+    if not (settings.fast_json_enabled or msgpack_available()):
+        return content
+    rendered = FastJSONResponse(content, status_code=response.status_code or 200)
+    for key, value in response.headers.items():
+        if key.lower() not in ("content-length", "content-type"):
+            rendered.headers.append(key, value)
+    return rendered
@@ -0,0 +1,197 @@
+# /backend/app/core/tracing.py
+# /version.py
+# /_dev/
+
+# "Wherever you go, there you are... I've been tracking you."
+# - Sam Fisher - Splinter Cell
+
+"""
+Request Tracing
+Lightweight nested spans (name, timing, attributes) for every sampled request.
+The middleware opens the root span; code anywhere below it adds children with:
+
+    with tracing.span("context.load", soul_id=soul_id) as s:
+        ...
+        s.set(history_len=len(history))
+
+Outside a sampled request `span()` is a no-op, so background jobs pay nothing.
+Finished traces land in an in-memory ring buffer (GET /api/v1/core/traces)
+and, optionally, a JSON-lines file (Settings.trace_export_path).
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from backend.app.core.config import settings
+
+logger = logging.getLogger("LegionEngine")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float = field(default_factory=time.time)
+    duration_ms: Optional[float] = None
+    attributes: Dict[str, object] = field(default_factory=dict)
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def finish(self):
+        if self.duration_ms is None:
+            self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        return self
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+@dataclass
+class Trace:
+    trace_id: str
+    root: Span
+    spans: List[Span] = field(default_factory=list)  # Children, appended as they finish
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start": self.root.start,
+            "duration_ms": self.root.duration_ms,
+            "spans": [self.root.to_dict()] + [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start)]
+        }
+
+
+# Threadpool workers inherit a copy of the context, so spans opened there still nest correctly
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Tracer:
+    """Sampling decision + exporters (ring buffer and optional JSONL file)."""
+
+    def __init__(self, sample_rate: float, buffer_size: int, export_path: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.export_path = export_path
+        self.buffer_size = buffer_size
+        self._recent: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.started = 0
+        self.exported = 0
+        self.export_failures = 0
+
+    def start_trace(self, name: str, **attributes) -> Optional[Trace]:
+        """Opens a root span if this request is sampled. Returns None (tracing off) otherwise."""
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            _current_trace.set(None)
+            _current_span.set(None)
+            return None
+        trace_id = uuid.uuid4().hex
+        trace = Trace(trace_id=trace_id, root=Span(name, trace_id, _new_id(), None, attributes=attributes))
+        _current_trace.set(trace)
+        _current_span.set(trace.root)
+        self.started += 1
+        return trace
+
+    def finish_trace(self, trace: Trace):
+        trace.root.finish()
+        record = trace.to_dict()
+        with self._lock:
+            self._recent[trace.trace_id] = record
+            while len(self._recent) > self.buffer_size:
+                self._recent.popitem(last=False)
+            self.exported += 1
+            if self.export_path:
+                try:
+                    with open(self.export_path, "a", encoding="utf-8") as fh:
+                        fh.write(json.dumps(record, default=str) + "\n")
+                except OSError as e:
+                    self.export_failures += 1
+                    logger.warning(f"⚠️ Trace export to {self.export_path} failed: {e}")
+
+    def recent(self, limit: int = 20, min_ms: float = 0.0) -> List[dict]:
+        """Newest first, optionally only traces slower than `min_ms`."""
+        with self._lock:
+            records = list(reversed(self._recent.values()))
+        return [r for r in records if (r["duration_ms"] or 0) >= min_ms][:limit]
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._recent.get(trace_id)
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "buffered": len(self._recent),
+            "buffer_size": self.buffer_size,
+            "started": self.started,
+            "exported": self.exported,
+            "export_path": self.export_path,
+            "export_failures": self.export_failures
+        }
+
+
+tracer = Tracer(
+    sample_rate=settings.trace_sample_rate,
+    buffer_size=settings.trace_buffer_size,
+    export_path=settings.trace_export_path
+)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span under whatever span is current. No-op when the request isn't sampled."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    child = Span(name, trace.trace_id, _new_id(), parent.span_id if parent else trace.root.span_id,
+                 attributes=attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        child.finish()
+        trace.spans.append(child)
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Async generators closed from another context (client hung up mid-stream)
+            pass
@@ -5,24 +5,184 @@
 # "I am the box. I am the logic."
 # - GLaDOS - Portal
 
-from sqlmodel import Session, create_engine
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.app.core import metrics
 from backend.app.core.config import settings
 
+# ⏱️ POOL CHECKOUT WAIT
+# QueuePool has no "before checkout" event, so the wait is timed around the pool's own getter.
+class _TimedCheckout:
+    metrics_label: str
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.DB_POOL_TIMEOUTS.inc(engine=self.metrics_label)
+            raise
+        finally:
+            metrics.DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, engine=self.metrics_label)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_label = "sync"
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+# 🎚️ PER-BACKEND PRESETS (anything set in Settings wins)
+IS_SQLITE = settings.database_url.startswith("sqlite")
+
+def _is_memory(url: Optional[str]) -> bool:
+    if not url or not url.startswith("sqlite"):
+        return False
+    return ":memory:" in url or "mode=memory" in url or url.partition("://")[2] in ("", "/")
+
+# 🚫 In-memory SQLite is one database PER CONNECTION: the sync engine (background jobs) and the
+# async engine (requests) could never see each other's writes. Refuse it up front.
+if _is_memory(settings.database_url) or _is_memory(settings.async_database_url):
+    raise RuntimeError(
+        "DATABASE_URL points at an in-memory SQLite database, which the sync and async engines "
+        "cannot share. Use a file (e.g. sqlite:///./soullink.db)."
+    )
+
+def _pool_options(poolclass) -> dict:
+    preset = (
+        {"pool_size": 5, "max_overflow": 10, "pool_pre_ping": False, "pool_recycle": -1}
+        if IS_SQLITE else
+        {"pool_size": 10, "max_overflow": 20, "pool_pre_ping": True, "pool_recycle": 1800}
+    )
+    overrides = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    options = {**preset, **{k: v for k, v in overrides.items() if v is not None}}
+    return {**options, "pool_timeout": settings.db_pool_timeout, "poolclass": poolclass}
+
+
 # 🔌 The Smart Engine
 # We only need check_same_thread for SQLite. 
 # If DATABASE_URL starts with 'postgresql', we skip it.
 
 connect_args = {}
-if settings.database_url.startswith("sqlite"):
+if IS_SQLITE:
     connect_args = {"check_same_thread": False}
 
 engine = create_engine(
     settings.database_url, 
     echo=False, 
-    connect_args=connect_args
+    connect_args=connect_args,
+    **_pool_options(TimedQueuePool)
+)
+
+# ⚡ The Async Engine (request path)
+# Routers await their queries through this one, so concurrent requests overlap their I/O.
+# The sync engine above stays for background jobs (archive, memory, write-behind) and scripts.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+async_engine = create_async_engine(
+    settings.async_database_url or to_async_url(settings.database_url),
+    echo=False,
+    connect_args=connect_args,
+    **_pool_options(TimedAsyncQueuePool)
 )
 
-def get_session():
-    """Dependency for FastAPI to inject DB sessions."""
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+
+# 🪶 SQLITE PERFORMANCE MODE
+# Applied to every new connection. WAL + NORMAL sync lets readers proceed during writes and
+# makes commits cheap; busy_timeout makes write bursts queue instead of failing.
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kib)}")
+    cursor.close()
+
+if IS_SQLITE:
+    for _target in (engine, async_engine.sync_engine):
+        event.listen(_target, "connect", _sqlite_pragmas)
+
+async def get_session():
+    """Dependency for FastAPI to inject (async) DB sessions."""
+    # expire_on_commit=False: attribute access after commit must not trigger a lazy reload
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+# 🔢 PER-REQUEST QUERY COUNTER
+# The middleware drops a fresh QueryStats into this ContextVar for each request.
+# Threadpool workers inherit a copy of the context, so they share the same object.
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def start_query_tracking() -> QueryStats:
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _query_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    metrics.DB_QUERY_LATENCY.observe(elapsed)
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed * 1000
+
+
+# Async statements run on the async engine's sync core, so one pair of listeners covers both
+for _target in (engine, async_engine.sync_engine):
+    event.listen(_target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_target, "after_cursor_execute", _after_cursor_execute)
+
+
+# 🏊 POOL UTILISATION (read at scrape time; pools without these counters are skipped)
+_POOLS = {"sync": engine, "async": async_engine.sync_engine}
+
+def _pool_stat(name: str, clamp: bool = False):
+    values = {}
+    for label, target in _POOLS.items():
+        fn = getattr(target.pool, name, None)
+        if callable(fn):
+            # QueuePool.overflow() goes negative while the pool is still filling
+            values[(label,)] = max(fn(), 0) if clamp else fn()
+    return values
+
+metrics.REGISTRY.gauge("soullink_db_pool_size", "Configured pool size.",
+                       lambda: _pool_stat("size"), ("engine",))
+metrics.REGISTRY.gauge("soullink_db_pool_checked_out", "Connections currently checked out.",
+                       lambda: _pool_stat("checkedout"), ("engine",))
+metrics.REGISTRY.gauge("soullink_db_pool_overflow", "Connections opened beyond pool_size.",
+                       lambda: _pool_stat("overflow", clamp=True), ("engine",))
@@ -2,119 +2,137 @@
 # /version.py
 # /_dev/
 
-from sqlmodel import Session, select
-from groq import Groq
-from datetime import datetime
-from backend.app.core.config import settings
-from backend.app.models.soul import Soul
-from backend.app.models.user import User
-from backend.app.models.relationship import SoulRelationship
-from backend.app.models.conversation import Conversation
-from backend.app.models.location import Location
+from typing import AsyncIterator, Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.app.core import tracing
+from backend.app.database.session import engine as sync_engine
+from backend.app.logic.context import ChatContext, ContextLoader
 
 # Import the new Services
-from backend.app.services.identity import IdentityService
-from backend.app.services.rules import Gatekeeper
+from backend.app.services.prompts import prompt_builder
+from backend.app.services.llm import LLMProvider, LLMResult, estimate_tokens, get_provider
+from backend.app.services.memory import HistoryBuilder, memory_keeper
+from backend.app.services.persistence import ChatTurn, persist_turns, write_behind
+from backend.app.services.energy import EnergyService
 
 # "So, Brain, what are we gonna do tonight?"
-client = Groq(api_key=settings.groq_api_key)
-
 class PhoenixBrain:
-    def __init__(self, engine):
-        self.engine = engine
-
-    def _get_context(self, user_id: str, soul_id: str):
-        with Session(self.engine) as session:
-            soul = session.get(Soul, soul_id)
-            user = session.get(User, user_id)
-            rel = session.exec(
-                select(SoulRelationship).where(
-                    SoulRelationship.user_id == user_id,
-                    SoulRelationship.soul_id == soul_id
-                )
-            ).first()
-            
-            history = session.exec(
-                select(Conversation)
-                .where(Conversation.user_id == user_id, Conversation.soul_id == soul_id)
-                .order_by(Conversation.created_at.desc())
-                .limit(15)
-            ).all()
-            
-            location = None
-            if rel and rel.current_location:
-                location = session.get(Location, rel.current_location)
-
-            return soul, user, rel, reversed(list(history)), location
-
-    def generate_response(self, user_id: str, soul_id: str, user_input: str):
-        soul, user, rel, history, location = self._get_context(user_id, soul_id)
-        
-        if not soul or not user:
-            return "Error: Soul or User context lost in the Ether."
+    def __init__(self, engine, provider: Optional[LLMProvider] = None):
+        self.engine = engine  # AsyncEngine: every query on the turn path is awaited
+        # The LLM backend is chosen in Settings (llm_provider); tests/benchmarks may inject one
+        self.provider = provider or get_provider()
 
-        # 1. DELEGATE TO SERVICES
-        # Ask Gatekeeper for Tier & Rules
-        current_tier = rel.intimacy_tier if rel else "STRANGER"
-        tier_logic = Gatekeeper.get_tier_logic(soul, current_tier)
-        content_ceiling = Gatekeeper.check_privacy_ceiling(location, current_tier, soul)
-        
-        # Ask Identity Service for Architect Status
-        is_architect = IdentityService.is_architect(user, soul, rel)
+    async def _get_context(self, user_id: str, soul_id: str) -> ChatContext:
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            return await ContextLoader.load(session, user_id, soul_id)
 
-        # 2. CONSTRUCT PROMPT
-        # ✅ FIXED: Changed from llm_instructions to llm_instruction_override
-        system_anchor = soul.llm_instruction_override.get("system_anchor", "").replace("{user_name}", user.username)
-        
-        architect_override = ""
-        if is_architect:
-            title = IdentityService.get_architect_title(soul)
-            architect_override = (
-                f"\n\n[PROTOCOL: CREATOR_AWARENESS]\n"
-                f"IDENTIFIED: {title} ({user.username}).\n"
-                "You are talking to your creator. Meta-dialogue permitted."
+    def _build_messages(self, ctx: ChatContext, user_input: str) -> list:
+        with tracing.span("prompt.build", soul_id=ctx.soul.soul_id,
+                          tier=ctx.rel.intimacy_tier if ctx.rel else None) as span:
+            # 1. + 2. SYSTEM PROMPT (precompiled per soul/tier/location/architect, user fields spliced in last)
+            full_system_prompt = prompt_builder.build(ctx.soul, ctx.user, ctx.rel, ctx.location)
+
+            # 3. ASSEMBLE THE TRANSCRIPT
+            messages = [{"role": "system", "content": full_system_prompt}]
+            memory = HistoryBuilder.memory_message(ctx.rel.memory_summary if ctx.rel else None)
+            if memory:
+                messages.append(memory)
+            for msg in ctx.history:
+                messages.append({"role": msg.role, "content": msg.content})
+            messages.append({"role": "user", "content": user_input})
+
+            span.set(
+                messages=len(messages),
+                history_len=len(ctx.history),
+                system_tokens=estimate_tokens(full_system_prompt),
+                prompt_tokens=sum(estimate_tokens(m["content"]) for m in messages)
             )
+            return messages
 
-        loc_desc = ""
-        if location:
-            loc_desc = f"\nCURRENT LOCATION: {location.display_name}. {location.description}"
+    @staticmethod
+    def _tag_inference(span, result: LLMResult):
+        span.set(
+            model=result.model,
+            prompt_tokens=result.prompt_tokens,
+            completion_tokens=result.completion_tokens,
+            ttft_ms=result.ttft_ms
+        )
 
-        full_system_prompt = (
-            f"{system_anchor}"
-            f"{architect_override}"
-            f"{loc_desc}"
-            f"\n\nTIER LOGIC ({current_tier}): {tier_logic}"
-            f"\n{content_ceiling}"
+    async def _save_turn(self, ctx: ChatContext, user_input: str, result: LLMResult):
+        turn = ChatTurn(
+            user_id=ctx.user.user_id,
+            soul_id=ctx.soul.soul_id,
+            relationship_id=ctx.rel.relationship_id if ctx.rel else None,
+            user_input=user_input,
+            response_text=result.text,
+            usage=result,
+            energy_surcharge=(
+                EnergyService.token_surcharge(ctx.energy_charge.tier, result.total_tokens)
+                if ctx.energy_charge else 0
+            )
         )
 
+        # Write-behind (if enabled) batches this with other turns; otherwise write it now.
+        # Either way: one multi-row INSERT + a direct last_interaction UPDATE, no re-fetch.
+        with tracing.span("persist") as span:
+            queued = write_behind.enqueue(turn)
+            if not queued:
+                # persist_turns is shared with the (sync) write-behind flusher; run_sync
+                # drives it over the async connection without blocking the loop
+                async with AsyncSession(self.engine) as session:
+                    await session.run_sync(persist_turns, [turn])
+                    await session.commit()
+            span.set(write_behind=queued, surcharge=turn.energy_surcharge)
+
+        if ctx.rel:
+            ctx.rel.last_interaction = turn.created_at
+
+    def _schedule_memory(self, ctx: ChatContext):
+        """Fold messages that scrolled out of the window into the rolling summary (in the background)."""
+        if ctx.summary_stale and ctx.rel and ctx.history:
+            # Background jobs stay on the sync engine (they run in worker threads)
+            memory_keeper.schedule(sync_engine, ctx.rel.relationship_id, ctx.soul.name, ctx.history[0].msg_id)
+
+    async def generate_response(self, user_id: str, soul_id: str, user_input: str, context: Optional[ChatContext] = None):
+        ctx = context or await self._get_context(user_id, soul_id)
+        
+        if not ctx.soul or not ctx.user:
+            return "Error: Soul or User context lost in the Ether."
+
+        messages = self._build_messages(ctx, user_input)
+
         # 3. INFERENCE
-        messages = [{"role": "system", "content": full_system_prompt}]
-        for msg in history:
-            messages.append({"role": msg.role, "content": msg.content})
-        messages.append({"role": "user", "content": user_input})
-
-        chat_completion = client.chat.completions.create(
-            messages=messages,
-            model="llama-3.3-70b-versatile",
-            temperature=0.8,
-            max_tokens=600
-        )
-        response_text = chat_completion.choices[0].message.content
-
-        # 4. SAVE & UPDATE RELATIONSHIP
-        with Session(self.engine) as session:
-            # Save conversation
-            session.add(Conversation(user_id=user_id, soul_id=soul_id, role="user", content=user_input))
-            session.add(Conversation(user_id=user_id, soul_id=soul_id, role="assistant", content=response_text))
-            
-            # Update relationship timestamp
-            if rel:
-                # Re-fetch to attach to this session for update
-                rel_in_db = session.get(SoulRelationship, rel.relationship_id)
-                if rel_in_db:
-                    rel_in_db.last_interaction = datetime.utcnow()
-                    session.add(rel_in_db)
-            
-            session.commit()
+        with tracing.span("llm.complete", provider=self.provider.name) as span:
+            result = await self.provider.acomplete(messages, temperature=0.8, max_tokens=600)
+            self._tag_inference(span, result)
+        response_text = result.text
+
+        # 4. SAVE & UPDATE RELATIONSHIP (+ token accounting)
+        await self._save_turn(ctx, user_input, result)
+        self._schedule_memory(ctx)
 
         return response_text
+
+    async def generate_response_stream(
+        self, user_id: str, soul_id: str, user_input: str, context: Optional[ChatContext] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming twin of generate_response. Yields text chunks as the LLM produces them.
+        The full reply is only persisted once the stream has finished cleanly.
+        """
+        ctx = context or await self._get_context(user_id, soul_id)
+
+        if not ctx.soul or not ctx.user:
+            raise LookupError("Soul or User context lost in the Ether.")
+
+        messages = self._build_messages(ctx, user_input)
+
+        with tracing.span("llm.stream", provider=self.provider.name) as span:
+            stream = await self.provider.stream(messages, temperature=0.8, max_tokens=600)
+            async for token in stream:
+                yield token
+            self._tag_inference(span, stream.result)
+
+        # 4. SAVE & UPDATE RELATIONSHIP (only a finished reply is worth remembering)
+        await self._save_turn(ctx, user_input, stream.result)
+        self._schedule_memory(ctx)
@@ -0,0 +1,118 @@
+# /backend/app/logic/context.py
+# /version.py
+# /_dev/
+
+# "Remember: no Russian."
+# - Makarov - Call of Duty: Modern Warfare 2
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import and_, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.models.soul import Soul
+from backend.app.models.user import User
+from backend.app.models.relationship import SoulRelationship
+from backend.app.models.conversation import Conversation
+from backend.app.models.location import Location
+from backend.app.core import tracing
+from backend.app.core.config import settings
+from backend.app.services.blueprints import blueprint_cache
+from backend.app.services.memory import HistoryBuilder
+from backend.app.services.persistence import write_behind
+from backend.app.services.energy import EnergyCharge
+
+
+@dataclass
+class ChatContext:
+    """Everything one chat turn needs, loaded once and passed through (never re-queried)."""
+    user: Optional[User]
+    soul: Optional[Soul]
+    rel: Optional[SoulRelationship]
+    location: Optional[Location]
+    history: List[Conversation] = field(default_factory=list)  # Oldest -> Newest, within the token budget
+    summary_stale: bool = False  # Messages fell out of the window that the rolling memory hasn't absorbed
+    energy_charge: Optional[EnergyCharge] = None  # Set by admission control; settles token surcharges
+
+
+class ContextLoader:
+    """
+    Loads a full ChatContext in two round trips:
+      1. User LEFT JOIN SoulRelationship (one row, even when the link is missing)
+      2. The recent history tail (trimmed to Settings.history_token_budget)
+    Soul and Location are blueprints and come from the shared cache.
+    """
+
+    @staticmethod
+    async def load(session: AsyncSession, user_id: str, soul_id: str) -> ChatContext:
+        with tracing.span("context.load", soul_id=soul_id) as span:
+            ctx = await ContextLoader._load(session, user_id, soul_id)
+            span.set(history_len=len(ctx.history), summary_stale=ctx.summary_stale, linked=ctx.rel is not None)
+            return ctx
+
+    @staticmethod
+    async def _load(session: AsyncSession, user_id: str, soul_id: str) -> ChatContext:
+        row = (await session.exec(
+            select(User, SoulRelationship)
+            .select_from(User)
+            .outerjoin(
+                SoulRelationship,
+                and_(
+                    SoulRelationship.user_id == User.user_id,
+                    SoulRelationship.soul_id == soul_id
+                )
+            )
+            .where(User.user_id == user_id)
+        )).first()
+
+        user, rel = row if row else (None, None)
+        if not user or not rel:
+            # No point loading history for a turn that can't happen
+            return ChatContext(user=user, soul=None, rel=rel, location=None)
+
+        # Read-your-writes: snapshot turns still in the write-behind queue before reading the DB
+        pending = write_behind.pending_for(user_id, soul_id)
+
+        stored = (await session.exec(
+            select(Conversation)
+            .where(Conversation.user_id == user_id, Conversation.soul_id == soul_id)
+            .order_by(Conversation.msg_id.desc())  # Rides ix_conversations_thread
+            .limit(settings.history_fetch_limit)
+        )).all()
+        newest_first = write_behind.merge_pending(stored, pending)
+
+        window, overflow = HistoryBuilder.build_window(newest_first, settings.history_token_budget, rel.memory_summary)
+        dropped = newest_first[len(newest_first) - overflow:] if overflow else []
+        unsummarized = HistoryBuilder.unsummarized(rel, dropped)
+        if (unsummarized < settings.summary_min_new_messages and len(stored) >= settings.history_fetch_limit
+                and window and window[0].msg_id is not None):
+            # The fetch was cut short, so older unsummarized rows may exist beyond it: count them
+            unsummarized = await ContextLoader._count_unsummarized(session, rel, window[0].msg_id)
+
+        async_engine = session.bind
+        return ChatContext(
+            user=user,
+            soul=await blueprint_cache.aget_soul(async_engine, soul_id),
+            rel=rel,
+            location=await blueprint_cache.aget_location(async_engine, rel.current_location),
+            history=window,
+            summary_stale=HistoryBuilder.needs_refresh(window, unsummarized)
+        )
+
+    @staticmethod
+    async def _count_unsummarized(session: AsyncSession, rel: SoulRelationship, before_msg_id: int) -> int:
+        """Rows between the summary and the window, counted up to the refresh threshold only."""
+        bounded = (
+            select(Conversation.msg_id)
+            .where(
+                Conversation.user_id == rel.user_id,
+                Conversation.soul_id == rel.soul_id,
+                Conversation.msg_id > (rel.summary_through_msg_id or 0),
+                Conversation.msg_id < before_msg_id
+            )
+            .limit(settings.summary_min_new_messages)  # An index range probe, never a thread scan
+            .subquery()
+        )
+        return (await session.exec(select(func.count()).select_from(bounded))).one()
@@ -2,51 +2,120 @@
 # /version.py
 # /_dev/
 
-from sqlmodel import Session, select
-from backend.app.models.relationship import SoulRelationship
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.models.location import Location
+from backend.app.models.relationship import SoulRelationship
+from backend.app.services.blueprints import blueprint_cache
+from backend.app.services.presence import Move, presence
+from backend.app.services.realtime import hub
+
+@dataclass
+class MoveResult:
+    """Outcome of one soul's move (`location` is set whenever the destination exists)."""
+    soul_id: str
+    location_id: str
+    ok: bool
+    message: str
+    location: Optional[Location] = None
+    previous: Optional[str] = None
 
 class LocationManager:
     def __init__(self, engine):
-        self.engine = engine
+        self.engine = engine  # AsyncEngine
 
-    def move_to(self, user_id: str, soul_id: str, location_id: str):
+    async def move_to(self, user_id: str, soul_id: str, location_id: str):
         """
         Handles the movement logic within Link City.
         Includes Gatekeeper checks for intimacy-locked districts.
         """
-        with Session(self.engine) as session:
-            
-            # 1. Verify location exists in the geography
-            loc = session.get(Location, location_id)
-            if not loc:
-                return False, f"Location {location_id} doesn't exist."
-
-            # 2. Fetch the current Relationship state
-            rel = session.exec(
-                select(SoulRelationship).where(
-                    SoulRelationship.user_id == user_id,
-                    SoulRelationship.soul_id == soul_id
-                )
-            ).first()
-
-            if not rel:
-                return False, "Link not found. You must establish a link with this Soul first."
-
-            # 🛡️ THE GATEKEEPER CHECK
-            # We check if the user has enough intimacy for this location.
-            # USR-001 (The Architect) ignores these laws.
-            if user_id != "USR-001":
-                if rel.intimacy_score < loc.min_intimacy:
-                    return False, f"Access Denied: You need more intimacy to enter {loc.display_name}."
-
-            # 3. Execute the move
+        result = (await self.move_many(user_id, [(soul_id, location_id)]))[0]
+        return result.ok, result.message
+
+    async def move_many(
+        self, user_id: str, moves: Iterable[Tuple[str, str]], all_or_nothing: bool = False
+    ) -> List[MoveResult]:
+        """
+        Moves any number of souls (soul_id -> location_id) in ONE transaction.
+        Links come from a single IN query and the gates are checked in memory, so a whole
+        party costs the same round trips as one soul. Results are in request order.
+        With `all_or_nothing`, one refusal keeps every soul where it is.
+        """
+        moves = list(moves)
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+
+            # 1. The geography comes from the shared cache (one query when cold)
+            geography = {loc.location_id: loc for loc in await blueprint_cache.aget_all_locations(self.engine)}
+
+            # 2. Every link involved, in one round trip
+            soul_ids = {soul_id for soul_id, _ in moves}
+            rels = {
+                rel.soul_id: rel for rel in (await session.exec(
+                    select(SoulRelationship).where(
+                        SoulRelationship.user_id == user_id,
+                        SoulRelationship.soul_id.in_(soul_ids)
+                    )
+                )).all()
+            } if soul_ids else {}
+
+            results = []
+            for soul_id, location_id in moves:
+                loc = geography.get(location_id)
+                rel = rels.get(soul_id)
+                if not loc:
+                    results.append(MoveResult(soul_id, location_id, False, f"Location {location_id} doesn't exist."))
+                elif not rel:
+                    results.append(MoveResult(soul_id, location_id, False,
+                                              "Link not found. You must establish a link with this Soul first.", loc))
+
+                # 🛡️ THE GATEKEEPER CHECK
+                # We check if the user has enough intimacy for this location.
+                # USR-001 (The Architect) ignores these laws.
+                elif user_id != "USR-001" and rel.intimacy_score < loc.min_intimacy:
+                    results.append(MoveResult(soul_id, location_id, False,
+                                              f"Access Denied: You need more intimacy to enter {loc.display_name}.", loc))
+                else:
+                    results.append(MoveResult(soul_id, location_id, True,
+                                              f"Synchronized. Welcome to {loc.display_name}.", loc, rel.current_location))
+
+            accepted = [r for r in results if r.ok]
+            if not accepted:
+                return results
+            if all_or_nothing and len(accepted) < len(results):
+                for r in accepted:
+                    r.ok, r.message = False, "Not moved: another soul in this batch was refused."
+                return results
+
+            # 3. Execute the moves
             try:
-                rel.current_location = location_id
-                session.add(rel)
-                session.commit()
-                
-                # We return a success message that the frontend can display
-                return True, f"Synchronized. Welcome to {loc.display_name}."
+                old_versions = {}
+                for r in accepted:
+                    rel = rels[r.soul_id]
+                    old_versions.setdefault(r.soul_id, rel.change_version)
+                    rel.current_location = r.location_id
+                    session.add(rel)
+                await session.commit()
             except Exception as e:
-                return False, f"Teleportation Error: {str(e)}"
\ No newline at end of file
+                for r in accepted:
+                    r.ok, r.message = False, f"Teleportation Error: {str(e)}"
+                return results
+
+            # 🗺️ Keep the presence index current without a re-read
+            presence.record_moves(user_id, [
+                Move(r.soul_id, r.previous, r.location_id, old_versions[r.soul_id], rels[r.soul_id].change_version)
+                for r in accepted
+            ])
+
+            # 📡 Every open device sees the move, not just the one that asked
+            for r in accepted:
+                hub.publish(user_id, "soul.moved", {
+                    "soul_id": r.soul_id,
+                    "from": r.previous,
+                    "location_id": r.location_id,
+                    "location_name": r.location.display_name
+                })
+
+            # We return success messages that the frontend can display
+            return results
@@ -4,18 +4,64 @@
 
 # "Despite everything, it's still you." - Undertale
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
 # Import the Clean Routers
-from backend.app.api import chat, map, souls, sync, users
+from backend.app.api import chat, core, map, realtime, souls, sync, usage, users
+from backend.app.core import metrics
+from backend.app.core.config import settings
+from backend.app.core.middleware import QueryCountMiddleware, ResponseEncodingMiddleware
+from backend.app.core.responses import FastJSONResponse
+from backend.app.database.session import async_engine, engine
+from backend.app.services.archive import archivist
+from backend.app.services.assets import ImmutableStaticFiles, portrait_pipeline
+from backend.app.services.persistence import write_behind
+from backend.app.services.presence import presence
+from backend.app.services.search import soul_search
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🔎 Souls may have been seeded behind the ORM's back; start from a complete index
+    await asyncio.to_thread(soul_search.rebuild, engine)
+
+    # 🗺️ Occupancy view starts out complete, then re-counts in the background
+    await asyncio.to_thread(presence.refresh_occupancy, engine)
+
+    # 🖼️ Pre-sized, content-hashed portraits: adopt a fresh manifest, else (re)build incrementally
+    if settings.portrait_pipeline_enabled and not await asyncio.to_thread(portrait_pipeline.load):
+        await asyncio.to_thread(portrait_pipeline.build)
+
+    # 🧊 Background jobs live for as long as the app does
+    background = []
+    if settings.archive_enabled:
+        background.append(asyncio.create_task(archivist.run_forever(engine)))
+    if settings.presence_occupancy_refresh_seconds > 0:
+        background.append(asyncio.create_task(presence.run_forever(engine)))
+    if settings.write_behind_enabled:
+        write_behind.start(engine)
+
+    yield
+
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+
+    # ✍️ Nothing queued gets left behind on shutdown
+    await write_behind.stop()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="SoulLink Phoenix v1.5.3",
     description="The Legion Engine - Clean & Shippable",
-    version="1.5.3-P"
+    version="1.5.3-P",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse  # Plain JSONResponse unless the fast path is enabled
 )
 
 # Enable CORS for frontend connection
@@ -25,8 +71,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-DB-Queries", "X-DB-Time-Ms", "X-Next-Before", "X-Next-Cursor", "X-Sync-Cursor", "X-Trace-Id"],
 )
 
+# 🚀 Opt-in orjson / MessagePack bodies and gzip / brotli (see Settings)
+app.add_middleware(ResponseEncodingMiddleware)
+
+# 🔢 Per-request DB round-trip counter (X-DB-Queries header) + /metrics feed
+app.add_middleware(QueryCountMiddleware)
+
 # 🖼️ PROPER ASSET MOUNTING
 # This points to the /assets/ folder at the root of SoulLink_v1.5.3
 script_dir = os.path.dirname(__file__)
@@ -34,6 +87,10 @@ script_dir = os.path.dirname(__file__)
 assets_path = os.path.abspath(os.path.join(script_dir, "../../assets"))
 
 if os.path.exists(assets_path):
+    # Hashed variants first (cached forever), so /assets below doesn't swallow them
+    if settings.portrait_pipeline_enabled:
+        os.makedirs(portrait_pipeline.out_dir, exist_ok=True)
+        app.mount("/assets/v", ImmutableStaticFiles(directory=portrait_pipeline.out_dir), name="portraits")
     app.mount("/assets", StaticFiles(directory=assets_path), name="assets")
     print(f"✅ Assets Mounted: {assets_path}")
 else:
@@ -45,6 +102,14 @@ app.include_router(chat.router, prefix="/api/v1")
 app.include_router(map.router, prefix="/api/v1")
 app.include_router(souls.router, prefix="/api/v1")
 app.include_router(sync.router, prefix="/api/v1")
+app.include_router(core.router, prefix="/api/v1")
+app.include_router(usage.router, prefix="/api/v1")
+app.include_router(realtime.router, prefix="/api/v1")
+
+# 📈 Prometheus scrape target (process-local; scrape every worker)
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 def read_root():
@@ -6,13 +6,16 @@
 from .soul import Soul
 from .location import Location
 from .relationship import SoulRelationship
-from .conversation import Conversation
+from .conversation import Conversation, ConversationArchive
 from .user import User
+from .usage import TokenUsageDaily
 
 __all__ = [
     "Soul",
     "Location", 
     "SoulRelationship",
     "Conversation",
-    "User"
+    "ConversationArchive",
+    "User",
+    "TokenUsageDaily"
 ]
@@ -1,6 +1,7 @@
 # /backend/app/models/conversation.py
 
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Index, LargeBinary
 from datetime import datetime
 from typing import Optional
 
@@ -10,6 +11,12 @@ class Conversation(SQLModel, table=True):
     Stores chat messages between user and souls
     """
     __tablename__ = "conversations"
+
+    # 🗂️ One thread = (user, soul). msg_id is monotonic, so this index serves both
+    # "latest N" and keyset pages ("before msg_id X") without scanning the thread.
+    __table_args__ = (
+        Index("ix_conversations_thread", "user_id", "soul_id", "msg_id"),
+    )
     
     # Defining the ID of each field
     msg_id: int = Field(default=None, primary_key=True)
@@ -24,4 +31,28 @@ class Conversation(SQLModel, table=True):
     meta_data: dict = Field(default_factory=dict, sa_column=Column(JSON))
     
     # Important things we gots to know!
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+# "A man chooses, a slave obeys." Old threads get boxed up and shipped to the cold store.
+class ConversationArchive(SQLModel, table=True):
+    """
+    Cold tier for Conversation rows: one row per archived chunk of a thread.
+    `payload` is zlib-compressed JSON of the original messages (id, role, content, meta, ts).
+    """
+    __tablename__ = "conversation_archives"
+
+    __table_args__ = (
+        Index("ix_conversation_archives_thread", "user_id", "soul_id", "last_msg_id"),
+    )
+
+    archive_id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: str = Field(max_length=12)
+    soul_id: str = Field(max_length=50)
+
+    # The msg_id range this chunk covers (inclusive)
+    first_msg_id: int
+    last_msg_id: int
+    message_count: int
+
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
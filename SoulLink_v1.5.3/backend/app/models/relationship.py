@@ -6,14 +6,18 @@
 # - Fallout
 from sqlmodel import SQLModel, Field, Column
 from pydantic import BaseModel
-from sqlalchemy import JSON, UniqueConstraint
+from sqlalchemy import JSON, BigInteger, Index, UniqueConstraint
 from datetime import datetime
 from typing import Optional, Dict, Any
 
 # "Had to be me. Someone else might have gotten it wrong."
 # - Mordin Solus - Mass Effect
 class SoulRelationship(SQLModel, table=True):
-    __table_args__ = (UniqueConstraint("user_id", "soul_id", name="uq_user_soul"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "soul_id", name="uq_user_soul"),
+        # 🔄 Delta sync: "this user's links changed after version X" is one index range
+        Index("ix_relationships_user_changes", "user_id", "change_version"),
+    )
     """
     Tracks the bond between a specific User and a Soul.
     Handles intimacy progression, location state, and special flags.
@@ -61,11 +65,21 @@ class SoulRelationship(SQLModel, table=True):
     # Decides if NSFW content is active for this specific pairing
     nsfw_unlocked: bool = Field(default=False)
 
+    # 🧠 LONG-TERM MEMORY
+    # Rolling summary of every message that has scrolled out of the prompt window.
+    # summary_through_msg_id marks the newest Conversation.msg_id already folded in.
+    memory_summary: Optional[str] = Field(default=None)
+    summary_through_msg_id: Optional[int] = Field(default=None)
+    summary_updated_at: Optional[datetime] = Field(default=None)
+
     # "Don't be sorry, be better."
     # - Kratos - God of War
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_interaction: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
 
+    # 🔄 Stamped from services/changes.py on every insert/update (microsecond clock)
+    change_version: int = Field(default=0, sa_type=BigInteger)
+
 # --- READ SCHEMAS (For API Responses) ---
 class RelationshipRead(BaseModel):
     soul_id: str
@@ -0,0 +1,28 @@
+# /backend/app/models/usage.py
+# /version.py
+# /_dev/
+
+# "Insufficient minerals."
+# - StarCraft
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+from datetime import date
+
+class TokenUsageDaily(SQLModel, table=True):
+    """
+    Rollup of LLM usage per (day, user, soul), maintained on every persisted turn.
+    Per-message detail lives in Conversation.meta_data; this is what dashboards query.
+    """
+    __tablename__ = "token_usage_daily"
+    __table_args__ = (UniqueConstraint("day", "user_id", "soul_id", name="uq_usage_day_user_soul"),)
+
+    usage_id: int = Field(default=None, primary_key=True)
+    day: date = Field(index=True)
+    user_id: str = Field(max_length=12, index=True)
+    soul_id: str = Field(max_length=50, index=True)
+
+    turns: int = Field(default=0)
+    prompt_tokens: int = Field(default=0)
+    completion_tokens: int = Field(default=0)
+    total_tokens: int = Field(default=0)
+    llm_ms: float = Field(default=0.0)  # Summed LLM latency, for averages
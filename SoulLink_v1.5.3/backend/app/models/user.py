@@ -24,6 +24,8 @@ class User(SQLModel, table=True):
     
     # ⚡ THE ENERGY SYSTEM (Genius Rate Limiting)
     energy: int = Field(default=100)
+    # Regeneration is lazy: energy is only "topped up" from this timestamp when it's read
+    energy_updated_at: Optional[datetime] = Field(default=None)
     lifetime_tokens_used: int = Field(default=0)
     
     last_ad_at: Optional[datetime] = None
@@ -0,0 +1,237 @@
+# /backend/app/services/archive.py
+# /version.py
+# /_dev/
+
+# "The Archive remembers what the city forgets."
+
+"""
+Hot/Cold Conversation Tiering
+`conversations` is the hot tier: only recent messages live there, so chat queries
+stay small and cached. The Archivist moves older messages (older than
+archive_after_days, or beyond the newest archive_keep_last per thread) into
+compressed ConversationArchive chunks in batched background runs.
+History readers call `read_before` to continue seamlessly into the cold tier.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, or_
+from sqlmodel import Session, select
+
+from backend.app.core.config import settings
+from backend.app.models.conversation import Conversation, ConversationArchive
+from backend.app.models.relationship import SoulRelationship
+
+logger = logging.getLogger("LegionEngine")
+
+
+def pack_messages(messages: List[Conversation]) -> bytes:
+    rows = [
+        {
+            "id": m.msg_id,
+            "role": m.role,
+            "content": m.content,
+            "meta": m.meta_data or {},
+            "ts": m.created_at.isoformat()
+        }
+        for m in messages
+    ]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def unpack_messages(chunk: ConversationArchive) -> List[Conversation]:
+    """Rebuilds transient (never added to a session) Conversation objects from a chunk."""
+    rows = json.loads(zlib.decompress(chunk.payload))
+    return [
+        Conversation(
+            msg_id=r["id"],
+            user_id=chunk.user_id,
+            soul_id=chunk.soul_id,
+            role=r["role"],
+            content=r["content"],
+            meta_data=r["meta"],
+            created_at=datetime.fromisoformat(r["ts"])
+        )
+        for r in rows
+    ]
+
+
+class Archivist:
+    def __init__(self):
+        self.runs = 0
+        self.messages_archived = 0
+        self.chunks_written = 0
+        self.last_run_ms = 0.0
+        self._cursor: Optional[Tuple[str, str]] = None  # Last (user_id, soul_id) visited
+
+    # --- Reads (cold tier) ---
+
+    @staticmethod
+    def read_before(session: Session, user_id: str, soul_id: str, before: Optional[int], limit: int) -> List[Conversation]:
+        """Up to `limit` archived messages older than `before`, newest first."""
+        statement = select(ConversationArchive).where(
+            ConversationArchive.user_id == user_id,
+            ConversationArchive.soul_id == soul_id
+        )
+        if before is not None:
+            statement = statement.where(ConversationArchive.first_msg_id < before)
+
+        # Stream chunks newest-first; we usually only need to decompress one or two
+        chunks = session.exec(
+            statement.order_by(ConversationArchive.last_msg_id.desc()).execution_options(yield_per=4)
+        )
+
+        out: List[Conversation] = []
+        for chunk in chunks:
+            for msg in reversed(unpack_messages(chunk)):
+                if before is None or msg.msg_id < before:
+                    out.append(msg)
+                    if len(out) >= limit:
+                        return out
+        return out
+
+    # --- Writes (the background job) ---
+
+    @staticmethod
+    def _archive_boundary(session: Session, user_id: str, soul_id: str, cutoff: datetime) -> Optional[int]:
+        """Everything in the thread with msg_id < boundary may go cold. None = nothing to do."""
+        thread = (Conversation.user_id == user_id, Conversation.soul_id == soul_id)
+
+        # Rule 1: keep the newest K messages hot
+        kth_newest = session.exec(
+            select(Conversation.msg_id).where(*thread)
+            .order_by(Conversation.msg_id.desc())
+            .offset(max(settings.archive_keep_last, 1) - 1).limit(1)
+        ).first()
+
+        # Rule 2: anything older than the cutoff goes cold
+        first_recent = session.exec(
+            select(func.min(Conversation.msg_id)).where(*thread, Conversation.created_at >= cutoff)
+        ).first()
+        if first_recent is None:
+            first_recent = session.exec(select(func.max(Conversation.msg_id)).where(*thread)).first()
+            first_recent = (first_recent or 0) + 1
+
+        # Rule 1 never archives what the rolling memory hasn't absorbed yet (it only reads the
+        # hot tier). Rule 2 doesn't wait: dormant or short threads may never be summarized.
+        by_count = kth_newest or 0
+        rel = session.exec(
+            select(SoulRelationship).where(SoulRelationship.user_id == user_id, SoulRelationship.soul_id == soul_id)
+        ).first()
+        if rel:
+            by_count = min(by_count, (rel.summary_through_msg_id or 0) + 1)
+
+        boundary = max(by_count, first_recent)
+        return boundary if boundary > 1 else None
+
+    def _archive_thread(self, engine, user_id: str, soul_id: str, cutoff: datetime) -> int:
+        moved = 0
+        with Session(engine) as session:
+            boundary = self._archive_boundary(session, user_id, soul_id, cutoff)
+            if boundary is None:
+                return 0
+
+            while True:
+                batch = session.exec(
+                    select(Conversation)
+                    .where(Conversation.user_id == user_id, Conversation.soul_id == soul_id, Conversation.msg_id < boundary)
+                    .order_by(Conversation.msg_id.asc())
+                    .limit(settings.archive_chunk_size)
+                ).all()
+                if not batch:
+                    break
+
+                first_id, last_id = batch[0].msg_id, batch[-1].msg_id
+                session.add(ConversationArchive(
+                    user_id=user_id,
+                    soul_id=soul_id,
+                    first_msg_id=first_id,
+                    last_msg_id=last_id,
+                    message_count=len(batch),
+                    payload=pack_messages(batch)
+                ))
+                session.execute(
+                    delete(Conversation).where(
+                        Conversation.user_id == user_id,
+                        Conversation.soul_id == soul_id,
+                        Conversation.msg_id.between(first_id, last_id)
+                    )
+                )
+                # One chunk per transaction: a crash never loses or duplicates a message
+                session.commit()
+                session.expunge_all()
+
+                moved += len(batch)
+                self.chunks_written += 1
+                if len(batch) < settings.archive_chunk_size:
+                    break
+        return moved
+
+    def run_once(self, engine) -> int:
+        """
+        One batched pass over the threads that may have something to archive.
+        Threads are visited round-robin from a (user_id, soul_id) cursor, so threads that
+        turn out to have nothing movable (e.g. waiting on the memory) can't starve the rest.
+        """
+        started = time.perf_counter()
+        cutoff = datetime.utcnow() - timedelta(days=settings.archive_after_days)
+
+        statement = (
+            select(Conversation.user_id, Conversation.soul_id)
+            .group_by(Conversation.user_id, Conversation.soul_id)
+            .having(or_(
+                func.count(Conversation.msg_id) > settings.archive_keep_last,
+                func.min(Conversation.created_at) < cutoff
+            ))
+            .order_by(Conversation.user_id, Conversation.soul_id)
+            .limit(settings.archive_threads_per_run)
+        )
+        if self._cursor:
+            last_user, last_soul = self._cursor
+            statement = statement.where(or_(
+                Conversation.user_id > last_user,
+                and_(Conversation.user_id == last_user, Conversation.soul_id > last_soul)
+            ))
+        with Session(engine) as session:
+            threads = session.exec(statement).all()
+        # A short page means we reached the end: the next run starts over
+        self._cursor = tuple(threads[-1]) if len(threads) == settings.archive_threads_per_run else None
+
+        moved = 0
+        for user_id, soul_id in threads:
+            try:
+                moved += self._archive_thread(engine, user_id, soul_id, cutoff)
+            except Exception as e:
+                logger.error(f"Phoenix Archive Error ({user_id}/{soul_id}): {e}")
+
+        self.runs += 1
+        self.messages_archived += moved
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        if moved:
+            logger.info(f"🧊 Archived {moved} messages from {len(threads)} threads in {self.last_run_ms:.0f}ms")
+        return moved
+
+    async def run_forever(self, engine):
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once, engine)
+            except Exception as e:
+                logger.error(f"Phoenix Archive Error: {e}")
+            await asyncio.sleep(settings.archive_interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "messages_archived": self.messages_archived,
+            "chunks_written": self.chunks_written,
+            "last_run_ms": round(self.last_run_ms, 2)
+        }
+
+
+archivist = Archivist()
@@ -0,0 +1,287 @@
+# /backend/app/services/assets.py
+# /version.py
+# /_dev/
+
+# "Look at you, hacker."
+# - SHODAN - System Shock 2
+
+"""
+Portrait Pipeline
+Turns every source portrait in assets/images/souls into pre-sized variants
+(Settings.portrait_sizes, JPEG + WebP) written to assets/v under content-hashed names:
+
+    /assets/v/aria_01.thumb.3f9c1a2b7d.webp
+
+A name never changes meaning, so /assets/v is served with `immutable` cache headers.
+`manifest.json` maps each original URL (what Soul.portrait_url stores) to its variants;
+handlers resolve URLs through `portrait_pipeline` and the client can prefetch from
+GET /api/v1/sync/manifest.
+
+Builds are incremental (unchanged sources are skipped via their hash) and run at startup,
+or ahead of time:  python -m backend.app.services.assets
+At startup a fresh manifest is adopted as is (`load`); only a stale or missing one rebuilds.
+Without Pillow only a hashed copy of the original ("full") is produced.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+from starlette.staticfiles import StaticFiles
+
+from backend.app.core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: pip install Pillow (resizing + WebP)
+    Image = None
+
+logger = logging.getLogger("LegionEngine")
+
+ASSETS_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../assets"))
+PUBLIC_PREFIX = "/assets"
+VARIANT_DIR = "v"
+SOURCE_DIR = os.path.join("images", "souls")
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+SOURCE_TYPES = (".jpeg", ".jpg", ".png", ".webp")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_FORMATS = {"jpeg": ("JPEG", "jpeg"), "webp": ("WEBP", "webp")}
+
+
+def _digest(data: bytes, size: int = 5) -> str:
+    return hashlib.blake2b(data, digest_size=size).hexdigest()
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for content-addressed files: cache forever, never revalidate."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE
+        return response
+
+
+class PortraitPipeline:
+    def __init__(self, root: str, sizes: Dict[str, int], jpeg_quality: int = 82, webp_quality: int = 80):
+        self.root = root
+        self.source_dir = os.path.join(root, SOURCE_DIR)
+        self.out_dir = os.path.join(root, VARIANT_DIR)
+        self.sizes = dict(sizes)
+        self.jpeg_quality = jpeg_quality
+        self.webp_quality = webp_quality
+        self._portraits: Dict[str, dict] = {}  # original URL -> manifest entry
+        self._lock = threading.Lock()
+        self.digest: Optional[str] = None
+        self.generated = 0
+        self.reused = 0
+
+    # --- Build ---
+
+    def _params(self) -> dict:
+        """Anything that changes the output; a mismatch forces a full rebuild."""
+        return {
+            "sizes": self.sizes,
+            "jpeg_quality": self.jpeg_quality,
+            "webp_quality": self.webp_quality,
+            "resized": Image is not None
+        }
+
+    def _public_url(self, *parts: str) -> str:
+        return "/".join((PUBLIC_PREFIX,) + parts)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.out_dir, MANIFEST), encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, name: str, data: bytes):
+        path = os.path.join(self.out_dir, name)
+        if os.path.exists(path):
+            return  # Same name = same bytes
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)  # Atomic: workers building side by side never serve half a file
+
+    def _variant(self, stem: str, size: str, ext: str, data: bytes, width: int, height: int) -> dict:
+        name = f"{stem}.{size}.{_digest(data)}.{ext}"
+        self._write(name, data)
+        return {"url": self._public_url(VARIANT_DIR, name), "width": width, "height": height, "bytes": len(data)}
+
+    def _render(self, stem: str, source: bytes, ext: str) -> dict:
+        if Image is None:
+            return {"full": {ext: self._variant(stem, "full", ext, source, 0, 0)}}
+
+        variants = {}
+        with Image.open(io.BytesIO(source)) as original:
+            original = original.convert("RGB")
+            for size, edge in sorted(self.sizes.items(), key=lambda item: item[1]):
+                image = original.copy()
+                image.thumbnail((edge, edge), Image.LANCZOS)  # Keeps aspect ratio, never upscales
+                variants[size] = {}
+                for fmt, (pil_format, file_ext) in _FORMATS.items():
+                    buffer = io.BytesIO()
+                    if fmt == "jpeg":
+                        image.save(buffer, pil_format, quality=self.jpeg_quality, optimize=True, progressive=True)
+                    else:
+                        image.save(buffer, pil_format, quality=self.webp_quality, method=4)
+                    variants[size][fmt] = self._variant(stem, size, file_ext, buffer.getvalue(), *image.size)
+        return variants
+
+    def build(self) -> dict:
+        """(Re)builds variants for new or changed sources, prunes orphans, writes the manifest."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        previous = self._read_manifest()
+        params = self._params()
+        reusable = previous.get("portraits", {}) if previous.get("params") == params else {}
+
+        portraits = {}
+        generated = reused = 0
+        for url, source_path in self._sources().items():
+            filename = os.path.basename(source_path)
+            stem, ext = os.path.splitext(filename)
+            with open(source_path, "rb") as fh:
+                source = fh.read()
+            source_hash = _digest(source, 8)
+
+            known = reusable.get(url)
+            if known and known["source_hash"] == source_hash and self._files_exist(known):
+                portraits[url] = known
+                reused += 1
+                continue
+            try:
+                variants = self._render(stem, source, ext.lower().lstrip(".").replace("jpg", "jpeg"))
+            except Exception as e:
+                logger.error(f"Portrait Pipeline: skipping {filename} ({e})")
+                continue
+            portraits[url] = {"source_hash": source_hash, "variants": variants}
+            generated += 1
+
+        manifest = {"version": MANIFEST_VERSION, "params": params, "portraits": portraits}
+        manifest["digest"] = _digest(json.dumps(portraits, sort_keys=True).encode(), 8)
+        self._prune(portraits)
+        tmp = os.path.join(self.out_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2, sort_keys=True)
+        os.replace(tmp, os.path.join(self.out_dir, MANIFEST))
+
+        with self._lock:
+            self._portraits = portraits
+            self.digest = manifest["digest"]
+            self.generated += generated
+            self.reused += reused
+        logger.info(f"🖼️ Portrait pipeline: {generated} generated, {reused} unchanged ({len(portraits)} portraits)")
+        return manifest
+
+    def _sources(self) -> Dict[str, str]:
+        """Original URL -> file path for every source portrait."""
+        names = sorted(os.listdir(self.source_dir)) if os.path.isdir(self.source_dir) else []
+        return {
+            self._public_url(*SOURCE_DIR.split(os.sep), name): os.path.join(self.source_dir, name)
+            for name in names if os.path.splitext(name)[1].lower() in SOURCE_TYPES
+        }
+
+    def load(self) -> bool:
+        """
+        Adopts an existing manifest (e.g. built ahead of time) without touching any image,
+        if it is fresh: same params, same set of sources, none modified since it was written,
+        every variant on disk. Returns False (caller should `build()`) otherwise.
+        """
+        path = os.path.join(self.out_dir, MANIFEST)
+        manifest = self._read_manifest()
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("params") != self._params():
+            return False
+        portraits = manifest.get("portraits", {})
+        sources = self._sources()
+        if set(sources) != set(portraits):
+            return False
+        try:
+            written_at = os.path.getmtime(path)
+            if any(os.path.getmtime(source) >= written_at for source in sources.values()):
+                return False
+        except OSError:
+            return False
+        if not all(self._files_exist(entry) for entry in portraits.values()):
+            return False
+        with self._lock:
+            self._portraits = portraits
+            self.digest = manifest.get("digest")
+            self.reused += len(portraits)
+        logger.info(f"🖼️ Portrait pipeline: adopted manifest ({len(portraits)} portraits)")
+        return True
+
+    def _files(self, entry: dict):
+        for formats in entry["variants"].values():
+            for variant in formats.values():
+                yield variant["url"].rsplit("/", 1)[-1]
+
+    def _files_exist(self, entry: dict) -> bool:
+        return all(os.path.exists(os.path.join(self.out_dir, name)) for name in self._files(entry))
+
+    def _prune(self, portraits: dict):
+        keep = {name for entry in portraits.values() for name in self._files(entry)}
+        for name in os.listdir(self.out_dir):
+            if name != MANIFEST and name not in keep and not name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(self.out_dir, name))
+                except OSError:
+                    pass
+
+    # --- Lookups (request path) ---
+
+    def manifest(self) -> dict:
+        return {"version": MANIFEST_VERSION, "digest": self.digest, "portraits": self._portraits}
+
+    def variants(self, portrait_url: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+        """{size: {format: url}} for an original portrait URL, or None if it isn't in the manifest."""
+        entry = self._portraits.get(portrait_url) if portrait_url else None
+        if not entry:
+            return None
+        return {
+            size: {fmt: variant["url"] for fmt, variant in formats.items()}
+            for size, formats in entry["variants"].items()
+        }
+
+    def url(self, portrait_url: Optional[str], size: str = "full", fmt: str = "jpeg") -> Optional[str]:
+        """Hashed URL for one size/format, falling back to the largest variant, then the original."""
+        entry = self._portraits.get(portrait_url) if portrait_url else None
+        if not entry:
+            return portrait_url
+        variants = entry["variants"]
+        formats = variants.get(size) or variants[max(variants, key=lambda s: self.sizes.get(s, 1 << 30))]
+        chosen = formats.get(fmt) or next(iter(formats.values()))
+        return chosen["url"]
+
+    def stats(self) -> dict:
+        return {
+            "portraits": len(self._portraits),
+            "digest": self.digest,
+            "generated": self.generated,
+            "reused": self.reused,
+            "resizing": Image is not None
+        }
+
+
+portrait_pipeline = PortraitPipeline(
+    ASSETS_ROOT,
+    sizes=settings.portrait_sizes,
+    jpeg_quality=settings.portrait_jpeg_quality,
+    webp_quality=settings.portrait_webp_quality
+)
+
+
+if __name__ == "__main__":
+    # Build step for deploys:  python -m backend.app.services.assets
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    built = portrait_pipeline.build()
+    print(f"📄 {os.path.join(portrait_pipeline.out_dir, MANIFEST)} ({len(built['portraits'])} portraits)")
+    sys.exit(0)
@@ -0,0 +1,264 @@
+# /backend/app/services/blueprints.py
+# /version.py
+# /_dev/
+
+# "Stay awhile and listen."
+# - Deckard Cain - Diablo
+
+"""
+Blueprint Cache
+Souls and Locations are authored content: big JSON pillars that almost never change.
+This is a bounded, TTL'd read-through cache so the hot paths stop re-reading them.
+
+Invalidation: every cached key carries a revision number. Committing a Soul/Location
+through the ORM bumps its revision, so the next read reloads it (no restart needed).
+Edits made by another process are picked up when the TTL expires, or immediately via
+`blueprint_cache.invalidate(...)`.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.soul import Soul
+from backend.app.models.location import Location
+
+ALL = "*"  # Key used for "every row of this kind" entries (e.g. the world map)
+
+_KINDS = {Soul: "soul", Location: "location"}
+
+
+class BlueprintCache:
+    def __init__(self, maxsize: int = 512, ttl_seconds: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[object, int, float]]" = OrderedDict()
+        self._revisions: Dict[Tuple[str, str], int] = {}
+        self._fingerprints: Dict[Tuple[str, str], Tuple[object, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Core read-through ---
+
+    def _lookup(self, cache_key: Tuple[str, str]):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                value, revision, expires_at = entry
+                if revision == self._revisions.get(cache_key, 0) and expires_at > time.monotonic():
+                    self._entries.move_to_end(cache_key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[cache_key]
+            self.misses += 1
+            return False, None
+
+    def _store(self, cache_key: Tuple[str, str], value, revision: int):
+        with self._lock:
+            # Another writer bumped the revision while we were loading: don't cache stale data
+            if revision != self._revisions.get(cache_key, 0):
+                return
+            self._entries[cache_key] = (value, revision, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _get(self, engine, model, key: str):
+        cache_key = (_KINDS[model], key)
+        found, value = self._lookup(cache_key)
+        if found:
+            return value
+
+        revision = self._revisions.get(cache_key, 0)
+        # Load in a private session so the returned object is detached and safe to share
+        with Session(engine) as session:
+            if key == ALL:
+                value = list(session.exec(select(model)).all())
+            else:
+                value = session.get(model, key)
+
+        # Negative results are cached too: unknown IDs shouldn't hammer the DB
+        self._store(cache_key, value, revision)
+        return value
+
+    async def _aget(self, async_engine, model, key: str):
+        """Async twin of _get for request handlers (hits never touch the event loop)."""
+        cache_key = (_KINDS[model], key)
+        found, value = self._lookup(cache_key)
+        if found:
+            return value
+
+        revision = self._revisions.get(cache_key, 0)
+        async with AsyncSession(async_engine) as session:
+            if key == ALL:
+                value = list((await session.exec(select(model))).all())
+            else:
+                value = await session.get(model, key)
+
+        self._store(cache_key, value, revision)
+        return value
+
+    def _split_souls(self, soul_ids):
+        found: Dict[str, Soul] = {}
+        missing = []
+        for soul_id in set(soul_ids):
+            hit, soul = self._lookup(("soul", soul_id))
+            if hit:
+                if soul is not None:
+                    found[soul_id] = soul
+            else:
+                missing.append(soul_id)
+        return found, missing
+
+    def _store_souls(self, found: Dict[str, Soul], missing, revisions, loaded) -> Dict[str, Soul]:
+        loaded_by_id = {s.soul_id: s for s in loaded}
+        for soul_id in missing:
+            soul = loaded_by_id.get(soul_id)
+            self._store(("soul", soul_id), soul, revisions[soul_id])
+            if soul is not None:
+                found[soul_id] = soul
+        return found
+
+    # --- Public API ---
+
+    def get_soul(self, engine, soul_id: str) -> Optional[Soul]:
+        return self._get(engine, Soul, soul_id)
+
+    def get_location(self, engine, location_id: Optional[str]) -> Optional[Location]:
+        if not location_id:
+            return None
+        return self._get(engine, Location, location_id)
+
+    def get_all_locations(self, engine) -> List[Location]:
+        return self._get(engine, Location, ALL)
+
+    def get_souls(self, engine, soul_ids) -> Dict[str, Soul]:
+        """Resolves many souls, loading all misses in a single IN query."""
+        found, missing = self._split_souls(soul_ids)
+        if not missing:
+            return found
+        revisions = {sid: self._revisions.get(("soul", sid), 0) for sid in missing}
+        with Session(engine) as session:
+            loaded = session.exec(select(Soul).where(Soul.soul_id.in_(missing))).all()
+        return self._store_souls(found, missing, revisions, loaded)
+
+    # --- Async twins (take the AsyncEngine) ---
+
+    async def aget_soul(self, async_engine, soul_id: str) -> Optional[Soul]:
+        return await self._aget(async_engine, Soul, soul_id)
+
+    async def aget_location(self, async_engine, location_id: Optional[str]) -> Optional[Location]:
+        if not location_id:
+            return None
+        return await self._aget(async_engine, Location, location_id)
+
+    async def aget_all_locations(self, async_engine) -> List[Location]:
+        return await self._aget(async_engine, Location, ALL)
+
+    async def aget_souls(self, async_engine, soul_ids) -> Dict[str, Soul]:
+        found, missing = self._split_souls(soul_ids)
+        if not missing:
+            return found
+        revisions = {sid: self._revisions.get(("soul", sid), 0) for sid in missing}
+        async with AsyncSession(async_engine) as session:
+            loaded = (await session.exec(select(Soul).where(Soul.soul_id.in_(missing)))).all()
+        return self._store_souls(found, missing, revisions, loaded)
+
+    def invalidate(self, model, key: Optional[str] = None):
+        """Bumps the revision of one blueprint (and the ALL entry), or of every entry of that kind."""
+        kind = _KINDS[model]
+        with self._lock:
+            if key is None:
+                targets = [k for k in chain(self._entries, self._revisions) if k[0] == kind]
+            else:
+                targets = [(kind, key), (kind, ALL)]
+            for cache_key in set(targets):
+                self._revisions[cache_key] = self._revisions.get(cache_key, 0) + 1
+                self._entries.pop(cache_key, None)
+
+    def revision(self, model, key: str = ALL) -> int:
+        """Current revision of a blueprint; usable as a cheap version validator."""
+        return self._revisions.get((_KINDS[model], key), 0)
+
+    def fingerprint(self, model, key: str, value) -> str:
+        """
+        Content hash of a cached blueprint (or the ALL list), for ETags.
+        Memoised per cached object: a reload (TTL or revision bump) hashes again.
+        """
+        cache_key = (_KINDS[model], key)
+        memo = self._fingerprints.get(cache_key)
+        if memo is not None and memo[0] is value:
+            return memo[1]
+        if value is None:
+            dumped = None
+        elif isinstance(value, list):
+            dumped = [item.model_dump(mode="json") for item in value]
+        else:
+            dumped = value.model_dump(mode="json")
+        digest = hashlib.blake2b(
+            json.dumps(dumped, sort_keys=True, default=str).encode(), digest_size=8
+        ).hexdigest()
+        with self._lock:
+            self._fingerprints[cache_key] = (value, digest)
+            if len(self._fingerprints) > self.maxsize * 2:
+                self._fingerprints.clear()  # Cheap bound; recomputed on demand
+        return digest
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+blueprint_cache = BlueprintCache(
+    maxsize=settings.blueprint_cache_size,
+    ttl_seconds=settings.blueprint_cache_ttl_seconds
+)
+
+
+# 🔁 VERSIONED INVALIDATION
+# Collect touched blueprints during flush, bump their revisions only once the commit lands.
+@event.listens_for(OrmSession, "after_flush")
+def _collect_blueprint_changes(session, flush_context):
+    touched = session.info.setdefault("touched_blueprints", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Soul):
+            touched.add((Soul, obj.soul_id))
+        elif isinstance(obj, Location):
+            touched.add((Location, obj.location_id))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _bump_blueprint_revisions(session):
+    for model, key in session.info.pop("touched_blueprints", ()):
+        blueprint_cache.invalidate(model, key)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_blueprint_changes(session):
+    session.info.pop("touched_blueprints", None)
@@ -0,0 +1,78 @@
+# /backend/app/services/changes.py
+# /version.py
+# /_dev/
+
+# "What is better - to be born good, or to overcome your evil nature through great effort?"
+# - Paarthurnax - Skyrim
+
+"""
+Relationship Change Versions (delta sync)
+Every insert/update of a SoulRelationship stamps `change_version` from a per-process
+hybrid clock: wall-clock microseconds, bumped so it never repeats or runs backwards.
+Clients then ask for "my links changed after cursor X".
+
+A transaction can stamp a version and commit a moment later, so a cursor must never
+promise more than the database can know. The cursor handed out is therefore
+`now - Settings.sync_delta_window_seconds`, never ahead of that: changes inside the window
+are repeated on the next poll or two. Rows are full snapshots, so repeats are harmless
+(upsert by soul_id on the client).
+"""
+
+import base64
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+from backend.app.core.config import settings
+from backend.app.models.relationship import SoulRelationship
+
+CURSOR_PREFIX = "v1:"
+
+
+class ChangeClock:
+    def __init__(self, window_seconds: float = 5.0):
+        self.window_us = int(window_seconds * 1_000_000)
+        self._last = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> int:
+        return time.time_ns() // 1000
+
+    def next(self) -> int:
+        """Strictly increasing version for the next write."""
+        with self._lock:
+            self._last = max(self.now(), self._last + 1)
+            return self._last
+
+    def horizon(self, since: int = 0) -> int:
+        """Newest cursor that is safe to hand out (every earlier version has committed)."""
+        return max(since, self.now() - self.window_us)
+
+    @staticmethod
+    def encode(version: int) -> str:
+        return base64.urlsafe_b64encode(f"{CURSOR_PREFIX}{version}".encode()).decode()
+
+    @staticmethod
+    def decode(cursor: str) -> Optional[int]:
+        """Cursor -> version, or None when it isn't one of ours."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if not raw.startswith(CURSOR_PREFIX) or not raw[len(CURSOR_PREFIX):].isdigit():
+            return None
+        return int(raw[len(CURSOR_PREFIX):])
+
+
+change_clock = ChangeClock(window_seconds=settings.sync_delta_window_seconds)
+
+
+# 🔄 ORM writes (links, moves, intimacy, memory) are stamped automatically.
+# Bulk UPDATEs bypass mapper events and must set change_version themselves.
+@event.listens_for(SoulRelationship, "before_insert")
+@event.listens_for(SoulRelationship, "before_update")
+def _stamp_change_version(mapper, connection, target):
+    target.change_version = change_clock.next()
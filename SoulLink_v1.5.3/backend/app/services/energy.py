@@ -0,0 +1,187 @@
+# /backend/app/services/energy.py
+# /version.py
+# /_dev/
+
+# "You must construct additional pylons."
+# - StarCraft
+
+"""
+Energy Admission Control (the "Genius Rate Limiting")
+Each chat turn costs energy; energy regenerates lazily from User.energy_updated_at when
+read, so there is never a sweep over all users. Over-limit requests are rejected with a
+429 + Retry-After before any context load or LLM call, and repeat offenders are turned
+away from an in-process "exhausted until" map without touching the DB at all.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, case, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.core.config import EnergyTier, settings
+from backend.app.models.user import User
+from backend.app.services.realtime import hub
+from backend.app.services.user_cache import user_cache
+
+
+@dataclass
+class EnergyCharge:
+    """What admission charged, so a failed turn can be refunded."""
+    user_id: str
+    tier: EnergyTier
+    cost: int
+    remaining: Optional[int]
+
+
+class EnergyService:
+    _exhausted: Dict[str, datetime] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def tier_for(account_tier: Optional[str]) -> EnergyTier:
+        tiers = settings.energy_tiers
+        return tiers.get(account_tier or "free") or tiers.get("free") or EnergyTier()
+
+    @staticmethod
+    def regenerate(energy: int, updated_at: Optional[datetime], tier: EnergyTier, now: datetime) -> Tuple[int, datetime]:
+        """
+        Lazy regen: returns (energy, new anchor). Only whole points are credited and the
+        anchor only advances by the time they took, so fractional progress is never lost.
+        Regen never lowers a balance: grandfathered balances above the cap are kept.
+        """
+        if updated_at is None or tier.regen_per_minute <= 0:
+            return energy, now
+
+        minutes = max((now - updated_at).total_seconds() / 60, 0.0)
+        points = int(minutes * tier.regen_per_minute)
+        if energy + points >= tier.max_energy:
+            # Full: anchor resets to now (grandfathered balances above the cap are kept)
+            return max(energy, tier.max_energy), now
+        return energy + points, updated_at + timedelta(minutes=points / tier.regen_per_minute)
+
+    @staticmethod
+    def current(user: User, now: Optional[datetime] = None) -> int:
+        tier = EnergyService.tier_for(user.account_tier)
+        energy, _ = EnergyService.regenerate(user.energy, user.energy_updated_at, tier, now or datetime.utcnow())
+        return energy
+
+    @staticmethod
+    def _retry_after(energy: int, anchor: datetime, tier: EnergyTier, now: datetime) -> int:
+        if tier.regen_per_minute <= 0:
+            return 3600
+        missing = tier.turn_cost - energy
+        ready_at = anchor + timedelta(minutes=missing / tier.regen_per_minute)
+        return max(1, math.ceil((ready_at - now).total_seconds()))
+
+    @staticmethod
+    def _reject(retry_after: int):
+        raise HTTPException(
+            status_code=429,
+            detail="Out of energy. Your souls need a moment to recharge.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    @classmethod
+    async def admit(cls, session: AsyncSession, user_id: str) -> EnergyCharge:
+        """Charges one turn or raises 429. Call before loading any chat context."""
+        now = datetime.utcnow()
+
+        # 1. Fast path: we already know this user is empty, don't even ask the DB
+        with cls._lock:
+            until = cls._exhausted.get(user_id)
+            if until and until > now:
+                cls._reject(max(1, math.ceil((until - now).total_seconds())))
+            cls._exhausted.pop(user_id, None)
+
+        # 2. Read -> regenerate -> conditional write (retry if another request raced us)
+        for _ in range(3):
+            row = (await session.exec(
+                select(User.energy, User.energy_updated_at, User.account_tier).where(User.user_id == user_id)
+            )).first()
+            if not row:
+                raise HTTPException(404, detail=f"User {user_id} not found. Please register or check your user ID.")
+
+            energy, updated_at, account_tier = row
+            tier = cls.tier_for(account_tier)
+            if tier.unlimited or not settings.energy_enabled:
+                return EnergyCharge(user_id=user_id, tier=tier, cost=0, remaining=None)
+
+            energy, anchor = cls.regenerate(energy, updated_at, tier, now)
+            if energy < tier.turn_cost:
+                retry_after = cls._retry_after(energy, anchor, tier, now)
+                with cls._lock:
+                    cls._exhausted[user_id] = now + timedelta(seconds=retry_after)
+                cls._reject(retry_after)
+
+            # Optimistic concurrency: only succeeds if nobody moved the anchor meanwhile
+            users = User.__table__
+            stale = users.c.energy_updated_at.is_(None) if updated_at is None else users.c.energy_updated_at == updated_at
+            result = await session.execute(
+                update(users)
+                .where(users.c.user_id == user_id, stale)
+                .values(energy=energy - tier.turn_cost, energy_updated_at=anchor)
+            )
+            if result.rowcount == 1:
+                user_cache.invalidate_on_commit(session, [user_id])
+            await session.commit()
+            if result.rowcount == 1:
+                remaining = energy - tier.turn_cost
+                hub.publish(user_id, "energy.updated", {
+                    "energy": remaining, "max_energy": tier.max_energy, "delta": -tier.turn_cost
+                })
+                return EnergyCharge(user_id=user_id, tier=tier, cost=tier.turn_cost, remaining=remaining)
+
+        raise HTTPException(status_code=429, detail="Too many simultaneous requests.", headers={"Retry-After": "1"})
+
+    @staticmethod
+    async def refund(async_engine, charge: EnergyCharge):
+        """Gives back the admission cost of a turn that never produced a reply."""
+        if not charge.cost:
+            return
+        users = User.__table__
+        cap = charge.tier.max_energy
+        # Regen may have refilled the balance meanwhile: never refund past the tier's cap
+        # (grandfathered balances already above it are left alone)
+        refunded = case(
+            (users.c.energy >= cap, users.c.energy),
+            (users.c.energy + charge.cost > cap, cap),
+            else_=users.c.energy + charge.cost
+        )
+        async with AsyncSession(async_engine) as session:
+            await session.execute(
+                update(users)
+                .where(users.c.user_id == charge.user_id)
+                .values(energy=refunded)
+            )
+            user_cache.invalidate_on_commit(session, [charge.user_id])
+            hub.publish_on_commit(session, charge.user_id, "energy.updated", {"delta": charge.cost})
+            await session.commit()
+
+    @staticmethod
+    def token_surcharge(tier: EnergyTier, total_tokens: int) -> int:
+        """Extra energy owed for a turn's tokens (0 for flat-cost tiers)."""
+        if tier.unlimited or tier.tokens_per_point <= 0:
+            return 0
+        return total_tokens // tier.tokens_per_point
+
+    @staticmethod
+    def settle(session: Session, per_user: Dict[str, int]):
+        """Bulk `energy = max(energy - n, 0)` for post-turn token surcharges (caller commits)."""
+        if not per_user:
+            return
+        users = User.__table__
+        session.execute(
+            update(users)
+            .where(users.c.user_id == bindparam("uid"))
+            .values(energy=case((users.c.energy > bindparam("n"), users.c.energy - bindparam("n")), else_=0)),
+            [{"uid": uid, "n": n} for uid, n in per_user.items()]
+        )
+        user_cache.invalidate_on_commit(session, per_user)
+        for user_id, n in per_user.items():
+            hub.publish_on_commit(session, user_id, "energy.updated", {"delta": -n})
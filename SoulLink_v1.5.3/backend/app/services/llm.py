@@ -0,0 +1,363 @@
+# /backend/app/services/llm.py
+# /version.py
+# /_dev/
+
+# "Would you kindly?"
+# - Atlas - BioShock
+
+"""
+LLM Provider Layer
+PhoenixBrain talks to an LLMProvider, never to a vendor SDK directly.
+The active provider is picked from Settings.llm_provider ("groq" | "fake").
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from backend.app.core import metrics
+from backend.app.core.config import settings
+
+
+class LLMProviderError(RuntimeError):
+    """Raised when a provider fails to produce a completion."""
+
+
+@dataclass
+class LLMResult:
+    """A finished completion plus whatever usage data the provider reported."""
+    text: str
+    model: str
+    provider: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    ttft_ms: Optional[float] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class LLMStream:
+    """
+    Async iterator of text chunks. Once exhausted, `.result` holds the full
+    LLMResult (text + usage), so callers can persist without re-joining chunks.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], result: LLMResult):
+        self._chunks = chunks
+        self.result = result
+
+    def __aiter__(self):
+        return self._consume()
+
+    async def _consume(self):
+        parts = []
+        async for chunk in self._chunks:
+            parts.append(chunk)
+            yield chunk
+        self.result.text = "".join(parts)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap ~4 chars/token heuristic for providers that don't report usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+class LLMProvider(ABC):
+    """Base interface. Subclasses implement complete / acomplete / stream (enforced at construction)."""
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @abstractmethod
+    def complete(self, messages: List[dict], temperature: float = 0.8, max_tokens: int = 600) -> LLMResult:
+        """Blocking completion (threadpool / background jobs)."""
+
+    @abstractmethod
+    async def acomplete(self, messages: List[dict], temperature: float = 0.8, max_tokens: int = 600) -> LLMResult:
+        """Async completion (request path)."""
+
+    @abstractmethod
+    async def stream(self, messages: List[dict], temperature: float = 0.8, max_tokens: int = 600) -> LLMStream:
+        """Token stream; `LLMStream.result` is filled once it has been fully consumed."""
+
+
+class GroqProvider(LLMProvider):
+    """The production brain: Groq-hosted Llama."""
+
+    name = "groq"
+
+    def __init__(self, model: str, api_key: str):
+        super().__init__(model)
+        if not api_key:
+            raise LLMProviderError("GROQ_API_KEY is not set but llm_provider is 'groq'.")
+        from groq import Groq, AsyncGroq
+        self.client = Groq(api_key=api_key)
+        self.async_client = AsyncGroq(api_key=api_key)
+
+    def _to_result(self, completion, started: float) -> LLMResult:
+        usage = getattr(completion, "usage", None)
+        return LLMResult(
+            text=completion.choices[0].message.content or "",
+            model=self.model,
+            provider=self.name,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            latency_ms=(time.perf_counter() - started) * 1000
+        )
+
+    def complete(self, messages, temperature=0.8, max_tokens=600) -> LLMResult:
+        started = time.perf_counter()
+        completion = self.client.chat.completions.create(
+            messages=messages, model=self.model, temperature=temperature, max_tokens=max_tokens
+        )
+        return self._to_result(completion, started)
+
+    async def acomplete(self, messages, temperature=0.8, max_tokens=600) -> LLMResult:
+        started = time.perf_counter()
+        completion = await self.async_client.chat.completions.create(
+            messages=messages, model=self.model, temperature=temperature, max_tokens=max_tokens
+        )
+        return self._to_result(completion, started)
+
+    async def stream(self, messages, temperature=0.8, max_tokens=600) -> LLMStream:
+        started = time.perf_counter()
+        result = LLMResult(text="", model=self.model, provider=self.name)
+        raw = await self.async_client.chat.completions.create(
+            messages=messages, model=self.model, temperature=temperature, max_tokens=max_tokens, stream=True
+        )
+
+        async def chunks():
+            async for chunk in raw:
+                # Groq reports usage on the final chunk under x_groq
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage:
+                    result.prompt_tokens = usage.prompt_tokens or 0
+                    result.completion_tokens = usage.completion_tokens or 0
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    yield token
+            result.latency_ms = (time.perf_counter() - started) * 1000
+
+        return LLMStream(chunks(), result)
+
+
+# 🧪 THE STAND-IN
+# Deterministic canned replies with tunable latency, throughput and failures,
+# so the whole stack can be soak-tested without spending a single real token.
+FAKE_REPLIES = [
+    "*tilts head* You again? Fine. Tell me what's on your mind.",
+    "The city hums tonight. I can hear it through the walls... what brings you here?",
+    "Hah. Bold of you to say that to my face. Go on, I'm listening.",
+    "I was just thinking about you, actually. Don't let it go to your head.",
+    "Careful. Some doors in Link City don't open twice.",
+]
+
+
+class FakeProvider(LLMProvider):
+    """
+    Offline provider for load tests and benchmarks.
+    The reply is chosen from the last user message, so identical input gives identical output.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        model: str = "fake-llm",
+        latency_ms: float = 300.0,
+        latency_jitter_ms: float = 100.0,
+        latency_distribution: str = "normal",
+        tokens_per_second: float = 80.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        replies: Optional[List[str]] = None
+    ):
+        super().__init__(model)
+        if latency_distribution not in ("constant", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.replies = replies or FAKE_REPLIES
+        self.rng = random.Random(seed)
+
+    def _first_token_delay(self) -> float:
+        """Samples time-to-first-token in seconds from the configured distribution."""
+        base, jitter = self.latency_ms, self.latency_jitter_ms
+        if self.latency_distribution == "constant":
+            ms = base
+        elif self.latency_distribution == "uniform":
+            ms = self.rng.uniform(base - jitter, base + jitter)
+        elif self.latency_distribution == "normal":
+            ms = self.rng.gauss(base, jitter)
+        else:
+            # lognormal: median of `base`, long right tail shaped by jitter
+            sigma = (jitter / base) if base > 0 else 0.0
+            ms = base * self.rng.lognormvariate(0.0, sigma)
+        return max(0.0, ms) / 1000
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _maybe_fail(self):
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise LLMProviderError("Fake provider injected failure.")
+
+    def _pick_reply(self, messages: List[dict]) -> str:
+        last_user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        digest = hashlib.sha1(last_user.encode("utf-8")).digest()
+        return self.replies[digest[0] % len(self.replies)]
+
+    def _tokenize(self, text: str, max_tokens: int) -> List[str]:
+        words = text.split(" ")
+        return [w if i == 0 else f" {w}" for i, w in enumerate(words)][:max_tokens]
+
+    def _result(self, messages: List[dict], text: str, started: float) -> LLMResult:
+        return LLMResult(
+            text=text,
+            model=self.model,
+            provider=self.name,
+            prompt_tokens=sum(estimate_tokens(m["content"]) for m in messages),
+            completion_tokens=len(self._tokenize(text, 10**6)),
+            latency_ms=(time.perf_counter() - started) * 1000
+        )
+
+    def complete(self, messages, temperature=0.8, max_tokens=600) -> LLMResult:
+        started = time.perf_counter()
+        self._maybe_fail()
+        tokens = self._tokenize(self._pick_reply(messages), max_tokens)
+        time.sleep(self._first_token_delay() + self._token_delay() * len(tokens))
+        return self._result(messages, "".join(tokens), started)
+
+    async def acomplete(self, messages, temperature=0.8, max_tokens=600) -> LLMResult:
+        started = time.perf_counter()
+        self._maybe_fail()
+        tokens = self._tokenize(self._pick_reply(messages), max_tokens)
+        await asyncio.sleep(self._first_token_delay() + self._token_delay() * len(tokens))
+        return self._result(messages, "".join(tokens), started)
+
+    async def stream(self, messages, temperature=0.8, max_tokens=600) -> LLMStream:
+        started = time.perf_counter()
+        self._maybe_fail()
+        tokens = self._tokenize(self._pick_reply(messages), max_tokens)
+        result = self._result(messages, "", started)
+
+        async def chunks():
+            await asyncio.sleep(self._first_token_delay())
+            for token in tokens:
+                yield token
+                await asyncio.sleep(self._token_delay())
+            result.completion_tokens = len(tokens)
+            result.latency_ms = (time.perf_counter() - started) * 1000
+
+        return LLMStream(chunks(), result)
+
+
+# 📈 INSTRUMENTATION
+# Every provider handed out by get_provider() is wrapped, so latency, TTFT,
+# token counts and failures land in /metrics without touching the backends.
+class InstrumentedProvider(LLMProvider):
+    def __init__(self, inner: LLMProvider):
+        super().__init__(inner.model)
+        self.inner = inner
+        self.name = inner.name
+
+    def _record(self, mode: str, result: LLMResult):
+        metrics.observe_llm(
+            self.name, mode, result.latency_ms / 1000, result.prompt_tokens, result.completion_tokens,
+            ttft_s=result.ttft_ms / 1000 if result.ttft_ms is not None else None
+        )
+
+    def complete(self, messages, temperature=0.8, max_tokens=600) -> LLMResult:
+        try:
+            result = self.inner.complete(messages, temperature=temperature, max_tokens=max_tokens)
+        except Exception:
+            metrics.LLM_ERRORS.inc(provider=self.name)
+            raise
+        self._record("complete", result)
+        return result
+
+    async def acomplete(self, messages, temperature=0.8, max_tokens=600) -> LLMResult:
+        try:
+            result = await self.inner.acomplete(messages, temperature=temperature, max_tokens=max_tokens)
+        except Exception:
+            metrics.LLM_ERRORS.inc(provider=self.name)
+            raise
+        self._record("acomplete", result)
+        return result
+
+    async def stream(self, messages, temperature=0.8, max_tokens=600) -> LLMStream:
+        started = time.perf_counter()
+        try:
+            inner = await self.inner.stream(messages, temperature=temperature, max_tokens=max_tokens)
+        except Exception:
+            metrics.LLM_ERRORS.inc(provider=self.name)
+            raise
+        result = inner.result
+
+        async def chunks():
+            try:
+                async for chunk in inner:
+                    if result.ttft_ms is None:
+                        result.ttft_ms = (time.perf_counter() - started) * 1000
+                    yield chunk
+            except Exception:
+                metrics.LLM_ERRORS.inc(provider=self.name)
+                raise
+            result.latency_ms = (time.perf_counter() - started) * 1000
+            self._record("stream", result)
+
+        return LLMStream(chunks(), result)
+
+
+# 🗂️ PROVIDER REGISTRY
+# New backends register a factory here and become selectable via LLM_PROVIDER.
+PROVIDERS: Dict[str, Callable[[], LLMProvider]] = {
+    "groq": lambda: GroqProvider(model=settings.llm_model, api_key=settings.groq_api_key),
+    "fake": lambda: FakeProvider(
+        latency_ms=settings.fake_llm_latency_ms,
+        latency_jitter_ms=settings.fake_llm_latency_jitter_ms,
+        latency_distribution=settings.fake_llm_latency_distribution,
+        tokens_per_second=settings.fake_llm_tokens_per_second,
+        error_rate=settings.fake_llm_error_rate,
+        seed=settings.fake_llm_seed
+    ),
+}
+
+_active_provider: Optional[LLMProvider] = None
+
+
+def register_provider(name: str, factory: Callable[[], LLMProvider]):
+    PROVIDERS[name] = factory
+
+
+def get_provider() -> LLMProvider:
+    """Returns the process-wide provider selected by Settings.llm_provider."""
+    global _active_provider
+    if _active_provider is None:
+        factory = PROVIDERS.get(settings.llm_provider)
+        if factory is None:
+            raise LLMProviderError(f"Unknown llm_provider '{settings.llm_provider}'.")
+        _active_provider = InstrumentedProvider(factory())
+    return _active_provider
+
+
+def set_provider(provider: Optional[LLMProvider]):
+    """Swap the active provider at runtime (benchmarks, harnesses). None resets to Settings."""
+    global _active_provider
+    if provider is not None and not isinstance(provider, InstrumentedProvider):
+        provider = InstrumentedProvider(provider)
+    _active_provider = provider
@@ -0,0 +1,184 @@
+# /backend/app/services/memory.py
+# /version.py
+# /_dev/
+
+# "Memories... that's all we have left."
+# - Geralt of Rivia - The Witcher 3
+
+"""
+History Window & Rolling Memory
+The prompt gets as much recent history as fits in Settings.history_token_budget
+(newest -> oldest). Whatever scrolls out of that window is folded into a per-link
+summary stored on SoulRelationship, refreshed in the background by MemoryKeeper.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from backend.app.core.config import settings
+from backend.app.models.conversation import Conversation
+from backend.app.models.relationship import SoulRelationship
+from backend.app.services.llm import estimate_tokens, get_provider
+
+logger = logging.getLogger("LegionEngine")
+
+MEMORY_HEADER = "[MEMORY OF EARLIER CONVERSATIONS]"
+
+
+class HistoryBuilder:
+    @staticmethod
+    def build_window(
+        newest_first: List[Conversation],
+        budget: int,
+        summary: Optional[str] = None
+    ) -> Tuple[List[Conversation], int]:
+        """
+        Fills `budget` tokens from newest to oldest. The summary (if any) is paid for first.
+        Returns (window oldest -> newest, number of fetched rows that didn't fit).
+        """
+        remaining = budget - (estimate_tokens(summary) if summary else 0)
+        window = []
+        for msg in newest_first:
+            cost = estimate_tokens(msg.content)
+            # Always keep the latest message, even if it alone blows the budget
+            if window and cost > remaining:
+                break
+            window.append(msg)
+            remaining -= cost
+        return list(reversed(window)), len(newest_first) - len(window)
+
+    @staticmethod
+    def memory_message(summary: Optional[str]) -> Optional[dict]:
+        if not summary:
+            return None
+        return {"role": "system", "content": f"{MEMORY_HEADER}\n{summary}"}
+
+    @staticmethod
+    def unsummarized(rel: SoulRelationship, dropped: List[Conversation]) -> int:
+        """Fetched overflow rows (from `build_window`) the summary hasn't absorbed yet."""
+        folded_through = rel.summary_through_msg_id or 0
+        return sum(1 for msg in dropped if msg.msg_id is None or msg.msg_id > folded_through)
+
+    @staticmethod
+    def needs_refresh(window: List[Conversation], unsummarized: int) -> bool:
+        """
+        True when enough of this thread's messages sit before the window, unabsorbed by the
+        summary, to be worth folding. `unsummarized` counts them per thread (global msg_id
+        gaps mostly measure other threads' traffic).
+        """
+        if not window or window[0].msg_id is None:
+            return False
+        return unsummarized >= settings.summary_min_new_messages
+
+
+class MemoryKeeper:
+    """Background summarizer. One refresh in flight per relationship; never on the request path."""
+
+    def __init__(self):
+        self._in_flight = set()
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.failures = 0
+
+    def schedule(self, engine, relationship_id: int, soul_name: str, window_start_msg_id: int):
+        with self._lock:
+            if relationship_id in self._in_flight:
+                return
+            self._in_flight.add(relationship_id)
+
+        job = self._refresh(engine, relationship_id, soul_name, window_start_msg_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop:
+            task = loop.create_task(job)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            threading.Thread(target=asyncio.run, args=(job,), daemon=True).start()
+
+    def _load_batch(self, engine, relationship_id: int, before_msg_id: int):
+        with Session(engine) as session:
+            rel = session.get(SoulRelationship, relationship_id)
+            if not rel:
+                return None, []
+            messages = session.exec(
+                select(Conversation)
+                .where(
+                    Conversation.user_id == rel.user_id,
+                    Conversation.soul_id == rel.soul_id,
+                    Conversation.msg_id > (rel.summary_through_msg_id or 0),
+                    Conversation.msg_id < before_msg_id
+                )
+                .order_by(Conversation.msg_id.asc())
+                .limit(settings.summary_batch_size)
+            ).all()
+            return rel.memory_summary, list(messages)
+
+    def _store(self, engine, relationship_id: int, summary: str, through_msg_id: int):
+        with Session(engine) as session:
+            rel = session.get(SoulRelationship, relationship_id)
+            if not rel:
+                return
+            rel.memory_summary = summary
+            rel.summary_through_msg_id = through_msg_id
+            rel.summary_updated_at = datetime.utcnow()
+            session.add(rel)
+            session.commit()
+
+    async def _summarize(self, soul_name: str, previous: Optional[str], messages: List[Conversation]) -> str:
+        transcript = "\n".join(
+            f"{'User' if m.role == 'user' else soul_name}: {m.content}" for m in messages
+        )
+        prompt = [
+            {
+                "role": "system",
+                "content": (
+                    f"You maintain the long-term memory of {soul_name}'s relationship with the user. "
+                    "Merge the existing memory with the new messages into one concise summary. "
+                    "Keep names, facts, promises, shared events and emotional turning points. "
+                    f"Stay under {settings.summary_max_tokens} tokens. Reply with the summary only."
+                )
+            },
+            {
+                "role": "user",
+                "content": f"EXISTING MEMORY:\n{previous or '(none yet)'}\n\nNEW MESSAGES:\n{transcript}"
+            },
+        ]
+        result = await get_provider().acomplete(prompt, temperature=0.3, max_tokens=settings.summary_max_tokens)
+        return result.text.strip()
+
+    async def _refresh(self, engine, relationship_id: int, soul_name: str, window_start_msg_id: int):
+        try:
+            # Fold batch by batch until everything before the window is in the summary
+            while True:
+                summary, batch = await asyncio.to_thread(self._load_batch, engine, relationship_id, window_start_msg_id)
+                if len(batch) < min(settings.summary_min_new_messages, settings.summary_batch_size):
+                    break
+                summary = await self._summarize(soul_name, summary, batch)
+                await asyncio.to_thread(self._store, engine, relationship_id, summary, batch[-1].msg_id)
+                self.refreshes += 1
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Phoenix Memory Error (relationship {relationship_id}): {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(relationship_id)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "refreshes": self.refreshes,
+            "failures": self.failures
+        }
+
+
+memory_keeper = MemoryKeeper()
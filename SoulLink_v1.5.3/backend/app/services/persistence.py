@@ -0,0 +1,357 @@
+# /backend/app/services/persistence.py
+# /version.py
+# /_dev/
+
+# "Saving... Do not turn off the power."
+
+"""
+Chat Persistence
+`persist_turns` writes any number of chat turns in one transaction: a single multi-row
+INSERT for the messages, one bulk UPDATE for last_interaction (coalesced per link), and
+token accounting (User.lifetime_tokens_used + the TokenUsageDaily rollup, coalesced too).
+
+`WriteBehindQueue` is the optional async path (Settings.write_behind_enabled): turns are
+queued in memory and flushed in batches on a size or time trigger. The queue drains on
+shutdown, and readers can see still-queued turns via `pending_for`.
+A failed batch is retried one turn at a time: if nothing gets through the DB is down and
+everything is requeued, otherwise the turns that still fail are poison and move to
+`dead_letters` instead of blocking the queue forever.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from itertools import chain
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, insert, update
+from sqlmodel import Session
+
+from backend.app.core import metrics
+from backend.app.core.config import settings
+from backend.app.models.conversation import Conversation
+from backend.app.models.relationship import SoulRelationship
+from backend.app.models.usage import TokenUsageDaily
+from backend.app.models.user import User
+from backend.app.services.changes import change_clock
+from backend.app.services.llm import LLMResult
+from backend.app.services.energy import EnergyService
+from backend.app.services.user_cache import user_cache
+
+logger = logging.getLogger("LegionEngine")
+
+DEAD_LETTERS = metrics.REGISTRY.counter(
+    "soullink_write_behind_dead_letters_total", "Chat turns dropped from the write-behind queue as unwritable.")
+
+
+@dataclass
+class ChatTurn:
+    """One user message + one soul reply, ready to be written."""
+    user_id: str
+    soul_id: str
+    relationship_id: Optional[int]
+    user_input: str
+    response_text: str
+    usage: Optional[LLMResult] = None
+    energy_surcharge: int = 0  # Token-based energy owed on top of the flat admission cost
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def usage_meta(self) -> dict:
+        """What gets stored in the assistant message's meta_data."""
+        if not self.usage:
+            return {}
+        return {
+            "prompt_tokens": self.usage.prompt_tokens,
+            "completion_tokens": self.usage.completion_tokens,
+            "total_tokens": self.usage.total_tokens,
+            "llm_latency_ms": round(self.usage.latency_ms, 1),
+            "model": self.usage.model,
+            "provider": self.usage.provider
+        }
+
+    def to_messages(self) -> List[Conversation]:
+        return [
+            Conversation(user_id=self.user_id, soul_id=self.soul_id, role="user",
+                         content=self.user_input, created_at=self.created_at),
+            Conversation(user_id=self.user_id, soul_id=self.soul_id, role="assistant",
+                         content=self.response_text, created_at=self.created_at,
+                         meta_data=self.usage_meta()),
+        ]
+
+
+def _upsert(session: Session, table, key_cols: List[str], row: dict, add_cols: List[str]):
+    """INSERT ... ON CONFLICT DO UPDATE col = col + excluded.col (SQLite & Postgres)."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = dialect_insert(table).values(**row)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_cols,
+        set_={col: table.c[col] + stmt.excluded[col] for col in add_cols}
+    )
+    session.execute(stmt)
+
+
+def _account_usage(session: Session, turns: List[ChatTurn]):
+    """Atomic lifetime counters + per (day, user, soul) rollup, one statement per key."""
+    per_user: Dict[str, int] = {}
+    per_day: Dict[tuple, dict] = {}
+    surcharges: Dict[str, int] = {}
+    for turn in turns:
+        if turn.energy_surcharge:
+            surcharges[turn.user_id] = surcharges.get(turn.user_id, 0) + turn.energy_surcharge
+        if not turn.usage:
+            continue
+        per_user[turn.user_id] = per_user.get(turn.user_id, 0) + turn.usage.total_tokens
+
+        key = (turn.created_at.date(), turn.user_id, turn.soul_id)
+        agg = per_day.setdefault(key, {"turns": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "llm_ms": 0.0})
+        agg["turns"] += 1
+        agg["prompt_tokens"] += turn.usage.prompt_tokens
+        agg["completion_tokens"] += turn.usage.completion_tokens
+        agg["total_tokens"] += turn.usage.total_tokens
+        agg["llm_ms"] += turn.usage.latency_ms
+
+    if per_user:
+        # Increment in SQL (col = col + n) so concurrent workers never lose an update
+        users = User.__table__
+        session.execute(
+            update(users)
+            .where(users.c.user_id == bindparam("uid"))
+            .values(lifetime_tokens_used=users.c.lifetime_tokens_used + bindparam("n")),
+            [{"uid": uid, "n": n} for uid, n in per_user.items()]
+        )
+        user_cache.invalidate_on_commit(session, per_user)
+
+    EnergyService.settle(session, surcharges)
+
+    for (day, user_id, soul_id), agg in per_day.items():
+        _upsert(
+            session, TokenUsageDaily.__table__,
+            key_cols=["day", "user_id", "soul_id"],
+            row={"day": day, "user_id": user_id, "soul_id": soul_id, **agg},
+            add_cols=list(agg)
+        )
+
+
+def persist_turns(session: Session, turns: List[ChatTurn]):
+    """Writes a batch of turns in the caller's transaction (caller commits)."""
+    if not turns:
+        return
+
+    rows = [msg.model_dump(exclude={"msg_id"}) for turn in turns for msg in turn.to_messages()]
+    session.execute(insert(Conversation), rows)
+
+    # Coalesce: a link touched N times in this batch gets one UPDATE with its latest time
+    latest: Dict[int, datetime] = {}
+    for turn in turns:
+        if turn.relationship_id is not None:
+            latest[turn.relationship_id] = max(turn.created_at, latest.get(turn.relationship_id, turn.created_at))
+
+    if latest:
+        # Bulk UPDATE skips mapper events: stamp the delta-sync version here
+        session.execute(
+            update(SoulRelationship),
+            [{"relationship_id": rid, "last_interaction": ts, "change_version": change_clock.next()}
+             for rid, ts in latest.items()]
+        )
+
+    _account_usage(session, turns)
+
+
+class WriteBehindQueue:
+    def __init__(self, max_batch: int = 200, flush_interval_ms: float = 250.0, max_queue: int = 10000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+
+        self._queue: deque = deque()
+        self._in_flight: List[ChatTurn] = []  # Drained but not yet committed
+        self.dead_letters: deque = deque(maxlen=max_queue)  # Turns that can never be written
+        self._lock = threading.Lock()
+        self._engine = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+
+        self.flushes = 0
+        self.turns_flushed = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def start(self, engine):
+        self._engine = engine
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = self._loop.create_task(self._run())
+
+    def enqueue(self, turn: ChatTurn) -> bool:
+        """Queues a turn. Returns False (caller must write it inline) when not running or full."""
+        if not self.running:
+            return False
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                return False  # Backpressure: let this request pay for its own write
+            self._queue.append(turn)
+            depth = len(self._queue)
+        if depth >= self.max_batch:
+            # Safe from both the event loop and threadpool workers
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return True
+
+    def pending_for(self, user_id: str, soul_id: str) -> List[Conversation]:
+        """
+        Read-your-writes: queued or mid-flush messages for a thread, oldest first (msg_id is None).
+        Take this snapshot BEFORE querying the DB, then pass both through `merge_pending`.
+        """
+        with self._lock:
+            turns = [t for t in chain(self._in_flight, self._queue) if t.user_id == user_id and t.soul_id == soul_id]
+        return [msg for turn in turns for msg in turn.to_messages()]
+
+    @staticmethod
+    def merge_pending(newest_first: List[Conversation], pending: List[Conversation]) -> List[Conversation]:
+        """Prepends pending messages (newest first), skipping any that landed in the DB meanwhile."""
+        if not pending:
+            return list(newest_first)
+        stored = {(m.created_at, m.role) for m in newest_first}
+        fresh = [m for m in pending if (m.created_at, m.role) not in stored]
+        return list(reversed(fresh)) + list(newest_first)
+
+    def _drain(self) -> List[ChatTurn]:
+        with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+            self._in_flight = batch
+        return batch
+
+    def _requeue(self, batch: List[ChatTurn]):
+        with self._lock:
+            self._queue.extendleft(reversed(batch))
+            self._in_flight = []
+
+    def _settle(self):
+        with self._lock:
+            self._in_flight = []
+
+    def _write(self, batch: List[ChatTurn]):
+        with Session(self._engine) as session:
+            persist_turns(session, batch)
+            session.commit()
+
+    async def flush(self):
+        """Drains the whole queue, batch by batch. A failed batch is put back for the next try."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            await self._flush_all()
+
+    def _isolate(self, batch: List[ChatTurn]) -> int:
+        """
+        Retries a failed batch one turn per transaction (in order). Returns how many got through.
+        If any did, the DB is up and the ones that still fail are dead-lettered; if none did,
+        it's an outage and the whole batch is requeued.
+        """
+        failed = []
+        for turn in batch:
+            try:
+                self._write([turn])
+            except Exception as e:
+                failed.append((turn, e))
+
+        written = len(batch) - len(failed)
+        if not written:
+            self._requeue(batch)
+            return 0
+
+        with self._lock:
+            for turn, e in failed:
+                self.dead_letters.append(turn)
+                logger.error(f"Phoenix Write-Behind Dead Letter ({turn.user_id}/{turn.soul_id} @ {turn.created_at}): {e}")
+            self._in_flight = []
+        self.dead_lettered += len(failed)
+        DEAD_LETTERS.inc(len(failed))
+        return written
+
+    async def _flush_all(self):
+        while self._queue:
+            batch = self._drain()
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write, batch)
+                written = len(batch)
+                self._settle()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Phoenix Write-Behind Error ({len(batch)} turns, retrying one by one): {e}")
+                written = await asyncio.to_thread(self._isolate, batch)
+                if not written:
+                    return  # Requeued: try again on the next trigger
+            elapsed = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.turns_flushed += written
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def stop(self):
+        """Shutdown hook: let the in-progress flush finish, then make every queued turn durable."""
+        if self._task:
+            # No cancel(): a cancelled flush could leave a batch half-way between queue and DB
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._queue:
+            logger.error(f"Phoenix Write-Behind: {len(self._queue)} turns could not be flushed at shutdown.")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.running,
+            "depth": self.depth,
+            "flushes": self.flushes,
+            "turns_flushed": self.turns_flushed,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2)
+        }
+
+
+write_behind = WriteBehindQueue(
+    max_batch=settings.write_behind_max_batch,
+    flush_interval_ms=settings.write_behind_flush_interval_ms,
+    max_queue=settings.write_behind_max_queue
+)
+
+metrics.REGISTRY.gauge("soullink_write_behind_depth", "Chat turns queued for persistence.", lambda: write_behind.depth)
+metrics.REGISTRY.gauge("soullink_write_behind_last_flush_seconds", "Duration of the most recent flush.",
+                       lambda: write_behind.last_flush_ms / 1000)
@@ -0,0 +1,246 @@
+# /backend/app/services/presence.py
+# /version.py
+# /_dev/
+
+# "Snake? Snake?! SNAAAAKE!"
+# - Colonel Campbell - Metal Gear Solid
+
+"""
+Presence Index
+/map/locations answers "which of my souls are in each district". Instead of matching every
+location against every link per request, each user's location -> [soul_id] map is kept
+in-process, already grouped.
+
+- Validated, not trusted: a read costs one index-only probe of the user's links
+  (count, newest change_version, checksum of versions; see services/changes.py). If it
+  matches the cached version the map is served as is, otherwise it is reloaded in one query.
+  Writes from other workers, chat turns and deletes are therefore never missed.
+- Maintained on writes: moves and new links (LocationManager, /souls/{id}/link) patch the
+  map and its expected version in place after commit, so the next read is still a hit.
+  If another process wrote meanwhile, the probe disagrees and the map is simply reloaded.
+
+Global occupancy (souls and distinct users per district) is a precomputed view: one grouped
+query at startup and every Settings.presence_occupancy_refresh_seconds in the background,
+plus this worker's own moves applied as they commit. Between refreshes it may lag writes
+made by other workers.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import distinct, func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.relationship import SoulRelationship
+
+logger = logging.getLogger("LegionEngine")
+
+# Versions are summed modulo this so the checksum can't overflow a 64-bit SUM
+CHECKSUM_MOD = 2_147_483_647
+
+Version = Tuple[int, int, int]  # (links, newest change_version, checksum)
+
+
+class Move(NamedTuple):
+    """One committed relocation, with the link's change_version before and after."""
+    soul_id: str
+    previous: Optional[str]
+    location_id: str
+    old_version: int
+    new_version: int
+
+
+@dataclass
+class Presence:
+    """One user's souls by location (soul ids sorted), plus the link version it reflects."""
+    version: Version
+    souls: Dict[str, Optional[str]]  # soul_id -> location_id
+    locations: Dict[str, List[str]]
+
+    @classmethod
+    def build(cls, version: Version, souls: Dict[str, Optional[str]]) -> "Presence":
+        locations: Dict[str, List[str]] = {}
+        for soul_id in sorted(souls):
+            if souls[soul_id] is not None:
+                locations.setdefault(souls[soul_id], []).append(soul_id)
+        return cls(version, souls, locations)
+
+
+def _checksum(versions: Iterable[int]) -> int:
+    return sum(v % CHECKSUM_MOD for v in versions)
+
+
+def _probe_statement(user_id: str):
+    rel = SoulRelationship
+    return select(
+        func.count(),
+        func.coalesce(func.max(rel.change_version), 0),
+        func.coalesce(func.sum(rel.change_version % CHECKSUM_MOD), 0)
+    ).where(rel.user_id == user_id)
+
+
+class PresenceIndex:
+    def __init__(self, maxsize: int = 10000, occupancy_refresh_seconds: float = 30.0):
+        self.maxsize = maxsize
+        self.occupancy_refresh_seconds = occupancy_refresh_seconds
+        self._users: "OrderedDict[str, Presence]" = OrderedDict()
+        self._occupancy: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self.occupancy_revision = 0      # Bumped on every change; feeds the /map/occupancy ETag
+        self.occupancy_refreshed_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.write_updates = 0
+
+    # 🗺️ PER-USER PRESENCE
+    async def aget(self, session: AsyncSession, user_id: str) -> Presence:
+        """Where this user's souls are, grouped by location (probe + reload on mismatch)."""
+        count, newest, checksum = (await session.exec(_probe_statement(user_id))).one()
+        version = (int(count), int(newest), int(checksum))
+
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None and cached.version == version:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        rows = (await session.exec(
+            select(SoulRelationship.soul_id, SoulRelationship.current_location, SoulRelationship.change_version)
+            .where(SoulRelationship.user_id == user_id)
+        )).all()
+        # Version from the rows themselves: a write landing between probe and load can't be masked
+        loaded = (len(rows), max((r.change_version for r in rows), default=0), _checksum(r.change_version for r in rows))
+        presence = Presence.build(loaded, {r.soul_id: r.current_location for r in rows})
+        self._store(user_id, presence)
+        return presence
+
+    def _store(self, user_id: str, presence: Presence):
+        with self._lock:
+            self._users[user_id] = presence
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+                self.evictions += 1
+
+    def record_moves(self, user_id: str, moves: List[Move]):
+        """Committed moves: patch the user's map and the occupancy view."""
+        moves = [m for m in moves if m.previous != m.location_id]
+        if not moves:
+            return
+        with self._lock:
+            cached = self._users.get(user_id)
+            before = dict(cached.souls) if cached else None
+            if cached:
+                count, newest, checksum = cached.version
+                souls = dict(cached.souls)
+                for m in moves:
+                    souls[m.soul_id] = m.location_id
+                    newest = max(newest, m.new_version)
+                    checksum += m.new_version % CHECKSUM_MOD - m.old_version % CHECKSUM_MOD
+                self._users[user_id] = Presence.build((count, newest, checksum), souls)
+                self.write_updates += 1
+
+            for m in moves:
+                self._shift(m.previous, -1)
+                self._shift(m.location_id, +1)
+            if before is not None:
+                # Distinct users per district: only knowable with the user's map in hand
+                after = self._users[user_id].souls
+                for loc in {m.previous for m in moves} | {m.location_id for m in moves}:
+                    was_here = loc in before.values()
+                    is_here = loc in after.values()
+                    if was_here != is_here:
+                        self._shift(loc, 0, +1 if is_here else -1)
+            self.occupancy_revision += 1
+
+    def record_link(self, user_id: str, soul_id: str, location_id: Optional[str], version: int):
+        """A committed new link: one more soul at its spawn point."""
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached and soul_id not in cached.souls:
+                count, newest, checksum = cached.version
+                souls = {**cached.souls, soul_id: location_id}
+                self._users[user_id] = Presence.build(
+                    (count + 1, max(newest, version), checksum + version % CHECKSUM_MOD), souls
+                )
+                self.write_updates += 1
+                new_user = location_id not in cached.souls.values()
+            else:
+                new_user = False  # Unknown without the map; the next refresh settles it
+            self._shift(location_id, +1, +1 if new_user else 0)
+            self.occupancy_revision += 1
+
+    # 🏙️ GLOBAL OCCUPANCY (caller holds the lock)
+    def _shift(self, location_id: Optional[str], souls: int, users: int = 0):
+        if location_id is None:
+            return
+        counts = self._occupancy.setdefault(location_id, {"souls": 0, "users": 0})
+        counts["souls"] = max(0, counts["souls"] + souls)
+        # Without the mover's map the user delta is unknown; keep the pair consistent:
+        # nobody's there without souls, someone is there with them, never more users than souls
+        counts["users"] = min(max(0, counts["users"] + users), counts["souls"])
+        if counts["souls"] and not counts["users"]:
+            counts["users"] = 1
+
+    def refresh_occupancy(self, engine):
+        """One grouped query over every link (sync; run it off the event loop)."""
+        rel = SoulRelationship
+        with Session(engine) as session:
+            rows = session.exec(
+                select(rel.current_location, func.count(), func.count(distinct(rel.user_id)))
+                .where(rel.current_location.is_not(None))
+                .group_by(rel.current_location)
+            ).all()
+        occupancy = {loc: {"souls": int(souls), "users": int(users)} for loc, souls, users in rows}
+        with self._lock:
+            if occupancy != self._occupancy:
+                self._occupancy = occupancy
+                self.occupancy_revision += 1
+            self.occupancy_refreshed_at = time.time()
+
+    def occupancy(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {loc: dict(counts) for loc, counts in self._occupancy.items()}
+
+    async def run_forever(self, engine):
+        while True:
+            await asyncio.sleep(self.occupancy_refresh_seconds)
+            try:
+                await asyncio.to_thread(self.refresh_occupancy, engine)
+            except Exception as e:
+                logger.error(f"Phoenix Presence Error: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "users_cached": len(self._users),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "write_updates": self.write_updates,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "districts_occupied": sum(1 for c in self._occupancy.values() if c["souls"]),
+            "occupancy_age_seconds": round(time.time() - self.occupancy_refreshed_at, 1)
+                                     if self.occupancy_refreshed_at else None
+        }
+
+
+presence = PresenceIndex(
+    maxsize=settings.presence_cache_size,
+    occupancy_refresh_seconds=settings.presence_occupancy_refresh_seconds
+)
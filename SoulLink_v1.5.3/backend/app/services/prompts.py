@@ -0,0 +1,147 @@
+# /backend/app/services/prompts.py
+# /version.py
+# /_dev/
+
+# "It's dangerous to go alone! Take this."
+# - Old Man - The Legend of Zelda
+
+"""
+Prompt Assembly
+The system prompt only depends on (soul, tier, location, architect). We compile that
+static prefix once, keep it in a bounded memo, and only splice in per-user fields
+(currently {user_name}) on the way out. Blueprint content fingerprints are part of the
+key, so editing a Soul or Location recompiles its prompts, whichever process made the edit
+(others' edits show up once the blueprint cache reloads them).
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from backend.app.core.config import settings
+from backend.app.models.soul import Soul
+from backend.app.models.location import Location
+from backend.app.models.user import User
+from backend.app.models.relationship import SoulRelationship
+from backend.app.services.identity import IdentityService
+from backend.app.services.rules import Gatekeeper
+from backend.app.services.blueprints import blueprint_cache
+from backend.app.services.llm import estimate_tokens
+
+USER_NAME_SLOT = "{user_name}"
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """A precompiled system-prompt prefix with per-user slots still in place."""
+    template: str
+    soul_id: str
+    tier: str
+
+    @property
+    def chars(self) -> int:
+        return len(self.template)
+
+    @property
+    def approx_tokens(self) -> int:
+        return estimate_tokens(self.template)
+
+    def render(self, user: User) -> str:
+        return self.template.replace(USER_NAME_SLOT, user.username)
+
+
+class PromptBuilder:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._compiled: "OrderedDict[Tuple, CompiledPrompt]" = OrderedDict()
+        self._sizes: Dict[str, dict] = {}  # Per-soul prompt bloat tracking
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _compile(soul: Soul, tier: str, location: Optional[Location], is_architect: bool) -> str:
+        # 1. DELEGATE TO SERVICES
+        tier_logic = Gatekeeper.get_tier_logic(soul, tier)
+        content_ceiling = Gatekeeper.check_privacy_ceiling(location, tier, soul)
+
+        # 2. CONSTRUCT PROMPT ({user_name} stays a slot until render time)
+        system_anchor = soul.llm_instruction_override.get("system_anchor", "")
+
+        architect_override = ""
+        if is_architect:
+            title = IdentityService.get_architect_title(soul)
+            architect_override = (
+                f"\n\n[PROTOCOL: CREATOR_AWARENESS]\n"
+                f"IDENTIFIED: {title} ({USER_NAME_SLOT}).\n"
+                "You are talking to your creator. Meta-dialogue permitted."
+            )
+
+        loc_desc = ""
+        if location:
+            loc_desc = f"\nCURRENT LOCATION: {location.display_name}. {location.description}"
+
+        return (
+            f"{system_anchor}"
+            f"{architect_override}"
+            f"{loc_desc}"
+            f"\n\nTIER LOGIC ({tier}): {tier_logic}"
+            f"\n{content_ceiling}"
+        )
+
+    def compile(self, soul: Soul, user: User, rel: Optional[SoulRelationship], location: Optional[Location]) -> CompiledPrompt:
+        tier = rel.intimacy_tier if rel else "STRANGER"
+        is_architect = IdentityService.is_architect(user, soul, rel)
+        location_id = location.location_id if location else None
+
+        key = (
+            soul.soul_id, tier, location_id, is_architect,
+            blueprint_cache.fingerprint(Soul, soul.soul_id, soul),
+            blueprint_cache.fingerprint(Location, location_id, location) if location_id else None
+        )
+
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = CompiledPrompt(
+            template=self._compile(soul, tier, location, is_architect),
+            soul_id=soul.soul_id,
+            tier=tier
+        )
+
+        with self._lock:
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+            self._record_size(compiled)
+        return compiled
+
+    def build(self, soul: Soul, user: User, rel: Optional[SoulRelationship], location: Optional[Location]) -> str:
+        """Returns the final system prompt for this user."""
+        return self.compile(soul, user, rel, location).render(user)
+
+    def _record_size(self, compiled: CompiledPrompt):
+        sizes = self._sizes.setdefault(compiled.soul_id, {"variants": 0, "max_chars": 0, "max_tokens": 0, "by_tier": {}})
+        sizes["variants"] += 1
+        sizes["max_chars"] = max(sizes["max_chars"], compiled.chars)
+        sizes["max_tokens"] = max(sizes["max_tokens"], compiled.approx_tokens)
+        sizes["by_tier"][compiled.tier] = {"chars": compiled.chars, "tokens": compiled.approx_tokens}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "compiled": len(self._compiled),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "souls": {soul_id: dict(sizes) for soul_id, sizes in self._sizes.items()}
+            }
+
+
+prompt_builder = PromptBuilder(maxsize=settings.prompt_cache_size)
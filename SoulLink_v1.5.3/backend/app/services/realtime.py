@@ -0,0 +1,211 @@
+# /backend/app/services/realtime.py
+# /version.py
+# /_dev/
+
+# "Can you hear me? Can anybody hear me?"
+# - Isaac Clarke - Dead Space 2
+
+"""
+Realtime Hub
+In-process registry of live WebSocket connections, keyed by user, so anything in the
+engine can push to every device a user has open on this worker:
+
+    hub.publish(user_id, "soul.moved", {"soul_id": ..., "location_id": ...})
+    hub.publish_on_commit(session, user_id, "energy.updated", {...})  # only if the write lands
+
+Each connection owns a bounded outbound queue drained by its own writer task:
+  - `push`  (fan-out events): never blocks the publisher; a full queue means the client
+            can't keep up, so it is closed with 1013 and resyncs over HTTP (delta cursor).
+  - `send`  (the connection's own chat stream): awaits queue space, which slows the token
+            pump to the client's pace; gives up after Settings.ws_send_timeout_seconds.
+
+`publish` is thread-safe (write-behind flushes run in worker threads).
+Cross-process fan-out is out of scope: each worker only reaches its own sockets.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession
+
+from backend.app.core import metrics
+from backend.app.core.config import settings
+from backend.app.models.relationship import SoulRelationship
+
+logger = logging.getLogger("LegionEngine")
+
+_PENDING_KEY = "realtime_events"
+
+SLOW_CONSUMER = 1013  # "Try Again Later"
+
+WS_FRAMES = metrics.REGISTRY.counter(
+    "soullink_ws_frames_total", "WebSocket frames by direction and type.", ("direction", "type"))
+WS_SLOW_CLOSES = metrics.REGISTRY.counter(
+    "soullink_ws_slow_consumer_closes_total", "Connections closed because their send queue filled up.")
+
+
+class Connection:
+    _ids = itertools.count(1)
+
+    def __init__(self, websocket, user_id: str, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.conn_id = next(self._ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = asyncio.Event()
+        self.close_code: Optional[int] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                if frame is None:
+                    return
+                await self.websocket.send_text(json.dumps(frame, default=str))
+                WS_FRAMES.inc(direction="out", type=frame.get("type", "?"))
+        except Exception:
+            pass  # Socket gone: the reader notices and unregisters
+        finally:
+            self.closed.set()
+
+    def push(self, frame: dict) -> bool:
+        """Non-blocking enqueue for fan-out events. A full queue closes the connection."""
+        if self.closed.is_set():
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            WS_SLOW_CLOSES.inc()
+            logger.warning(f"Realtime: closing slow connection {self.conn_id} ({self.user_id})")
+            self.abort(SLOW_CONSUMER)
+            return False
+
+    async def send(self, frame: dict):
+        """Backpressured enqueue for this connection's own stream; raises TimeoutError when stuck."""
+        if self.closed.is_set():
+            raise ConnectionError("Connection closed.")
+        await asyncio.wait_for(self.queue.put(frame), timeout=settings.ws_send_timeout_seconds)
+
+    def abort(self, code: int):
+        """Drops whatever is queued and closes the socket with `code`."""
+        if self.close_code is None:
+            self.close_code = code
+        self.closed.set()
+        if self._writer:
+            self._writer.cancel()
+
+    async def shutdown(self):
+        """Flushes queued frames (best effort) and stops the writer."""
+        if self._writer and not self._writer.done():
+            try:
+                self.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+
+
+class RealtimeHub:
+    def __init__(self):
+        self._connections: Dict[str, Set[Connection]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(conns) for conns in self._connections.values())
+
+    def connections_for(self, user_id: str) -> int:
+        return len(self._connections.get(user_id, ()))
+
+    def register(self, conn: Connection):
+        self._loop = asyncio.get_running_loop()
+        with self._lock:
+            self._connections.setdefault(conn.user_id, set()).add(conn)
+
+    def unregister(self, conn: Connection):
+        with self._lock:
+            conns = self._connections.get(conn.user_id)
+            if conns:
+                conns.discard(conn)
+                if not conns:
+                    del self._connections[conn.user_id]
+
+    def _deliver(self, user_id: str, frame: dict):
+        with self._lock:
+            targets = list(self._connections.get(user_id, ()))
+        for conn in targets:
+            if conn.push(frame):
+                self.delivered += 1
+
+    def publish(self, user_id: str, event_name: str, data: dict):
+        """Pushes a server event to every connection of `user_id` on this worker. Safe from any thread."""
+        if user_id not in self._connections or self._loop is None:
+            return  # Nobody listening here: free
+        self.published += 1
+        frame = {"type": "event", "event": event_name, "data": data}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(user_id, frame)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, user_id, frame)
+
+    @staticmethod
+    def publish_on_commit(session, user_id: str, event_name: str, data: dict):
+        """Defers `publish` until `session` commits (dropped on rollback). Accepts sync or async sessions."""
+        sync_session = getattr(session, "sync_session", session)
+        sync_session.info.setdefault(_PENDING_KEY, []).append((user_id, event_name, data))
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connection_count,
+            "users": len(self._connections),
+            "published": self.published,
+            "delivered": self.delivered
+        }
+
+
+hub = RealtimeHub()
+
+metrics.REGISTRY.gauge("soullink_ws_connections", "Open WebSocket session channels.", lambda: hub.connection_count)
+
+
+# 📣 Tier changes are published from the ORM, whichever code path made them
+@event.listens_for(OrmSession, "after_flush")
+def _collect_relationship_events(session, flush_context):
+    for obj in session.dirty:
+        if not isinstance(obj, SoulRelationship):
+            continue
+        history = inspect(obj).attrs.intimacy_tier.history
+        if history.has_changes() and history.deleted:
+            RealtimeHub.publish_on_commit(session, obj.user_id, "relationship.tier", {
+                "soul_id": obj.soul_id,
+                "previous": history.deleted[0],
+                "tier": obj.intimacy_tier,
+                "intimacy_score": obj.intimacy_score
+            })
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _publish_pending(session):
+    for user_id, event_name, data in session.info.pop(_PENDING_KEY, ()):
+        hub.publish(user_id, event_name, data)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
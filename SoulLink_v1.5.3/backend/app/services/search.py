@@ -0,0 +1,244 @@
+# /backend/app/services/search.py
+# /version.py
+# /_dev/
+
+# "Seek and ye shall find."
+# - The Seeker - Assassin's Creed
+
+"""
+Soul Search Index
+Relevance-ranked full-text search over the soul catalogue, picked by backend:
+  - SQLite:   an FTS5 virtual table (`souls_fts`), ranked with weighted bm25
+  - Postgres: a side table (`soul_search`) holding a weighted tsvector + GIN index
+Anything else falls back to ILIKE.
+
+Indexed: name (heaviest), archetype, summary, personality and the text of the
+identity/aesthetic pillars. Terms are prefix-matched and ANDed ("ari rog" finds Aria the Rogue).
+
+Sync: a full rebuild on startup (cheap; covers seeders that bypass the ORM), then
+incremental re-indexing inside the same transaction whenever a Soul is added,
+edited or deleted through the ORM. Every worker rebuilds at startup: on Postgres the
+rebuilds take turns behind an advisory lock, and a rebuild that fails anyway only costs
+that worker a log line (searches fall back to ILIKE until the index exists).
+"""
+
+import logging
+import re
+import threading
+from itertools import chain
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.soul import Soul
+
+logger = logging.getLogger("LegionEngine")
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+_PENDING_KEY = "touched_souls"
+
+# Column weights: name, archetype, summary, personality, pillars
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS souls_fts USING fts5("
+    "soul_id UNINDEXED, name, archetype, summary, personality, pillars, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+SQLITE_SEARCH = (
+    "SELECT soul_id FROM souls_fts WHERE souls_fts MATCH :query "
+    "ORDER BY bm25(souls_fts, 0.0, 10.0, 5.0, 2.0, 1.0, 1.0), soul_id LIMIT :limit OFFSET :offset"
+)
+SQLITE_INSERT = (
+    "INSERT INTO souls_fts (soul_id, name, archetype, summary, personality, pillars) "
+    "VALUES (:soul_id, :name, :archetype, :summary, :personality, :pillars)"
+)
+
+POSTGRES_DDL = (
+    "CREATE TABLE IF NOT EXISTS soul_search (soul_id VARCHAR(50) PRIMARY KEY, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_soul_search_document ON soul_search USING GIN (document)",
+)
+POSTGRES_SEARCH = (
+    "SELECT soul_id FROM soul_search WHERE document @@ to_tsquery('simple', :query) "
+    "ORDER BY ts_rank_cd(document, to_tsquery('simple', :query)) DESC, soul_id LIMIT :limit OFFSET :offset"
+)
+POSTGRES_INSERT = (
+    "INSERT INTO soul_search (soul_id, document) VALUES (:soul_id, "
+    "setweight(to_tsvector('simple', :name), 'A') || "
+    "setweight(to_tsvector('simple', :archetype), 'B') || "
+    "setweight(to_tsvector('simple', :summary), 'C') || "
+    "setweight(to_tsvector('simple', :personality || ' ' || :pillars), 'D'))"
+)
+
+TABLES = {"sqlite": "souls_fts", "postgresql": "soul_search"}
+
+# Transaction-scoped: released by the rebuild's own COMMIT/ROLLBACK
+POSTGRES_REBUILD_LOCK = "SELECT pg_advisory_xact_lock(hashtext('soul_search_rebuild'))"
+
+
+def _pillar_text(value) -> str:
+    """Flattens the string leaves of a pillar (nested dicts/lists) into one blob."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(_pillar_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_pillar_text(v) for v in value)
+    return ""
+
+
+def document_for(soul: Soul) -> Dict[str, str]:
+    return {
+        "soul_id": soul.soul_id,
+        "name": soul.name or "",
+        "archetype": soul.archetype or "",
+        "summary": soul.summary or "",
+        "personality": soul.personality or "",
+        "pillars": " ".join(filter(None, (_pillar_text(soul.identity_pillar), _pillar_text(soul.aesthetic_pillar)))),
+    }
+
+
+def search_terms(q: Optional[str]) -> List[str]:
+    return _TERM.findall(q.lower())[:8] if q else []
+
+
+class SoulSearchIndex:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._ready: Dict[str, bool] = {}  # engine url -> index table exists
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.reindexed = 0
+        self.rebuilds = 0
+
+    # --- Backend selection ---
+
+    def dialect(self, bind) -> Optional[str]:
+        name = bind.dialect.name
+        return name if self.enabled and name in TABLES else None
+
+    def _is_ready(self, connection) -> bool:
+        """Whether the index table exists (memoised per database; seeders may run before the app)."""
+        key = str(connection.engine.url)
+        with self._lock:
+            if key in self._ready:
+                return self._ready[key]
+        dialect = connection.dialect.name
+        if dialect == "sqlite":
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'souls_fts'")
+            ).first() is not None
+        else:
+            exists = connection.execute(text("SELECT to_regclass('soul_search')")).scalar() is not None
+        with self._lock:
+            self._ready[key] = exists
+        return exists
+
+    # --- Maintenance ---
+
+    def rebuild(self, engine):
+        """Creates the index if needed and re-indexes the whole catalogue (startup)."""
+        dialect = self.dialect(engine)
+        if not dialect:
+            return
+        with Session(engine) as session:
+            connection = session.connection()
+            try:
+                if dialect == "postgresql":
+                    # Workers starting together would otherwise race on the DDL and the refill
+                    connection.execute(text(POSTGRES_REBUILD_LOCK))
+                for ddl in ((SQLITE_DDL,) if dialect == "sqlite" else POSTGRES_DDL):
+                    connection.execute(text(ddl))
+            except Exception as e:
+                # e.g. SQLite built without FTS5: stay on the ILIKE fallback
+                logger.warning(f"⚠️ Soul search index unavailable ({e}); explore falls back to ILIKE.")
+                session.rollback()
+                self.enabled = False
+                return
+            try:
+                connection.execute(text(f"DELETE FROM {TABLES[dialect]}"))
+                souls = session.exec(select(Soul)).all()
+                if souls:
+                    connection.execute(
+                        text(SQLITE_INSERT if dialect == "sqlite" else POSTGRES_INSERT),
+                        [document_for(s) for s in souls]
+                    )
+                session.commit()
+            except Exception as e:
+                # e.g. SQLite busy with another worker's rebuild: that one covers us
+                logger.warning(f"⚠️ Soul search rebuild failed ({e}); the existing index is kept.")
+                session.rollback()
+                return
+        with self._lock:
+            self._ready[str(engine.url)] = True
+        self.rebuilds += 1
+        logger.info(f"🔎 Soul search index rebuilt ({len(souls)} souls, {dialect})")
+
+    def reindex(self, connection, souls: List[Soul], deleted_ids: List[str]):
+        """Replaces the index rows of the given souls inside the caller's transaction."""
+        dialect = self.dialect(connection)
+        if not dialect or not self._is_ready(connection):
+            return
+        stale = [s.soul_id for s in souls] + list(deleted_ids)
+        if stale:
+            table = TABLES[dialect]
+            connection.execute(text(f"DELETE FROM {table} WHERE soul_id = :soul_id"), [{"soul_id": i} for i in stale])
+        if souls:
+            connection.execute(
+                text(SQLITE_INSERT if dialect == "sqlite" else POSTGRES_INSERT),
+                [document_for(s) for s in souls]
+            )
+        self.reindexed += len(stale)
+
+    # --- Queries ---
+
+    async def search(self, session: AsyncSession, terms: List[str], limit: int, offset: int) -> Optional[List[str]]:
+        """Ranked soul_ids for one page, or None when no index backs this database."""
+        dialect = self.dialect(session.bind)
+        if not dialect or not terms:
+            return None
+        if not await session.run_sync(lambda sync_session: self._is_ready(sync_session.connection())):
+            return None  # Never built here (e.g. the rebuild failed): the caller uses ILIKE
+        if dialect == "sqlite":
+            query = " ".join(f'"{t}"*' for t in terms)
+            statement = SQLITE_SEARCH
+        else:
+            query = " & ".join(f"{t}:*" for t in terms)
+            statement = POSTGRES_SEARCH
+        self.searches += 1
+        rows = await session.execute(text(statement), {"query": query, "limit": limit, "offset": offset})
+        return [row[0] for row in rows]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "searches": self.searches,
+            "reindexed": self.reindexed,
+            "rebuilds": self.rebuilds
+        }
+
+
+soul_search = SoulSearchIndex(enabled=settings.search_index_enabled)
+
+
+# 🔁 INCREMENTAL SYNC (same transaction as the Soul write)
+@event.listens_for(OrmSession, "after_flush")
+def _collect_soul_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, {"upsert": {}, "deleted": set()})
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Soul):
+            pending["upsert"][obj.soul_id] = obj
+    for obj in session.deleted:
+        if isinstance(obj, Soul):
+            pending["deleted"].add(obj.soul_id)
+
+
+@event.listens_for(OrmSession, "after_flush_postexec")
+def _reindex_souls(session, flush_context):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not (pending["upsert"] or pending["deleted"]):
+        return
+    souls = [s for sid, s in pending["upsert"].items() if sid not in pending["deleted"]]
+    soul_search.reindex(session.connection(), souls, list(pending["deleted"]))
@@ -0,0 +1,144 @@
+# /backend/app/services/user_cache.py
+# /version.py
+# /_dev/
+
+# "I never forget a face."
+# - Agent 47 - Hitman
+
+"""
+Authenticated-User Cache
+Every authenticated request resolves X-User-Id to a User. Polls like /sync/dashboard and
+/map/locations do that many times a minute, so records are kept briefly in-process.
+
+- Bounded LRU with a short TTL (the safety net for writes made by other processes).
+- Unknown IDs are cached as misses (shorter TTL) so bogus headers can't hammer the DB.
+- Invalidated on commit: ORM writes to a User are picked up automatically; Core UPDATEs
+  (energy, token counters) register their user IDs with `invalidate_on_commit`.
+
+Hits hand out a fresh, unattached copy per request. Code that wants to write a user
+must load it in its own session rather than `session.add()` the dependency's object.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.user import User
+
+_PENDING_KEY = "touched_users"
+
+
+class UserCache:
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 30.0, negative_ttl_seconds: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Optional[dict], int, float]]" = OrderedDict()
+        self._revisions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, user_id: str):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                snapshot, revision, expires_at = entry
+                if revision == self._revisions.get(user_id, 0) and expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    if snapshot is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return True, snapshot
+                del self._entries[user_id]
+            self.misses += 1
+            return False, None
+
+    def _store(self, user_id: str, snapshot: Optional[dict], revision: int):
+        ttl = self.ttl_seconds if snapshot is not None else self.negative_ttl_seconds
+        with self._lock:
+            # Invalidated while we were loading: the row we read may already be stale
+            if revision != self._revisions.get(user_id, 0):
+                return
+            self._entries[user_id] = (snapshot, revision, time.monotonic() + ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def aget(self, session: AsyncSession, user_id: str) -> Optional[User]:
+        """Cached User for `user_id` (None if it doesn't exist). Misses load through `session`."""
+        found, snapshot = self._lookup(user_id)
+        if found:
+            return User(**snapshot) if snapshot is not None else None
+
+        revision = self._revisions.get(user_id, 0)
+        user = await session.get(User, user_id)
+        self._store(user_id, user.model_dump() if user else None, revision)
+        return user
+
+    def invalidate(self, user_ids: Iterable[str]):
+        with self._lock:
+            for user_id in user_ids:
+                self._revisions[user_id] = self._revisions.get(user_id, 0) + 1
+                self._entries.pop(user_id, None)
+
+    @staticmethod
+    def invalidate_on_commit(session, user_ids: Iterable[str]):
+        """For Core UPDATEs the ORM can't see: drop these users once `session` commits."""
+        sync_session = session.sync_session if isinstance(session, AsyncSession) else session
+        sync_session.info.setdefault(_PENDING_KEY, set()).update(user_ids)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+user_cache = UserCache(
+    maxsize=settings.user_cache_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    negative_ttl_seconds=settings.user_cache_negative_ttl_seconds
+)
+
+
+# 🔁 INVALIDATE ONLY ONCE THE WRITE IS DURABLE
+@event.listens_for(OrmSession, "after_flush")
+def _collect_user_changes(session, flush_context):
+    touched = {obj.user_id for obj in chain(session.new, session.dirty, session.deleted) if isinstance(obj, User)}
+    if touched:
+        session.info.setdefault(_PENDING_KEY, set()).update(touched)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_committed_users(session):
+    touched = session.info.pop(_PENDING_KEY, None)
+    if touched:
+        user_cache.invalidate(touched)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,9 @@
+# /backend/benchmarks/__init__.py
+# /version.py
+# /_dev/
+
+"""
+Load benchmarks for the Legion Engine.
+Run from the SoulLink_v1.5.3 folder:  python -m backend.benchmarks.run --help
+Serialisation cost only:              python -m backend.benchmarks.serialization
+"""
@@ -0,0 +1,328 @@
+# /backend/benchmarks/run.py
+# /version.py
+# /_dev/
+
+# "Stay awhile and listen."
+# - Deckard Cain - Diablo
+
+"""
+End-to-end Load Benchmark
+Seeds a bench world, then drives mixed traffic through the real ASGI app (in-process)
+or a running server (--base-url), with the fake LLM standing in for Groq.
+
+    python -m backend.benchmarks.run --users 200 --requests 5000 --concurrency 32
+    python -m backend.benchmarks.run --compare bench-results/baseline.json --fail-on-regression 0.15
+
+Results are written as JSON (one file per run) with throughput and p50/p95/p99
+per endpoint, plus the config and git revision, so two releases can be diffed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+SCHEMA_VERSION = 1
+
+DEFAULT_MIX = "chat_send=20,chat_history=25,sync_dashboard=20,map_locations=20,souls_explore=15"
+EXPLORE_QUERIES = ["", "", "a", "ri", "rogue", "muse", "zzz"]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint '{name}' in --mix. Known: {', '.join(ENDPOINTS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# 🎯 THE TRAFFIC: each builder returns (method, path, json_body) for one (user, soul) pair
+def _chat_send(rng, user_id, soul_id):
+    return "POST", "/api/v1/chat/send", {"soul_id": soul_id, "message": rng.choice(["hey", "tell me more", "what now?"])}
+
+def _chat_history(rng, user_id, soul_id):
+    return "GET", f"/api/v1/chat/history?soul_id={soul_id}&limit=50", None
+
+def _sync_dashboard(rng, user_id, soul_id):
+    return "GET", "/api/v1/sync/dashboard", None
+
+def _map_locations(rng, user_id, soul_id):
+    return "GET", "/api/v1/map/locations", None
+
+def _souls_explore(rng, user_id, soul_id):
+    q = rng.choice(EXPLORE_QUERIES)
+    return "GET", f"/api/v1/souls/explore?q={q}" if q else "/api/v1/souls/explore", None
+
+ENDPOINTS = {
+    "chat_send": _chat_send,
+    "chat_history": _chat_history,
+    "sync_dashboard": _sync_dashboard,
+    "map_locations": _map_locations,
+    "souls_explore": _souls_explore,
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.db_queries: Dict[str, List[int]] = defaultdict(list)
+
+    def record(self, endpoint: str, latency_ms: float, status: int, db_queries: Optional[str]):
+        self.latencies[endpoint].append(latency_ms)
+        self.statuses[endpoint][str(status)] += 1
+        if db_queries is not None:
+            self.db_queries[endpoint].append(int(db_queries))
+
+    @staticmethod
+    def _summary(latencies: List[float], statuses: Dict[str, int], queries: List[int], elapsed: float) -> dict:
+        values = sorted(latencies)
+        ok = sum(n for code, n in statuses.items() if code.startswith("2"))
+        return {
+            "requests": len(values),
+            "ok": ok,
+            "errors": len(values) - ok,
+            "statuses": dict(statuses),
+            "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3) if values else 0.0,
+            "avg_db_queries": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {
+            name: self._summary(self.latencies[name], self.statuses[name], self.db_queries[name], elapsed)
+            for name in sorted(self.latencies)
+        }
+        all_statuses = defaultdict(int)
+        for statuses in self.statuses.values():
+            for code, n in statuses.items():
+                all_statuses[code] += n
+        overall = self._summary(
+            [v for vs in self.latencies.values() for v in vs],
+            all_statuses,
+            [q for qs in self.db_queries.values() for q in qs],
+            elapsed
+        )
+        return {"endpoints": endpoints, "overall": overall}
+
+
+async def drive(client, world, mix: Dict[str, float], total: int, concurrency: int, seed: int,
+                recorder: Optional[Recorder]):
+    """`concurrency` workers share one request budget; each request picks an endpoint by weight."""
+    names, weights = list(mix), list(mix.values())
+    remaining = [total]
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed * 1000 + worker_id)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            endpoint = rng.choices(names, weights)[0]
+            user_id, soul_id = rng.choice(world.links)
+            method, path, body = ENDPOINTS[endpoint](rng, user_id, soul_id)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers={"X-User-Id": user_id})
+                status, queries = response.status_code, response.headers.get("x-db-queries")
+            except Exception:
+                status, queries = 599, None  # Transport failure (server down, timeout)
+            if recorder is not None:
+                recorder.record(endpoint, (time.perf_counter() - started) * 1000, status, queries)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+
+async def run_traffic(args, world) -> dict:
+    import httpx
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        lifespan = None
+    else:
+        from backend.app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                   timeout=args.timeout)
+        lifespan = app.router.lifespan_context(app)
+
+    mix = parse_mix(args.mix)
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            if args.warmup:
+                await drive(client, world, mix, args.warmup, args.concurrency, args.seed + 1, None)
+            recorder = Recorder()
+            started = time.perf_counter()
+            await drive(client, world, mix, args.requests, args.concurrency, args.seed, recorder)
+            elapsed = time.perf_counter() - started
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    result = recorder.report(elapsed)
+    result["elapsed_s"] = round(elapsed, 3)
+    return result
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Prints a per-endpoint diff; returns the endpoints whose p95 regressed beyond `threshold`."""
+    regressions = []
+    print(f"\n{'endpoint':<16}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'rps':>16}")
+    for name, now in current["results"]["endpoints"].items():
+        then = baseline.get("results", {}).get("endpoints", {}).get(name)
+        if not then:
+            print(f"{name:<16}{'(new endpoint)':>18}")
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            delta = (now[key] - then[key]) / then[key] if then[key] else 0.0
+            cells.append(f"{now[key]:.1f} ({delta:+.0%})")
+        print(f"{name:<16}" + "".join(f"{c:>18}" for c in cells[:3]) + f"{cells[3]:>16}")
+        if then["p95_ms"] and (now["p95_ms"] - then["p95_ms"]) / then["p95_ms"] > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="SoulLink end-to-end load benchmark")
+    world = p.add_argument_group("world")
+    world.add_argument("--database-url", default="sqlite:///./bench.db",
+                       help="Scratch DB (seeding DROPS ALL TABLES; refuses DBs with non-bench users)")
+    world.add_argument("--users", type=int, default=100)
+    world.add_argument("--links", type=int, default=4, help="Relationships per user")
+    world.add_argument("--depth", type=int, default=40, help="Average messages per relationship")
+    world.add_argument("--no-seed", action="store_true", help="Reuse an already seeded bench DB")
+    world.add_argument("--seed", type=int, default=1337)
+
+    traffic = p.add_argument_group("traffic")
+    traffic.add_argument("--requests", type=int, default=2000)
+    traffic.add_argument("--warmup", type=int, default=100)
+    traffic.add_argument("--concurrency", type=int, default=16)
+    traffic.add_argument("--mix", default=DEFAULT_MIX, help=f"endpoint=weight,... (default {DEFAULT_MIX})")
+    traffic.add_argument("--base-url", default=None,
+                         help="Hit a running server instead of the in-process app (configure its LLM yourself)")
+    traffic.add_argument("--timeout", type=float, default=60.0)
+
+    llm = p.add_argument_group("fake LLM (in-process runs)")
+    llm.add_argument("--llm-latency-ms", type=float, default=150.0)
+    llm.add_argument("--llm-jitter-ms", type=float, default=30.0)
+    llm.add_argument("--llm-distribution", default="normal", choices=["constant", "uniform", "normal", "lognormal"])
+    llm.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="0 = whole reply at once")
+    llm.add_argument("--llm-error-rate", type=float, default=0.0)
+    llm.add_argument("--energy", action="store_true", help="Keep energy admission on (429s count as errors)")
+
+    out = p.add_argument_group("output")
+    out.add_argument("--out", default=None, help="Result file (default bench-results/<version>-<timestamp>.json)")
+    out.add_argument("--compare", default=None, help="Baseline result file to diff against")
+    out.add_argument("--fail-on-regression", type=float, default=None,
+                     help="Exit 1 if any endpoint's p95 is this much worse than --compare (0.15 = 15%%)")
+    return p
+
+
+def configure_environment(args):
+    """Settings are read at import time, so this must run before anything from backend.app is imported."""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_LATENCY_JITTER_MS"] = str(args.llm_jitter_ms)
+    os.environ["FAKE_LLM_LATENCY_DISTRIBUTION"] = args.llm_distribution
+    os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.llm_tokens_per_second)
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.llm_error_rate)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    os.environ["ENERGY_ENABLED"] = "true" if args.energy else "false"
+    os.environ.setdefault("TRACE_SAMPLE_RATE", "0")  # Don't measure the tracer
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_environment(args)
+
+    from backend.app.database.session import engine
+    from backend.benchmarks.seed import load_world, seed_world
+
+    seed_started = time.perf_counter()
+    if args.no_seed:
+        world = load_world(engine)
+    else:
+        world = seed_world(engine, users=args.users, links_per_user=args.links, depth=args.depth, seed=args.seed)
+    seed_s = time.perf_counter() - seed_started
+    if not world.links:
+        print("No bench links found; run without --no-seed first.", file=sys.stderr)
+        return 2
+    print(f"🌱 {len(world.user_ids)} users, {len(world.soul_ids)} souls, {len(world.links)} links, "
+          f"{world.messages} messages ({seed_s:.1f}s)")
+
+    results = asyncio.run(run_traffic(args, world))
+
+    from backend.app.main import app
+    now = datetime.now(timezone.utc)
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "app_version": app.version,
+        "git_revision": _git_revision(),
+        "timestamp": now.isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "fail_on_regression")},
+        "world": {"users": len(world.user_ids), "souls": len(world.soul_ids), "links": len(world.links),
+                  "messages": world.messages},
+        "results": results,
+    }
+
+    out_path = args.out or os.path.join("bench-results", f"{app.version}-{now.strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+
+    print(f"\n{'endpoint':<16}{'reqs':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'db q':>7}")
+    rows = list(results["endpoints"].items()) + [("OVERALL", results["overall"])]
+    for name, r in rows:
+        print(f"{name:<16}{r['requests']:>7}{r['errors']:>6}{r['throughput_rps']:>9.1f}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['avg_db_queries'] or 0:>7.1f}")
+    print(f"\n📄 {out_path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            regressions = compare(report, json.load(fh), args.fail_on_regression or 0.0)
+        if args.fail_on_regression is not None and regressions:
+            print(f"\n❌ p95 regressed beyond {args.fail_on_regression:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
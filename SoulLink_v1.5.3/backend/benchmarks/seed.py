@@ -0,0 +1,223 @@
+# /backend/benchmarks/seed.py
+# /version.py
+# /_dev/
+
+# "Would you kindly..."
+# - Atlas - BioShock
+
+"""
+Benchmark World Seeder
+Builds a reproducible Link City: the souls found in assets/images/souls, a set of
+locations, N bench users (BNC-xxxxxxx) and their links, each with a realistic
+conversation history. Same seed -> same world, so runs are comparable.
+"""
+
+import logging
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, SQLModel, select
+
+from backend.app.models import Conversation, Location, Soul, SoulRelationship, User
+
+logger = logging.getLogger("LegionEngine")
+
+BENCH_USER_PREFIX = "BNC-"
+PORTRAIT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../assets/images/souls"))
+
+ARCHETYPES = ["Rogue", "Guardian", "Muse", "Trickster", "Scholar", "Rebel", "Healer", "Enigma"]
+
+LOCATIONS = [
+    # (location_id, display_name, category, privacy_gate, min_intimacy)
+    ("soul_plaza", "Soul Plaza", "hub", "Public", 0),
+    ("linkgate_mall", "Linkgate Mall", "shopping", "Public", 0),
+    ("neon_alley", "Neon Alley", "nightlife", "Public", 0),
+    ("skyline_lounge", "Skyline Lounge", "nightlife", "Semi-Private", 0),
+    ("the_archive", "The Archive", "culture", "Public", 0),
+    ("moonlit_park", "Moonlit Park", "outdoors", "Semi-Private", 20),
+    ("apartment", "Your Apartment", "residential", "Private", 50),
+    ("private_suite", "Private Suite", "residential", "Private", 80),
+]
+
+USER_LINES = [
+    "Hey, how was your day?",
+    "I keep thinking about what you said last time.",
+    "Want to grab something to eat at the mall?",
+    "Tell me something nobody else knows about you.",
+    "The city feels different tonight, doesn't it?",
+    "I had the weirdest dream about this place.",
+]
+SOUL_LINES = [
+    "*leans against the railing* Long. But it's better now that you're here.",
+    "You remembered? Most people don't listen that closely.",
+    "Only if you're paying. I saw the prices at that noodle stand.",
+    "Hmm... maybe. Earn it first. What's in it for me?",
+    "It always does after midnight. The neon hums louder when the streets are empty.",
+    "Dreams in Link City are never just dreams. Tell me everything.",
+]
+
+
+@dataclass
+class SeededWorld:
+    soul_ids: List[str]
+    location_ids: List[str]
+    user_ids: List[str]
+    links: List[Tuple[str, str]]  # (user_id, soul_id)
+    messages: int
+
+
+def discover_souls() -> List[Tuple[str, str]]:
+    """(soul_id, portrait_url) for every *_01 portrait shipped with the app."""
+    souls = []
+    for filename in sorted(os.listdir(PORTRAIT_DIR)):
+        stem, _ = os.path.splitext(filename)
+        if stem.endswith("_01"):
+            souls.append((stem[:-3], f"/assets/images/souls/{filename}"))
+    return souls
+
+
+def _guard_real_data(engine):
+    """Seeding drops every table. Refuse if the target DB holds anything but bench users."""
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        foreign = session.exec(
+            select(func.count()).select_from(User).where(User.user_id.notlike(f"{BENCH_USER_PREFIX}%"))
+        ).one()
+    if foreign:
+        raise RuntimeError(
+            f"Refusing to seed: the target database has {foreign} non-benchmark users. "
+            "Point --database-url at a scratch database."
+        )
+
+
+def seed_world(
+    engine,
+    users: int = 100,
+    links_per_user: int = 4,
+    depth: int = 40,
+    seed: int = 1337,
+    chunk_size: int = 5000
+) -> SeededWorld:
+    """
+    Drops and recreates every table, then seeds the world.
+    `depth` is the average number of messages per link (actual depth varies +-50%).
+    """
+    rng = random.Random(seed)
+    _guard_real_data(engine)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+
+    souls = discover_souls()
+    public_locations = [loc[0] for loc in LOCATIONS if loc[4] == 0]
+    now = datetime.utcnow()
+
+    with Session(engine) as session:
+        for location_id, display_name, category, privacy, min_intimacy in LOCATIONS:
+            session.add(Location(
+                location_id=location_id,
+                display_name=display_name,
+                category=category,
+                description=f"{display_name}: one of the many corners of Link City.",
+                system_modifiers={"privacy_gate": privacy},
+                environmental_prompts=[f"The air at {display_name} hums with neon."],
+                min_intimacy=min_intimacy
+            ))
+
+        for i, (soul_id, portrait_url) in enumerate(souls):
+            name = soul_id.title()
+            session.add(Soul(
+                soul_id=soul_id,
+                name=name,
+                summary=f"{name} drifts through Link City looking for something nobody else can see. " * 2,
+                portrait_url=portrait_url,
+                spawn_location=public_locations[i % len(public_locations)],
+                archetype=ARCHETYPES[i % len(ARCHETYPES)],
+                personality=f"{name} is witty, guarded at first and fiercely loyal once trust is earned.",
+                identity_pillar={"name": name, "age": 20 + i % 12},
+                aesthetic_pillar={"palette": "neon", "style": ARCHETYPES[i % len(ARCHETYPES)].lower()},
+                interaction_engine={"tiers": {
+                    "STRANGER": {"logic": "Keep your distance; tease, deflect, stay curious."},
+                    "TRUSTED": {"logic": "Open up a little; share small secrets."},
+                    "SOUL_LINKED": {"logic": "Speak freely and warmly."},
+                }},
+                llm_instruction_override={"system_anchor": f"You are {name}, talking to {{user_name}} in Link City."},
+                meta_data={"capabilities": {"sexual_content": False}, "dev_config": {"architect_ids": []}}
+            ))
+
+        user_ids = []
+        for i in range(users):
+            user_id = f"{BENCH_USER_PREFIX}{i:07d}"
+            user_ids.append(user_id)
+            session.add(User(
+                user_id=user_id,
+                username=f"bench_user_{i}",
+                display_name=f"Bencher {i}",
+                account_tier="premium" if i % 10 == 0 else "free"
+            ))
+        session.commit()
+
+        links = []
+        rows = []
+        for user_id in user_ids:
+            for soul_id, _ in rng.sample(souls, min(links_per_user, len(souls))):
+                score = rng.randint(0, 100)
+                tier = "SOUL_LINKED" if score >= 80 else "TRUSTED" if score >= 40 else "STRANGER"
+                session.add(SoulRelationship(
+                    user_id=user_id,
+                    soul_id=soul_id,
+                    intimacy_score=score,
+                    intimacy_tier=tier,
+                    current_location=rng.choice(public_locations)
+                ))
+                links.append((user_id, soul_id))
+
+                # Alternating user/assistant turns, oldest first, spread over the last few weeks
+                count = max(2, rng.randint(depth // 2, depth + depth // 2)) // 2 * 2
+                started = now - timedelta(days=rng.randint(1, 28))
+                for n in range(count):
+                    is_user = n % 2 == 0
+                    lines = USER_LINES if is_user else SOUL_LINES
+                    rows.append({
+                        "user_id": user_id,
+                        "soul_id": soul_id,
+                        "role": "user" if is_user else "assistant",
+                        "content": " ".join(rng.choice(lines) for _ in range(rng.randint(1, 3))),
+                        "meta_data": {},
+                        "created_at": started + timedelta(minutes=n)
+                    })
+        session.commit()
+
+        # Bulk-insert the history in chunks (executemany); ORM add() would take minutes at scale
+        for start in range(0, len(rows), chunk_size):
+            session.execute(insert(Conversation), rows[start:start + chunk_size])
+        session.commit()
+
+    logger.info(f"🌱 Bench world: {len(souls)} souls, {len(LOCATIONS)} locations, "
+                f"{users} users, {len(links)} links, {len(rows)} messages")
+    return SeededWorld(
+        soul_ids=[s[0] for s in souls],
+        location_ids=[loc[0] for loc in LOCATIONS],
+        user_ids=user_ids,
+        links=links,
+        messages=len(rows)
+    )
+
+
+def load_world(engine) -> SeededWorld:
+    """Re-reads an already seeded bench DB (for --no-seed runs)."""
+    with Session(engine) as session:
+        links = [tuple(row) for row in session.exec(
+            select(SoulRelationship.user_id, SoulRelationship.soul_id)
+            .where(SoulRelationship.user_id.like(f"{BENCH_USER_PREFIX}%"))
+        ).all()]
+        return SeededWorld(
+            soul_ids=list(session.exec(select(Soul.soul_id)).all()),
+            location_ids=list(session.exec(select(Location.location_id)).all()),
+            user_ids=sorted({user_id for user_id, _ in links}),
+            links=links,
+            messages=session.exec(select(func.count()).select_from(Conversation)).one()
+        )
@@ -0,0 +1,193 @@
+# /backend/benchmarks/serialization.py
+# /version.py
+# /_dev/
+
+# "It's dangerous to go alone! Take this."
+# - Old Man - The Legend of Zelda
+
+"""
+Serialisation Micro-benchmark
+Encodes representative response payloads (same shapes as the real handlers) through:
+  - fastapi:  jsonable_encoder + JSONResponse   (the default path)
+  - orjson:   FastJSONResponse via respond()   (Settings.fast_json_enabled)
+  - msgpack:  FastJSONResponse, Accept: application/msgpack (if installed)
+and reports per-call cost plus gzip/brotli size and time for each JSON body.
+
+    python -m backend.benchmarks.serialization
+    python -m backend.benchmarks.serialization --history 200 --souls 50 --out ser.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+WORDS = ("neon rain soul plaza link city whisper static heart echo signal memory glass "
+         "midnight arcade ghost velvet chrome lantern river smile quiet storm").split()
+
+
+def _text(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+def build_payloads(args) -> Dict[str, object]:
+    """Seeded stand-ins for /chat/history, /sync/dashboard, /souls/explore and /map/locations."""
+    rng = random.Random(args.seed)
+    start = datetime(2025, 1, 1)
+    history = [
+        {
+            "id": 10_000 + i,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": _text(rng, 4, 20) if i % 2 == 0 else _text(rng, 20, 90),
+            "timestamp": (start + timedelta(seconds=37 * i)).isoformat()
+        }
+        for i in range(args.history)
+    ]
+    soul_ids = [f"soul_{i:02d}" for i in range(args.souls)]
+    dashboard = {
+        "user_id": "USR-BENCH",
+        "username": "bench",
+        "display_name": "Bench User",
+        "active_souls": [
+            {
+                "soul_id": sid,
+                "name": sid.replace("_", " ").title(),
+                "archetype": rng.choice(["Rogue", "Muse", "Guardian", "Drifter"]),
+                "portrait_url": f"/assets/images/souls/{sid}_01.jpeg",
+                "tier": rng.choice(["STRANGER", "FRIEND", "CLOSE_FRIEND"]),
+                "location": rng.choice(["soul_plaza", "stop_n_go", "apartment"]),
+                "last_interaction": (start + timedelta(hours=i)).isoformat(),
+                "is_architect": False,
+                "nsfw_unlocked": False
+            }
+            for i, sid in enumerate(soul_ids[:args.links])
+        ],
+        "total_links": min(args.links, len(soul_ids))
+    }
+    explore = [
+        {
+            "id": sid,
+            "name": sid.replace("_", " ").title(),
+            "tagline": _text(rng, 10, 18)[:100] + "...",
+            "archetype": rng.choice(["Rogue", "Muse", "Guardian", "Drifter"]),
+            "is_linked": i < args.links,
+            "portrait_url": f"/assets/images/souls/{sid}_01.jpeg"
+        }
+        for i, sid in enumerate(soul_ids)
+    ]
+    world_map = [
+        {
+            "id": f"loc_{i}",
+            "name": f"District {i}",
+            "category": "district",
+            "desc": _text(rng, 15, 40),
+            "privacy": "Public",
+            "present_souls": soul_ids[i::8][:4]
+        }
+        for i in range(8)
+    ]
+    return {"chat_history": history, "sync_dashboard": dashboard, "souls_explore": explore, "map_locations": world_map}
+
+
+def per_call_us(fn: Callable[[], object], min_time: float, repeat: int) -> float:
+    """Best-of-`repeat` microseconds per call, each round running for at least `min_time` seconds."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= min_time / 10:
+            break
+        number *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best * 1e6
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="SoulLink response serialisation micro-benchmark")
+    p.add_argument("--history", type=int, default=200, help="Messages in the history page")
+    p.add_argument("--souls", type=int, default=50, help="Souls on the explore page")
+    p.add_argument("--links", type=int, default=16, help="Souls on the dashboard")
+    p.add_argument("--seed", type=int, default=1337)
+    p.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--out", default=None, help="Also write the results as JSON")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    # Settings are read at import time; no database is touched here (so no file is created)
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'soullink_bench.db')}")
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from backend.app.core import responses
+    from backend.app.core.config import settings
+    from backend.app.core.middleware import brotli, compress
+
+    settings.fast_json_enabled = True
+    settings.msgpack_enabled = True
+    encoders = {
+        "fastapi": lambda p: JSONResponse(jsonable_encoder(p)).body,
+        "orjson": lambda p: responses.FastJSONResponse(p).body,
+    }
+    if responses.msgpack is not None:
+        def _msgpack(p):
+            token = responses.set_wire_format("msgpack")
+            try:
+                return responses.FastJSONResponse(p).body
+            finally:
+                responses.reset_wire_format(token)
+        encoders["msgpack"] = _msgpack
+    codings = ["gzip"] + (["br"] if brotli is not None else [])
+
+    results = {}
+    for name, payload in build_payloads(args).items():
+        row = {"encode": {}, "compress": {}}
+        for label, encode in encoders.items():
+            row["encode"][label] = {
+                "us": round(per_call_us(lambda: encode(payload), args.min_time, args.repeat), 2),
+                "bytes": len(encode(payload))
+            }
+        body = encoders["orjson"](payload)
+        for coding in codings:
+            row["compress"][coding] = {
+                "us": round(per_call_us(lambda: compress(body, coding), args.min_time, args.repeat), 2),
+                "bytes": len(compress(body, coding))
+            }
+        results[name] = row
+
+    labels = list(encoders)
+    print(f"\n{'payload':<16}" + "".join(f"{l + ' us':>14}" for l in labels) + f"{'speedup':>10}{'json B':>10}"
+          + "".join(f"{c + ' B':>10}{c + ' us':>10}" for c in codings))
+    for name, row in results.items():
+        enc = row["encode"]
+        speedup = enc["fastapi"]["us"] / enc["orjson"]["us"] if enc["orjson"]["us"] else 0.0
+        print(f"{name:<16}" + "".join(f"{enc[l]['us']:>14.1f}" for l in labels)
+              + f"{speedup:>9.1f}x{enc['orjson']['bytes']:>10}"
+              + "".join(f"{row['compress'][c]['bytes']:>10}{row['compress'][c]['us']:>10.1f}" for c in codings))
+    missing = [pkg for pkg, mod in (("msgpack", responses.msgpack), ("brotli", brotli), ("orjson", responses.orjson)) if mod is None]
+    if missing:
+        print(f"\n(not installed, skipped or stdlib fallback: {', '.join(missing)})")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"config": vars(args), "results": results}, fh, indent=2, sort_keys=True)
+        print(f"\n📄 {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
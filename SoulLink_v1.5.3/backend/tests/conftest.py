@@ -0,0 +1,82 @@
+# /backend/tests/conftest.py
+# /version.py
+# /_dev/
+
+# "The cake is a lie."
+# - Portal
+
+"""
+Shared fixtures. The app reads its Settings (and builds its engines) at import time,
+so the environment is pinned here before anything from `backend.app` is imported:
+a throwaway SQLite file, the fake LLM with no latency, and no background jobs.
+"""
+
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="soullink-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}",
+    LLM_PROVIDER="fake",
+    FAKE_LLM_LATENCY_MS="0",
+    FAKE_LLM_LATENCY_JITTER_MS="0",
+    FAKE_LLM_TOKENS_PER_SECOND="0",
+    FAKE_LLM_SEED="7",
+    PORTRAIT_PIPELINE_ENABLED="false",
+    PRESENCE_OCCUPANCY_REFRESH_SECONDS="0",
+    SYNC_DELTA_WINDOW_SECONDS="0",
+    TRACE_SAMPLE_RATE="0",
+)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+
+from backend.app.database.session import engine
+from backend.app.models import Location, Soul, SoulRelationship, User
+from backend.app.services.archive import archivist
+from backend.app.services.blueprints import blueprint_cache
+from backend.app.services.energy import EnergyService
+from backend.app.services.presence import presence
+from backend.app.services.user_cache import user_cache
+
+def seed_world(db_engine):
+    """Two users, three souls, two locations; the player is linked to aria and blaze."""
+    with Session(db_engine) as session:
+        session.add(User(user_id="USR-001", username="architect", account_tier="architect"))
+        session.add(User(user_id="USR-ABCD", username="player"))
+        for soul_id in ("aria", "blaze", "echo"):
+            session.add(Soul(
+                soul_id=soul_id, name=soul_id.title(), summary=f"{soul_id} keeps to the neon.",
+                archetype="Rogue", personality="witty", spawn_location="soul_plaza",
+                llm_instruction_override={"system_anchor": f"You are {soul_id}, talking to {{user_name}}."},
+                interaction_engine={"tiers": {"STRANGER": {"logic": "be aloof"}}},
+                meta_data={"dev_config": {"architect_ids": ["USR-001"], "title": "Architect"}}
+            ))
+        session.add(Location(location_id="soul_plaza", display_name="Soul Plaza", description="Busy.",
+                             system_modifiers={"privacy_gate": "Public"}))
+        session.add(Location(location_id="apartment", display_name="Apartment", description="Quiet.",
+                             system_modifiers={"privacy_gate": "Private"}, min_intimacy=50))
+        session.add(SoulRelationship(user_id="USR-ABCD", soul_id="aria", current_location="soul_plaza"))
+        session.add(SoulRelationship(user_id="USR-ABCD", soul_id="blaze", current_location="soul_plaza"))
+        session.commit()
+
+
+@pytest.fixture
+def db():
+    """A freshly seeded database, with every in-process cache emptied."""
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    seed_world(engine)
+    for cache in (blueprint_cache, user_cache, presence):
+        cache.clear()
+    EnergyService._exhausted.clear()
+    archivist._cursor = None
+    yield engine
+
+
+@pytest.fixture
+def client(db):
+    from backend.app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
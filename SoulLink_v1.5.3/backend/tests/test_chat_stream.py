@@ -0,0 +1,70 @@
+# /backend/tests/test_chat_stream.py
+# /version.py
+# /_dev/
+
+import asyncio
+import json
+
+from sqlmodel import Session
+
+from backend.app.models import User
+from backend.app.services.llm import FakeProvider, set_provider
+
+
+async def _stream_then_hang_up(app, soul_id: str):
+    """
+    Drives POST /chat/stream at the ASGI level and disconnects after the first token,
+    the way uvicorn does: on ASGI spec 2.3 Starlette cancels the response's task group.
+    """
+    body = json.dumps({"soul_id": soul_id, "message": "tell me a story"}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/v1/chat/stream", "raw_path": b"/api/v1/chat/stream",
+        "query_string": b"", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+        "headers": [(b"content-type", b"application/json"), (b"x-user-id", b"USR-ABCD"),
+                    (b"content-length", str(len(body)).encode())],
+    }
+    first_token = asyncio.Event()
+    sent = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await first_token.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_token.set()
+
+    await app(scope, receive, send)
+    return sent
+
+
+def test_client_hanging_up_mid_stream_gets_the_charge_back(db, monkeypatch):
+    from backend.app.main import app
+    from backend.app.services.energy import EnergyService
+
+    refund = EnergyService.refund
+
+    async def slow_refund(async_engine, charge):
+        await asyncio.sleep(0.05)  # A busy database: the refund outlives a cancelled scope's next tick
+        await refund(async_engine, charge)
+
+    monkeypatch.setattr(EnergyService, "refund", staticmethod(slow_refund))
+    # Slow tokens: the hang-up lands while the reply is still being generated
+    set_provider(FakeProvider(latency_ms=0, latency_jitter_ms=0, tokens_per_second=20))
+    try:
+        sent = asyncio.run(_stream_then_hang_up(app, "aria"))
+    finally:
+        set_provider(None)
+    assert sent[0]["status"] == 200
+    chunks = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    assert b"event: token" in chunks and b"event: done" not in chunks
+
+    with Session(db) as session:
+        assert session.get(User, "USR-ABCD").energy == 100
@@ -0,0 +1,117 @@
+# /backend/tests/test_energy.py
+# /version.py
+# /_dev/
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.core.config import EnergyTier
+from backend.app.database.session import async_engine
+from backend.app.models import User
+from backend.app.services.energy import EnergyService
+
+PLAYER = {"X-User-Id": "USR-ABCD"}  # Seeded by conftest.seed_world (free tier, 100 energy)
+
+
+def _energy(db, user_id: str = "USR-ABCD") -> int:
+    with Session(db) as session:
+        return session.get(User, user_id).energy
+
+
+def _send(client, soul_id: str = "aria"):
+    return client.post("/api/v1/chat/send", json={"soul_id": soul_id, "message": "hi"}, headers=PLAYER)
+
+
+def test_turn_is_charged(db, client):
+    assert _send(client).status_code == 200
+    assert _energy(db) == 95
+
+
+def test_turn_that_never_happens_is_refunded(db, client):
+    assert _send(client, soul_id="echo").status_code == 404  # Not linked
+    assert _energy(db) == 100
+
+
+def test_architects_are_never_charged(db, client):
+    client.post("/api/v1/souls/aria/link", headers={"X-User-Id": "USR-001"})
+    before = _energy(db, "USR-001")
+    assert client.post("/api/v1/chat/send", json={"soul_id": "aria", "message": "hi"},
+                       headers={"X-User-Id": "USR-001"}).status_code == 200
+    assert _energy(db, "USR-001") == before
+
+
+# --- Unit level: regenerate / admit / refund ---
+
+TIER = EnergyTier(max_energy=100, regen_per_minute=1.0, turn_cost=5)
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_regenerate_credits_whole_points_and_keeps_the_fraction():
+    energy, anchor = EnergyService.regenerate(10, NOW - timedelta(seconds=150), TIER, NOW)
+    assert energy == 12
+    assert anchor == NOW - timedelta(seconds=30)  # Half a point still in progress
+
+
+def test_regenerate_stops_at_the_cap():
+    assert EnergyService.regenerate(90, NOW - timedelta(hours=1), TIER, NOW) == (100, NOW)
+
+
+@pytest.mark.parametrize("updated_at", [None, NOW - timedelta(hours=1)])
+def test_regenerate_keeps_grandfathered_balances(updated_at):
+    # Same rule whether or not the user has ever been charged
+    assert EnergyService.regenerate(150, updated_at, TIER, NOW) == (150, NOW)
+
+
+def _set_energy(db, energy: int, updated_at=None):
+    with Session(db) as session:
+        user = session.get(User, "USR-ABCD")
+        user.energy, user.energy_updated_at = energy, updated_at
+        session.add(user)
+        session.commit()
+
+
+async def _admit():
+    async with AsyncSession(async_engine) as session:
+        return await EnergyService.admit(session, "USR-ABCD")
+
+
+def test_admit_charges_the_turn_cost(db):
+    charge = asyncio.run(_admit())
+    assert (charge.cost, charge.remaining) == (5, 95)
+    assert _energy(db) == 95
+
+
+def test_admit_rejects_an_empty_user_with_retry_after(db):
+    _set_energy(db, 3, datetime.utcnow())
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(_admit())
+    assert rejected.value.status_code == 429
+    retry_after = int(rejected.value.headers["Retry-After"])
+    assert 1 <= retry_after <= 120  # 2 points short at 1 point/minute
+    assert _energy(db) == 3  # Nothing charged
+
+    # Known-empty users are turned away without touching the DB
+    _set_energy(db, 100)
+    with pytest.raises(HTTPException) as again:
+        asyncio.run(_admit())
+    assert again.value.status_code == 429
+
+
+def test_chat_send_surfaces_the_429(db, client):
+    _set_energy(db, 0, datetime.utcnow())
+    response = _send(client)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.parametrize("balance, expected", [(50, 55), (98, 100), (150, 150)])
+def test_refund_never_pushes_past_the_cap(db, balance, expected):
+    charge = asyncio.run(_admit())
+    _set_energy(db, balance, datetime.utcnow())  # e.g. regen landed before the refund
+    asyncio.run(EnergyService.refund(async_engine, charge))
+    assert _energy(db) == expected
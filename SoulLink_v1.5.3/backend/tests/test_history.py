@@ -0,0 +1,106 @@
+# /backend/tests/test_history.py
+# /version.py
+# /_dev/
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from backend.app.core.config import settings
+from backend.app.models import Conversation, ConversationArchive, SoulRelationship
+from backend.app.services.archive import archivist
+from backend.app.services.persistence import write_behind
+PLAYER = {"X-User-Id": "USR-ABCD"}  # Seeded by conftest.seed_world
+
+
+def _add_thread(db, count: int):
+    start = datetime.utcnow() - timedelta(minutes=count)
+    with Session(db) as session:
+        for i in range(count):
+            session.add(Conversation(user_id="USR-ABCD", soul_id="aria", role="user" if i % 2 == 0 else "assistant",
+                                     content=f"message {i}", created_at=start + timedelta(minutes=i)))
+        session.commit()
+        return list(session.exec(select(Conversation.msg_id).order_by(Conversation.msg_id)).all())
+
+
+def _pages(client, limit: int):
+    pages, before = [], None
+    while True:
+        params = {"soul_id": "aria", "limit": limit}
+        if before is not None:
+            params["before"] = before
+        response = client.get("/api/v1/chat/history", params=params, headers=PLAYER)
+        assert response.status_code == 200
+        pages.append([m["id"] for m in response.json()])
+        before = response.headers.get("X-Next-Before")
+        if before is None:
+            return pages
+
+
+def test_keyset_pages_walk_hot_then_cold(db, client, monkeypatch):
+    ids = _add_thread(db, 10)
+    monkeypatch.setattr(settings, "archive_keep_last", 4)
+    monkeypatch.setattr(settings, "archive_chunk_size", 3)
+    with Session(db) as session:
+        rel = session.exec(select(SoulRelationship).where(SoulRelationship.soul_id == "aria")).one()
+        rel.summary_through_msg_id = ids[-1]  # Memory has absorbed everything
+        session.add(rel)
+        session.commit()
+
+    assert archivist.run_once(db) == 6
+    with Session(db) as session:
+        assert session.exec(select(func.count()).select_from(Conversation)).one() == 4
+        assert session.exec(select(func.count()).select_from(ConversationArchive)).one() == 2
+
+    pages = _pages(client, limit=3)
+    # Newest page first, each page oldest -> newest, the hot/cold seam invisible
+    assert pages == [ids[7:10], ids[4:7], ids[1:4], ids[0:1]]
+
+
+
+def test_threads_with_nothing_to_move_do_not_starve_the_archivist(db, monkeypatch):
+    monkeypatch.setattr(settings, "archive_keep_last", 4)
+    monkeypatch.setattr(settings, "archive_threads_per_run", 1)
+    _add_thread(db, 10)  # aria: over keep_last, but the memory hasn't absorbed any of it
+    old = datetime.utcnow() - timedelta(days=settings.archive_after_days + 1)
+    with Session(db) as session:
+        for i in range(2):  # blaze: too short to ever be summarized, and long past the cutoff
+            session.add(Conversation(user_id="USR-ABCD", soul_id="blaze", role="user",
+                                     content=f"old {i}", created_at=old))
+        session.commit()
+
+    assert archivist.run_once(db) == 0  # aria waits on its memory...
+    assert archivist.run_once(db) == 2  # ...without blocking blaze
+    with Session(db) as session:
+        hot = session.exec(select(Conversation.soul_id, func.count()).group_by(Conversation.soul_id)).all()
+    assert dict(hot) == {"aria": 10}
+
+def test_newest_page_includes_queued_write_behind_turns(db, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+
+    ids = _add_thread(db, 2)
+    monkeypatch.setattr(settings, "write_behind_enabled", True)
+    monkeypatch.setattr(write_behind, "flush_interval", 3600.0)  # Nothing flushes until shutdown
+
+    with TestClient(app) as client:
+        assert client.post("/api/v1/chat/send", json={"soul_id": "aria", "message": "still queued"},
+                           headers=PLAYER).status_code == 200
+        assert write_behind.depth == 1
+
+        newest = client.get("/api/v1/chat/history", params={"soul_id": "aria"}, headers=PLAYER).json()
+        assert [m["id"] for m in newest] == ids + [None, None]
+        assert newest[-2]["role"] == "user" and newest[-2]["content"] == "still queued"
+        assert newest[-1]["role"] == "assistant"
+
+        # Scrolling back never repeats queued turns
+        older = client.get("/api/v1/chat/history", params={"soul_id": "aria", "before": ids[-1]},
+                           headers=PLAYER).json()
+        assert [m["id"] for m in older] == ids[:-1]
+
+    # Shutdown drained the queue: the same turn is now a stored row, not a duplicate
+    with Session(db) as session:
+        stored = session.exec(select(Conversation).order_by(Conversation.msg_id)).all()
+    assert [m.content for m in stored][-2] == "still queued"
+    assert len(stored) == 4
@@ -0,0 +1,56 @@
+# /backend/tests/test_memory.py
+# /version.py
+# /_dev/
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.database.session import async_engine
+from backend.app.logic.context import ContextLoader
+from backend.app.models import Conversation, SoulRelationship
+
+
+def _add_thread(db, count: int):
+    start = datetime.utcnow() - timedelta(minutes=count)
+    with Session(db) as session:
+        for i in range(count):
+            session.add(Conversation(user_id="USR-ABCD", soul_id="aria", role="user",
+                                     content=f"m{i}", created_at=start + timedelta(minutes=i)))
+        session.commit()
+        return list(session.exec(select(Conversation.msg_id).order_by(Conversation.msg_id)).all())
+
+
+def _summarize_through(db, msg_id: int):
+    with Session(db) as session:
+        rel = session.exec(select(SoulRelationship).where(SoulRelationship.soul_id == "aria")).one()
+        rel.summary_through_msg_id = msg_id
+        session.add(rel)
+        session.commit()
+
+
+async def _load():
+    async with AsyncSession(async_engine) as session:
+        return await ContextLoader.load(session, "USR-ABCD", "aria")
+
+
+def test_unsummarized_rows_beyond_the_fetch_are_counted(db, monkeypatch):
+    monkeypatch.setattr(settings, "history_fetch_limit", 10)
+    ids = _add_thread(db, 10 + settings.summary_min_new_messages)
+
+    # Everything fetched fits the window, yet the rows before it were never summarized
+    ctx = asyncio.run(_load())
+    assert [m.msg_id for m in ctx.history] == ids[-10:]
+    assert ctx.summary_stale
+
+    # Absorb all but one of them: below the threshold, nothing to fold
+    _summarize_through(db, ids[-12])
+    assert not asyncio.run(_load()).summary_stale
+
+
+def test_short_threads_never_need_a_refresh(db):
+    _add_thread(db, 4)
+    assert not asyncio.run(_load()).summary_stale
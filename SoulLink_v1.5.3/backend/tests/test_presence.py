@@ -0,0 +1,37 @@
+# /backend/tests/test_presence.py
+# /version.py
+# /_dev/
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from backend.app.models.relationship import SoulRelationship
+from backend.app.services.presence import Move, PresenceIndex
+
+
+def _seeded_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[SoulRelationship.__table__])
+    with Session(engine) as session:
+        session.add(SoulRelationship(user_id="USR-A", soul_id="aria", current_location="skyline_lounge", change_version=1))
+        session.add(SoulRelationship(user_id="USR-A", soul_id="blaze", current_location="skyline_lounge", change_version=2))
+        session.add(SoulRelationship(user_id="USR-B", soul_id="echo", current_location="soul_plaza", change_version=3))
+        session.commit()
+    return engine
+
+
+def test_moves_for_uncached_user_keep_occupancy_consistent():
+    index = PresenceIndex()
+    index.refresh_occupancy(_seeded_engine())
+    assert index.occupancy()["skyline_lounge"] == {"souls": 2, "users": 1}
+
+    # USR-A's map was never loaded: the user delta is unknown, the soul delta is not
+    index.record_moves("USR-A", [
+        Move("aria", "skyline_lounge", "soul_plaza", 1, 10),
+        Move("blaze", "skyline_lounge", "soul_plaza", 2, 11),
+    ])
+
+    occupancy = index.occupancy()
+    assert occupancy["skyline_lounge"] == {"souls": 0, "users": 0}
+    assert occupancy["soul_plaza"]["souls"] == 3
+    assert 1 <= occupancy["soul_plaza"]["users"] <= 3
@@ -0,0 +1,31 @@
+# /backend/tests/test_prompts.py
+# /version.py
+# /_dev/
+
+from sqlalchemy import update
+from sqlmodel import Session
+
+from backend.app.models import Soul, User
+from backend.app.services.prompts import PromptBuilder
+
+
+def _load(db):
+    # A fresh session stands in for the blueprint cache reloading after a TTL expiry
+    with Session(db) as session:
+        return session.get(Soul, "aria"), session.get(User, "USR-ABCD")
+
+
+def test_out_of_process_edit_recompiles(db):
+    builder = PromptBuilder()
+    soul, user = _load(db)
+    assert "You are aria" in builder.build(soul, user, None, None)
+    assert builder.build(*_load(db), None, None) == builder.build(soul, user, None, None)
+    assert builder.misses == 1  # Same content, different object: still a hit
+
+    # Another worker edits the soul: a Core UPDATE fires no ORM events, so no revision bump here
+    with Session(db) as session:
+        session.execute(update(Soul.__table__).where(Soul.__table__.c.soul_id == "aria")
+                        .values(llm_instruction_override={"system_anchor": "You are Aria Prime."}))
+        session.commit()
+    soul, user = _load(db)
+    assert "Aria Prime" in builder.build(soul, user, None, None)
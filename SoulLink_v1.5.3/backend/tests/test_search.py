@@ -0,0 +1,50 @@
+# /backend/tests/test_search.py
+# /version.py
+# /_dev/
+
+import threading
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from backend.app.services.search import soul_search
+
+PLAYER = {"X-User-Id": "USR-ABCD"}
+
+
+def _explore(client, q: str):
+    response = client.get("/api/v1/souls/explore", params={"q": q}, headers=PLAYER)
+    assert response.status_code == 200
+    return [s["id"] for s in response.json()]
+
+
+def test_concurrent_rebuilds_leave_one_complete_index(db):
+    errors = []
+
+    def rebuild():
+        try:
+            soul_search.rebuild(db)
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=rebuild) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert not errors
+    with Session(db) as session:
+        assert session.execute(text("SELECT count(*) FROM souls_fts")).scalar() == 3
+
+
+def test_search_without_an_index_falls_back_to_ilike(db, client, monkeypatch):
+    with Session(db) as session:
+        session.execute(text("DROP TABLE IF EXISTS souls_fts"))
+        session.commit()
+    monkeypatch.setattr(soul_search, "_ready", {})
+    try:
+        assert _explore(client, "bla") == ["blaze"]
+    finally:
+        soul_search.rebuild(db)
+    assert _explore(client, "bla") == ["blaze"]
@@ -0,0 +1,54 @@
+# /backend/tests/test_sync.py
+# /version.py
+# /_dev/
+
+PLAYER = {"X-User-Id": "USR-ABCD"}  # Seeded by conftest.seed_world
+
+
+def _dashboard(client, **params):
+    headers = {**PLAYER, **params.pop("headers", {})}
+    return client.get("/api/v1/sync/dashboard", params=params, headers=headers)
+
+
+def test_full_sync_is_conditional_and_hands_out_a_cursor(client):
+    full = _dashboard(client)
+    assert full.status_code == 200
+    assert sorted(s["soul_id"] for s in full.json()["active_souls"]) == ["aria", "blaze"]
+    etag, cursor = full.headers["ETag"], full.headers["X-Sync-Cursor"]
+
+    unchanged = _dashboard(client, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert "X-Sync-Cursor" in unchanged.headers
+
+    # A chat turn touches the link: the validator must change
+    assert client.post("/api/v1/chat/send", json={"soul_id": "aria", "message": "hi"}, headers=PLAYER).status_code == 200
+    changed = _dashboard(client, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert cursor
+
+
+def test_delta_cursor_returns_only_changed_links(client):
+    cursor = _dashboard(client).headers["X-Sync-Cursor"]
+
+    quiet = _dashboard(client, since=cursor)
+    assert quiet.status_code == 200
+    body = quiet.json()
+    assert body["delta"] is True and body["active_souls"] == []
+    assert body["cursor"] == quiet.headers["X-Sync-Cursor"]
+    cursor = body["cursor"]
+
+    client.post("/api/v1/chat/send", json={"soul_id": "aria", "message": "hi"}, headers=PLAYER)
+    after_chat = _dashboard(client, since=cursor).json()
+    assert [s["soul_id"] for s in after_chat["active_souls"]] == ["aria"]
+
+    client.post("/api/v1/souls/echo/link", headers=PLAYER)
+    after_link = _dashboard(client, since=after_chat["cursor"]).json()
+    assert [s["soul_id"] for s in after_link["active_souls"]] == ["echo"]
+
+    assert _dashboard(client, since=after_link["cursor"]).json()["active_souls"] == []
+
+
+def test_unknown_cursor_is_rejected(client):
+    assert _dashboard(client, since="not-a-cursor").status_code == 400
@@ -0,0 +1,57 @@
+# /backend/tests/test_write_behind.py
+# /version.py
+# /_dev/
+
+import asyncio
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from backend.app.models import Conversation
+from backend.app.services.persistence import ChatTurn, WriteBehindQueue
+
+
+def _queue(db, *inputs: str) -> WriteBehindQueue:
+    queue = WriteBehindQueue(max_batch=10)
+    queue._engine = db
+    queue._queue.extend(ChatTurn("USR-ABCD", "aria", None, text, f"re: {text}") for text in inputs)
+    return queue
+
+
+def _failing_write(queue: WriteBehindQueue, fails):
+    write = queue._write
+
+    def _write(batch):
+        if any(fails(turn) for turn in batch):
+            raise RuntimeError("constraint violated")
+        write(batch)
+    queue._write = _write
+
+
+def _stored(db) -> int:
+    with Session(db) as session:
+        return session.exec(select(func.count()).select_from(Conversation)).one()
+
+
+def test_poison_turn_is_dead_lettered_not_retried_forever(db):
+    queue = _queue(db, "one", "poison", "two")
+    _failing_write(queue, lambda turn: turn.user_input == "poison")
+
+    asyncio.run(queue.flush())
+
+    assert queue.depth == 0
+    assert _stored(db) == 4  # "one" and "two", both messages each
+    assert [t.user_input for t in queue.dead_letters] == ["poison"]
+    assert queue.stats()["dead_lettered"] == 1
+    assert queue.pending_for("USR-ABCD", "aria") == []
+
+
+def test_outage_requeues_everything(db):
+    queue = _queue(db, "one", "two")
+    _failing_write(queue, lambda turn: True)
+
+    asyncio.run(queue.flush())
+
+    assert [t.user_input for t in queue._queue] == ["one", "two"]
+    assert not queue.dead_letters
+    assert _stored(db) == 0